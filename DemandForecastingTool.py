@@ -1,11 +1,12 @@
 import streamlit as st
-import pandas as pd
 
-# Moving Average Forecast Function
-def moving_average_forecast(data, window=5, forecast_days=7):
-    historical = data['Sales'].rolling(window=window).mean().iloc[-forecast_days:].values
-    forecast = historical[-1] if len(historical) > 0 else 0
-    return [forecast] * forecast_days
+from calendar_alignment import SalesCalendar
+from charting import prepare_chart_data
+from forecasting import forecast_all_products
+from instrumentation import start_panel
+from sales_views import load_sales_index, sales_view_sidebar
+
+panel = start_panel("Simplified Demand Forecasting Tool")
 
 # Streamlit Application
 st.title("Simplified Demand Forecasting Tool")
@@ -15,30 +16,29 @@ uploaded_file = st.file_uploader("Upload your sales data CSV file", type="csv")
 
 if uploaded_file:
     # Load and preprocess data
-    data = pd.read_csv(uploaded_file)
-    data['Date'] = pd.to_datetime(data['Date'])
-    data.set_index('Date', inplace=True)
+    dataset_key, index = load_sales_index(uploaded_file.getvalue())
+    resolution, index, source = sales_view_sidebar(dataset_key, index)
 
     # Select Multiple Products
-    selected_products = st.multiselect('Select Products', data['Product'].unique())
+    selected_products = st.multiselect('Select Products', index.products)
 
     if selected_products:
-        forecast_days = st.slider('Forecast Days', min_value=1, max_value=30, value=7)
+        forecast_days = st.slider('Forecast Days' if resolution == "Daily" else f'Forecast Periods ({resolution})',
+                                  min_value=1, max_value=30, value=7)
+
+        # Forecast all selected products in one grouped pass
+        forecasts = forecast_all_products(source, selected_products, method="Moving Average",
+                                          window=5, forecast_days=forecast_days, resolution=resolution)
 
         # Prepare data for multiple products
         historical_data = {}
         forecast_data = {}
 
         for product in selected_products:
-            product_data = data[data['Product'] == product]
-            forecast = moving_average_forecast(product_data, window=5, forecast_days=forecast_days)
-
-            # Store historical and forecast data
-            historical_data[product] = product_data['Sales']
-            forecast_data[product] = pd.Series(
-                forecast, 
-                index=pd.date_range(product_data.index[-1], periods=forecast_days, freq='D')
-            )
+            historical_data[product] = (source.series(product) if isinstance(source, SalesCalendar)
+                                        else index.rows(product)['Sales'])
+        for product, product_forecast in forecasts.groupby('Product', sort=False):
+            forecast_data[product] = product_forecast.set_index('Date')['Forecast']
 
         # Combine historical and forecast data into one chart
         combined_data = {}
@@ -46,4 +46,9 @@ if uploaded_file:
             combined_data[f"{product} - Historical Sales"] = historical_data[product]
             combined_data[f"{product} - Forecasted Sales"] = forecast_data[product]
 
-        st.line_chart(combined_data)
+        # Downsample long histories before sending them to the browser; forecasts stay exact
+        forecast_columns = {f"{product} - Forecasted Sales" for product in selected_products}
+        st.line_chart(prepare_chart_data(combined_data, full_resolution=forecast_columns),
+                      x='Date', y='Sales', color='Series')
+
+panel.render()
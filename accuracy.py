@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+
+from calendar_alignment import SalesCalendar
+from forecasting import forecast_all_products
+from ingest import sales_dates
+from instrumentation import timed
+from product_index import ProductIndex
+from rollups import period_numbers, rollup
+
+ACTUAL = "Actual"
+ACCURACY_METRICS = ['WAPE', 'MAE', 'MAPE', 'Bias', 'Bias %']
+ACCURACY_COLUMNS = ACCURACY_METRICS + ['Points']
+SIGNED_METRICS = ('Bias', 'Bias %')  # Ranked by distance from zero
+
+def _keyed(data, resolution):
+    """
+    Product labels, period numbers and values of a sales frame, ProductIndex
+    or forecast frame. Forecast frames carry a 'Forecast' column, the others 'Sales'.
+    """
+    frame = data.data if isinstance(data, ProductIndex) else data
+    column = 'Forecast' if 'Forecast' in frame.columns else 'Sales'
+    if not {'Product', column}.issubset(frame.columns):
+        raise ValueError("Forecast files must contain 'Date', 'Product', and 'Sales' (or 'Forecast') columns.")
+    dates = pd.to_datetime(sales_dates(frame), errors='coerce').to_numpy(dtype='datetime64[ns]')
+    values = pd.to_numeric(frame[column], errors='coerce').to_numpy(dtype=float)
+    valid = ~np.isnat(dates) & ~np.isnan(values)
+    return frame['Product'].to_numpy()[valid], period_numbers(dates[valid], resolution), values[valid]
+
+def _accuracy(group_ids, actual, forecast, groups):
+    errors = forecast - actual
+    absolute = np.abs(errors)
+    count = np.bincount(group_ids, minlength=groups).astype(float)
+    # Percentages are undefined for products that sold nothing over the scored points
+    actual_total = np.bincount(group_ids, weights=actual, minlength=groups)
+    actual_total[actual_total == 0] = np.nan
+    actual_volume = np.bincount(group_ids, weights=np.abs(actual), minlength=groups)
+    actual_volume[actual_volume == 0] = np.nan
+    nonzero = actual != 0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'WAPE': 100 * np.bincount(group_ids, weights=absolute, minlength=groups) / actual_volume,
+            'MAE': np.bincount(group_ids, weights=absolute, minlength=groups) / count,
+            'MAPE': 100 * np.bincount(group_ids[nonzero], weights=absolute[nonzero] / np.abs(actual[nonzero]),
+                                      minlength=groups) / np.bincount(group_ids[nonzero], minlength=groups),
+            'Bias': np.bincount(group_ids, weights=errors, minlength=groups) / count,
+            'Bias %': 100 * np.bincount(group_ids, weights=errors, minlength=groups) / actual_total,
+            'Points': count.astype(np.int64),
+        })
+
+# Forecast Accuracy Comparison
+@timed()
+def compare_forecasts(actuals, forecasts, resolution="Daily", common_only=True):
+    """
+    Score named forecast sources against actual sales for every product at
+    once. actuals is a sales frame or ProductIndex; forecasts maps a source
+    name to a frame (or ProductIndex) of 'Product', 'Date' and 'Forecast' or
+    'Sales'. All rows are joined in one keyed pass on (product, period) at
+    the given resolution, summing rows that repeat a key. With common_only,
+    only keys that the actuals and every source share are scored, so the
+    sources are compared on the same points. At coarser resolutions a
+    source should cover whole periods, or its partial sums count as misses.
+
+    Returns (per_product, overall): WAPE, MAE, MAPE, Bias (forecast minus
+    actual), Bias % and Points, by product and source and by source.
+    """
+    names = [ACTUAL] + list(forecasts)
+    parts = [_keyed(actuals, resolution)] + [_keyed(frame, resolution) for frame in forecasts.values()]
+    codes, products = pd.factorize(np.concatenate([labels for labels, _, _ in parts]))
+    periods = np.concatenate([numbers for _, numbers, _ in parts])
+    values = np.concatenate([amounts for _, _, amounts in parts])
+    sources = np.repeat(np.arange(len(parts)), [len(amounts) for _, _, amounts in parts])
+
+    # One int64 key per (product, period); a single sort aligns every source on it
+    first = periods.min() if len(periods) else 0
+    span = int(periods.max() - first + 1) if len(periods) else 1
+    keys = codes.astype(np.int64) * span + (periods - first)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    cells = inverse.ravel() * len(names) + sources
+    shape = (len(unique), len(names))
+    wide = np.bincount(cells, weights=values, minlength=shape[0] * shape[1]).reshape(shape)
+    present = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape) > 0
+    key_products = unique // span
+
+    scored = present[:, 0] & present[:, 1:].all(axis=1) if common_only else present[:, 0]
+    per_product, overall = [], []
+    for position, name in enumerate(names[1:], start=1):
+        mask = scored & present[:, position]
+        actual, forecast = wide[mask, 0], wide[mask, position]
+        per_product.append(_accuracy(key_products[mask], actual, forecast, len(products))
+                           .assign(Product=products, Source=name))
+        overall.append(_accuracy(np.zeros(mask.sum(), dtype=np.int64), actual, forecast, 1).assign(Source=name))
+
+    per_product = pd.concat(per_product, ignore_index=True)
+    per_product = per_product[per_product['Points'] > 0].set_index(['Product', 'Source'])[ACCURACY_COLUMNS]
+    overall = pd.concat(overall, ignore_index=True).set_index('Source')[ACCURACY_COLUMNS]
+    return per_product, overall
+
+def _ranking_values(table, metric):
+    return table[metric].abs() if metric in SIGNED_METRICS else table[metric]
+
+def rank_sources(overall, metric="WAPE"):
+    """
+    Overall accuracy table ordered best first by metric, with a 'Rank' column.
+    """
+    ranked = overall.iloc[np.argsort(_ranking_values(overall, metric).to_numpy(), kind='stable')].copy()
+    ranked.insert(0, 'Rank', np.arange(1, len(ranked) + 1))
+    return ranked
+
+def leaderboard(per_product, metric="WAPE", sort_by=None, worst_first=True):
+    """
+    One row per product with every source's metrics side by side as
+    '<metric> (<source>)' columns and the 'Best' source by metric, sorted by
+    the sort_by column (bias columns by their distance from zero).
+    """
+    wide = per_product.unstack('Source')
+    sources = list(wide.columns.get_level_values('Source').unique())
+    values = _ranking_values(wide, metric).to_numpy(dtype=float)
+    best = np.where(np.isnan(values).all(axis=1), None,
+                    np.array(sources, dtype=object)[np.argmin(np.where(np.isnan(values), np.inf, values), axis=1)])
+    wide.columns = [f"{column} ({source})" for column, source in wide.columns]
+    wide.insert(0, 'Best', best)
+    if sort_by in wide.columns:
+        signed = sort_by.split(' (')[0] in SIGNED_METRICS
+        wide = wide.sort_values(sort_by, ascending=not worst_first, na_position='last',
+                                key=(lambda column: column.abs()) if signed else None)
+    return wide
+
+def holdout_forecasts(data, holdout, resolution="Daily", fill=None, aggregate="Sum", **options):
+    """
+    Model forecasts of the last `holdout` periods of a sales dataset, made
+    only from the rows before them, so they can be scored against actuals.
+    data holds daily rows. With a fill rule the truncated history is aligned
+    with SalesCalendar first; without one it is rolled up to the resolution
+    so the model sees one value per period. options (method, window, alpha, ...) go to forecast_all_products.
+    """
+    index = data if isinstance(data, ProductIndex) else ProductIndex(data)
+    dates = pd.to_datetime(sales_dates(index.data), errors='coerce').to_numpy(dtype='datetime64[ns]')
+    valid = ~np.isnat(dates)
+    periods = period_numbers(dates[valid], resolution)
+    if len(periods) == 0:
+        raise ValueError("No dated sales to hold out.")
+
+    # Every product needs at least one period before the holdout to forecast from
+    codes = np.repeat(np.arange(len(index)), index.ends - index.starts)[valid]
+    first = np.full(len(index), np.iinfo(np.int64).max)
+    np.minimum.at(first, codes, periods)
+    cutoff = periods.max() - holdout
+    short = np.flatnonzero((first > cutoff) & (first < np.iinfo(np.int64).max))
+    if len(short):
+        longest = int(periods.max() - first[short].max())
+        raise ValueError(f"A holdout of {holdout} {resolution.lower()} periods leaves no history for "
+                         f"{len(short)} products (for example {index.products[short[0]]}); "
+                         + (f"use at most {longest}." if longest > 0 else "their sales span a single period."))
+    history = ProductIndex(index.data[valid][periods <= cutoff])
+    if fill is not None:
+        source = SalesCalendar(history, resolution, fill, aggregate)
+    elif resolution != "Daily":
+        source = ProductIndex(rollup(history, resolution))
+    else:
+        source = history
+    return forecast_all_products(source, forecast_days=holdout, resolution=resolution, **options)
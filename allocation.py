@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+DEMAND_COLUMNS = ['Resource', 'Site', 'Demand']
+CAPACITY_COLUMNS = ['Resource', 'Capacity']
+DEFAULT_PRIORITY = 1  # Lower numbers are served first
+
+# Define a function to allocate resources
+@timed()
+def allocate_resources(demand, available_resources):
+    """
+    Single-site allocation of {resource: units}: each resource gets as much of
+    its demand as is available and the rest stays in remaining_demand.
+    """
+    allocation = {
+        resource: min(demand[resource], available)
+        for resource, available in available_resources.items()
+        if resource in demand
+    }
+    remaining_demand = {resource: amount - allocation.get(resource, 0) for resource, amount in demand.items()}
+    return allocation, remaining_demand
+
+def priority_fill(resource_codes, priorities, demand, capacity):
+    """
+    Greedy priority allocation of capacity[r] over demand lines of resource r.
+    Lines are served in ascending priority; lines of one resource sharing a
+    priority receive the same fraction of their demand. Returns the allocated
+    units of every line, in input order, without a Python loop over lines.
+    """
+    resource_codes = np.asarray(resource_codes, dtype=np.int64)
+    priorities = np.asarray(priorities)
+    demand = np.asarray(demand, dtype=float)
+    capacity = np.asarray(capacity, dtype=float)
+    if np.any(demand < 0) or np.any(capacity < 0):
+        raise ValueError("Demand and capacity must not be negative.")
+    if np.isnan(demand).any() or np.isnan(capacity).any():
+        raise ValueError("Demand and capacity must be numbers.")
+    if len(demand) == 0:
+        return np.empty(0)
+
+    order = np.lexsort((priorities, resource_codes))
+    codes, tiers, wanted = resource_codes[order], priorities[order], demand[order]
+
+    # Tiers are runs of one resource and one priority
+    new_resource = np.ones(len(codes), dtype=bool)
+    new_resource[1:] = codes[1:] != codes[:-1]
+    new_tier = new_resource.copy()
+    new_tier[1:] |= tiers[1:] != tiers[:-1]
+    tier_starts = np.flatnonzero(new_tier)
+    tier_demand = np.add.reduceat(wanted, tier_starts)
+    tier_codes = codes[tier_starts]
+
+    # Demand of the higher-priority tiers of the same resource
+    served_before = np.cumsum(tier_demand) - tier_demand
+    first_tier = np.maximum.accumulate(np.where(new_resource[tier_starts], np.arange(len(tier_starts)), 0))
+    served_before -= served_before[first_tier]
+
+    tier_allocated = np.clip(capacity[tier_codes] - served_before, 0.0, tier_demand)
+    share = np.divide(tier_allocated, tier_demand, out=np.zeros_like(tier_demand), where=tier_demand > 0)
+
+    allocated = np.empty(len(demand))
+    allocated[order] = wanted * share[np.cumsum(new_tier) - 1]
+    return allocated
+
+# Allocation Engine
+def allocate_matrix(demand, capacity, priorities=None):
+    """
+    Allocate capacity (resources,) over a demand matrix (resources, sites).
+    priorities broadcasts to the demand shape and defaults to one tier per
+    resource. Returns the allocation and shortfall matrices.
+    """
+    demand = np.asarray(demand, dtype=float)
+    capacity = np.asarray(capacity, dtype=float)
+    if demand.ndim != 2 or capacity.shape != (demand.shape[0],):
+        raise ValueError("Demand must be a (resources, sites) matrix and capacity a vector per resource.")
+    if priorities is None:
+        priorities = DEFAULT_PRIORITY
+    priorities = np.broadcast_to(priorities, demand.shape)
+
+    codes = np.repeat(np.arange(demand.shape[0]), demand.shape[1])
+    allocation = priority_fill(codes, priorities.ravel(), demand.ravel(), capacity).reshape(demand.shape)
+    return allocation, demand - allocation
+
+@timed()
+def allocate_frame(demand_data, capacity_data):
+    """
+    Allocate from a demand table ('Resource', 'Site', 'Demand' and an optional
+    'Priority') and a capacity table ('Resource', 'Capacity'). Returns the
+    demand lines with 'Allocated' and 'Shortfall' columns, and a per-resource
+    summary. Resources without a capacity row have no capacity.
+    """
+    if not set(DEMAND_COLUMNS).issubset(demand_data.columns):
+        raise ValueError("Demand file must contain 'Resource', 'Site', and 'Demand' columns.")
+    if not set(CAPACITY_COLUMNS).issubset(capacity_data.columns):
+        raise ValueError("Capacity file must contain 'Resource' and 'Capacity' columns.")
+
+    lines = demand_data[DEMAND_COLUMNS].copy()
+    lines['Priority'] = demand_data['Priority'] if 'Priority' in demand_data.columns else DEFAULT_PRIORITY
+    lines['Demand'] = pd.to_numeric(lines['Demand'], errors='coerce')
+    lines['Priority'] = pd.to_numeric(lines['Priority'], errors='coerce')
+    capacity_values = pd.to_numeric(capacity_data['Capacity'], errors='coerce').to_numpy(dtype=float)
+    if lines[['Demand', 'Priority']].isna().any().any():
+        raise ValueError("Demand and Priority must be numbers.")
+
+    codes, resources = pd.factorize(pd.concat([lines['Resource'], capacity_data['Resource']], ignore_index=True))
+    demand_codes, capacity_codes = codes[:len(lines)], codes[len(lines):]
+    capacity = np.bincount(capacity_codes, weights=capacity_values, minlength=len(resources))
+
+    allocated = priority_fill(demand_codes, lines['Priority'].to_numpy(), lines['Demand'].to_numpy(dtype=float),
+                              capacity)
+    lines['Allocated'] = allocated
+    lines['Shortfall'] = lines['Demand'] - allocated
+
+    demanded = np.bincount(demand_codes, weights=lines['Demand'].to_numpy(dtype=float), minlength=len(resources))
+    served = np.bincount(demand_codes, weights=allocated, minlength=len(resources))
+    summary = pd.DataFrame({
+        'Capacity': capacity,
+        'Demand': demanded,
+        'Allocated': served,
+        'Shortfall': demanded - served,
+        'Unused': capacity - served,
+    }, index=pd.Index(resources, name='Resource'))
+    return lines, summary
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+from ingest import sales_dates
+from product_index import ProductIndex
+from trend_models import trend_from_sums
+
+BACKTEST_METHODS = ("Moving Average", "Time Series", "Linear Trend")
+METRIC_COLUMNS = ['MAE', 'RMSE', 'MAPE', 'Forecasts']
+
+def _segment_cumsum(values, starts, block_ids):
+    """
+    Cumulative sums that restart at every product block:
+    result[i] is the sum of the block's values before row i.
+    """
+    totals = np.concatenate([[0.0], np.cumsum(values)])
+    return totals[:-1] - totals[starts][block_ids]
+
+def _origin_forecasts(method, rows, origin, block_start, sums, x, window, horizon):
+    """
+    Forecast for target rows made at the given origins (rows before the
+    origin are the training window), or NaN where the method has too little history.
+    """
+    sum_n, sum_y, sum_x, sum_xx, sum_xy = sums
+    trained = origin - block_start
+
+    if method == "Moving Average":
+        # rolling(window).mean() needs `window` valid values before the origin
+        start = np.maximum(origin - window, block_start)
+        forecast = (sum_y[origin] - sum_y[start]) / window
+        complete = (trained >= window) & (sum_n[origin] - sum_n[start] == window)
+        return np.where(complete, forecast, np.nan)
+
+    if method == "Time Series":
+        # basic_time_series_forecast averages the valid values of the last `forecast_days` rows
+        start = origin - np.minimum(trained, horizon)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return (sum_y[origin] - sum_y[start]) / (sum_n[origin] - sum_n[start])
+
+    # Expanding-window least squares from the running sufficient statistics
+    x_mean, y_mean, slope = trend_from_sums(sum_n[origin], sum_x[origin], sum_y[origin],
+                                            sum_xx[origin], sum_xy[origin])
+    return y_mean + slope * (x[rows] - x_mean)
+
+# Rolling-Origin Backtest
+def backtest_all_products(data, methods=BACKTEST_METHODS, horizon=7, window=5, min_train=14, progress=None):
+    """
+    Rolling-origin, expanding-window evaluation of the forecast methods for
+    every product. Every row from min_train onwards is a forecast origin, and
+    each origin is scored on the next `horizon` rows. Window statistics come
+    from per-product cumulative sums, so nothing is refitted per origin.
+    progress, if given, is called with the fraction of horizon steps scored.
+    Returns (per_product, overall) metric tables.
+    """
+    index = data if isinstance(data, ProductIndex) else ProductIndex(data)
+    counts = index.ends - index.starts
+    block_ids = np.repeat(np.arange(len(index)), counts)
+    block_start = index.starts[block_ids]
+    y = index.column('Sales').astype(float)
+    days = sales_dates(index.data).to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+    # Origins walk each product block in date order, whatever order the rows arrived in
+    if np.any((np.diff(days) < 0) & (np.diff(block_ids) == 0)):
+        order = np.lexsort((days, block_ids))
+        y, days = y[order], days[order]
+    valid = ~np.isnan(y)
+
+    first_day = np.minimum.reduceat(days, index.starts) if len(index) else np.empty(0, dtype=np.int64)
+    x = (days - first_day[block_ids]).astype(float)
+
+    # Missing sales add nothing to the sums and are not counted, so they cannot poison later origins
+    weights = valid.astype(float)
+    y_valid = np.where(valid, y, 0.0)
+    # Origins always fall inside their block, so "sum before the origin row" suffices
+    sums = tuple(_segment_cumsum(values, index.starts, block_ids)
+                 for values in (weights, y_valid, x * weights, x * x * weights, x * y_valid))
+
+    rows = np.arange(len(y))
+    per_product, overall = [], []
+    for position, method in enumerate(methods):
+        if method not in BACKTEST_METHODS:
+            raise ValueError(f"Unknown forecasting method: {method}")
+        errors = []
+        for step in range(horizon):
+            # Target row `rows` forecast `step + 1` rows ahead from this origin
+            origin = rows - step
+            usable = origin - block_start >= min_train
+            forecast = _origin_forecasts(method, rows[usable], origin[usable], block_start[usable],
+                                         sums, x, window, horizon)
+            errors.append((block_ids[usable], y[usable], forecast))
+            if progress is not None:
+                progress((position * horizon + step + 1) / (len(methods) * horizon))
+
+        product_ids = np.concatenate([ids for ids, _, _ in errors])
+        actual = np.concatenate([values for _, values, _ in errors])
+        forecast = np.concatenate([values for _, _, values in errors])
+        scored = ~np.isnan(forecast) & ~np.isnan(actual)
+        per_product.append(_metrics(product_ids[scored], actual[scored], forecast[scored], len(index))
+                           .assign(Product=index.products, Method=method))
+        overall.append(_metrics(np.zeros(scored.sum(), dtype=np.int64), actual[scored], forecast[scored], 1)
+                       .assign(Method=method))
+
+    per_product = pd.concat(per_product, ignore_index=True).set_index(['Product', 'Method'])[METRIC_COLUMNS]
+    overall = pd.concat(overall, ignore_index=True).set_index('Method')[METRIC_COLUMNS]
+    return per_product, overall
+
+def _metrics(group_ids, actual, forecast, groups):
+    errors = forecast - actual
+    count = np.bincount(group_ids, minlength=groups).astype(float)
+    nonzero = actual != 0
+    mape_count = np.bincount(group_ids[nonzero], minlength=groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return pd.DataFrame({
+            'MAE': np.bincount(group_ids, weights=np.abs(errors), minlength=groups) / count,
+            'RMSE': np.sqrt(np.bincount(group_ids, weights=errors * errors, minlength=groups) / count),
+            'MAPE': 100 * np.bincount(group_ids[nonzero], weights=np.abs(errors[nonzero] / actual[nonzero]),
+                                      minlength=groups) / mape_count,
+            'Forecasts': count.astype(np.int64),
+        })
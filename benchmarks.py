@@ -0,0 +1,190 @@
+"""
+Timing and memory benchmarks for the hot paths of the SCM tools.
+
+    python benchmarks.py --rows 10000 100000 1000000 --output bench.json
+    python benchmarks.py --rows 1000000 --compare bench.json
+
+Each benchmark reports the best wall time over --repeat runs and the peak
+traced allocation of one extra run; results are written as JSON so runs can
+be compared for regressions.
+"""
+import argparse
+import gc
+import importlib.util
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from allocation import allocate_matrix, allocate_resources
+from calendar_alignment import SalesCalendar
+from forecasting import basic_time_series_forecast, forecast_all_products, moving_average_forecast
+from product_index import ProductIndex
+from scheduling import schedule_allocations
+from synthetic_data import generate_sales_data
+
+TOOL_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "dataset-datageneratorfor-demandforcatsingtoolv1.py")
+
+def _load_tool_class():
+    # The tool lives in a script whose file name is not importable
+    spec = importlib.util.spec_from_file_location("demand_forecasting_tool", TOOL_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    # st.* calls outside a running app only log warnings; keep them out of the report
+    logging.disable(logging.WARNING)
+    return module.DemandForecastingTool
+
+def _measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+def _cases(rows, products):
+    """
+    Yield (name, callable) pairs for one dataset size.
+    """
+    days = max(rows // products, 1)
+    data = generate_sales_data(products=products, days=days, seed=0)
+    data['Product'] = data['Product'].astype(str)
+    csv_bytes = data.to_csv(index=False, date_format='%Y-%m-%d').encode()
+    index = ProductIndex(data)
+    first_product = index.products[0]
+
+    try:
+        tool_class = _load_tool_class()
+    except ImportError as error:
+        print(f"Skipping DemandForecastingTool benchmarks: {error}", file=sys.stderr)
+    else:
+        def load_data():
+            tool_class().load_data(io.BytesIO(csv_bytes))
+
+        def load_data_streaming():
+            tool_class().load_data(io.BytesIO(csv_bytes), streaming=True)
+
+        loaded = tool_class()
+        loaded.data = data
+
+        def preprocess_data():
+            loaded.product_index = None
+            loaded.preprocess_data(first_product)
+
+        yield "load_data", load_data
+        yield "load_data_streaming", load_data_streaming
+        yield "preprocess_data", preprocess_data
+
+    def moving_average_all_products():
+        for product in index.products:
+            moving_average_forecast(index.rows(product), window=5, forecast_days=7)
+
+    def basic_time_series_all_products():
+        for product in index.products:
+            basic_time_series_forecast(index.rows(product), forecast_days=7)
+
+    yield "moving_average_forecast", moving_average_all_products
+    yield "basic_time_series_forecast", basic_time_series_all_products
+    yield "forecast_all_products", lambda: forecast_all_products(index, method="Moving Average")
+    yield "align_calendar", lambda: SalesCalendar(index, fill="Interpolate")
+
+    # One resource per product, demand from the last day of sales
+    demand = dict(zip(index.products, index.column('Sales')[index.ends - 1].astype(float)))
+    available = {resource: amount * 0.8 for resource, amount in demand.items()}
+    yield "allocate_resources", lambda: allocate_resources(demand, available)
+
+    # Every product stocked at ten sites in three priority tiers
+    site_demand = np.outer(index.column('Sales')[index.ends - 1].astype(float), np.linspace(0.5, 1.5, 10))
+    site_priorities = np.arange(site_demand.size).reshape(site_demand.shape) % 3 + 1
+    capacity = site_demand.sum(axis=1) * 0.8
+    yield "allocate_matrix", lambda: allocate_matrix(site_demand, capacity, site_priorities)
+
+    # A year of daily orders for the first products, replenished at 90% of mean sales
+    history = data[data['Date'] > data['Date'].max() - pd.Timedelta(days=365)]
+    history = history[history['Product'].isin(index.products[:20])]
+    orders = history.rename(columns={'Product': 'Resource', 'Sales': 'Quantity'})
+    orders['Quantity'] = orders['Quantity'].fillna(0)
+    replenishment = orders.groupby('Resource', as_index=False)['Quantity'].mean()
+    replenishment['Capacity'] = replenishment.pop('Quantity') * 0.9
+    yield "schedule_allocations", lambda: schedule_allocations(orders, replenishment)
+
+def run_benchmarks(sizes, products=1000, repeat=3, only=None):
+    """
+    Run every benchmark at every row count and return the result records.
+    """
+    results = []
+    for rows in sizes:
+        size_products = min(products, rows)
+        for name, function in _cases(rows, size_products):
+            if only and name not in only:
+                continue
+            seconds, peak_bytes = _measure(function, repeat)
+            results.append({
+                "benchmark": name,
+                "rows": rows,
+                "products": size_products,
+                "seconds": seconds,
+                "rows_per_second": rows / seconds if seconds else None,
+                "peak_bytes": peak_bytes,
+            })
+            print(f"{name:<28} rows={rows:>10} {seconds:9.4f}s peak={peak_bytes / 1e6:9.1f} MB", file=sys.stderr)
+    return results
+
+def compare(results, baseline_path):
+    """
+    Print the time and memory ratio of each result against a saved run.
+    """
+    with open(baseline_path) as baseline_file:
+        baseline = {(record["benchmark"], record["rows"]): record for record in json.load(baseline_file)["results"]}
+    for record in results:
+        previous = baseline.get((record["benchmark"], record["rows"]))
+        if previous is None:
+            continue
+        print(f"{record['benchmark']:<28} rows={record['rows']:>10} "
+              f"time x{record['seconds'] / previous['seconds']:.2f} "
+              f"memory x{record['peak_bytes'] / max(previous['peak_bytes'], 1):.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the SCM tool hot paths.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="Run only these benchmarks")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a previous JSON results file")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.rows, args.products, args.repeat, args.only)
+    if args.output:
+        report = {
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.machine(),
+            "results": results,
+        }
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
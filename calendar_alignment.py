@@ -0,0 +1,190 @@
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ingest import sales_dates
+from product_index import ProductIndex
+from rollups import covered_days, period_lengths, period_numbers, period_start_dates
+
+FILL_RULES = ("Zero", "Forward Fill", "Interpolate", "Missing")
+AGGREGATIONS = ("Sum", "Mean", "Last")
+DEFAULT_MAX_CELLS = 100_000_000  # products x periods, 800 MB of float64
+MEMO_BYTES = 1024 ** 3  # Calendars kept in process, by array bytes
+
+def _fill_gaps(values, observed, first, fill):
+    """
+    Fill the unobserved cells of a (products, periods) array in place.
+    Cells before a product's first sale stay NaN whatever the rule: the
+    product was not on sale yet. "Interpolate" holds the last value after a
+    product's final sale, where there is nothing to interpolate towards.
+    """
+    columns = np.arange(values.shape[1])
+    values[~observed] = 0.0 if fill == "Zero" else np.nan
+    if fill in ("Forward Fill", "Interpolate"):
+        rows = np.arange(len(values))[:, None]
+        previous = np.maximum.accumulate(np.where(observed, columns, 0), axis=1)
+        filled = values[rows, previous]
+        if fill == "Interpolate":
+            width = values.shape[1]
+            following = np.minimum.accumulate(np.where(observed, columns, width)[:, ::-1], axis=1)[:, ::-1]
+            inside = ~observed & (following < width)
+            next_values = values[rows, np.minimum(following, width - 1)]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                weight = (columns - previous) / (following - previous)
+            filled = np.where(inside, filled + weight * (next_values - filled), filled)
+        values[:] = filled
+    values[columns < first[:, None]] = np.nan
+
+# Calendar Alignment
+class SalesCalendar:
+    """
+    Sales of every product on one shared calendar: a dense (products, periods)
+    array with a column per day (or week, month, quarter) from the first to
+    the last date in the data. Rows may arrive in any order, duplicate dates
+    of a product are aggregated, and periods without a row are filled by a
+    fill rule, so forecast kernels can read windows as plain array slices.
+    """
+    def __init__(self, data, resolution="Daily", fill="Zero", aggregate="Sum", max_cells=DEFAULT_MAX_CELLS):
+        if fill not in FILL_RULES:
+            raise ValueError(f"Unknown fill rule: {fill}")
+        if aggregate not in AGGREGATIONS:
+            raise ValueError(f"Unknown aggregation: {aggregate}")
+        index = data if isinstance(data, ProductIndex) else ProductIndex(data)
+        products = len(index)
+        codes = np.repeat(np.arange(products), index.ends - index.starts)
+        dates = sales_dates(index.data).to_numpy(dtype='datetime64[ns]')
+        sales = index.column('Sales').astype(float)
+        valid = ~np.isnan(sales) & ~np.isnat(dates)
+        codes, dates, sales = codes[valid], dates[valid], sales[valid]
+        periods = period_numbers(dates, resolution)
+
+        start = int(periods.min()) if len(periods) else 0
+        width = int(periods.max()) - start + 1 if len(periods) else 0
+        if products * width > max_cells:
+            raise ValueError(f"Aligning {products} products over {width} periods needs {products * width:,} cells; "
+                             "choose a coarser resolution.")
+
+        # One flat cell per (product, period); bincount aggregates duplicates in any row order
+        cells = codes * width + (periods - start)
+        counts = np.bincount(cells, minlength=products * width)
+        if aggregate == "Last":
+            order = np.argsort(cells, kind='stable')
+            last = order[np.append(cells[order][1:] != cells[order][:-1], True)] if len(cells) else order
+            values = np.full(products * width, np.nan)
+            values[cells[last]] = sales[last]
+        else:
+            # bincount of no cells returns integers, whatever the weights
+            values = np.bincount(cells, weights=sales, minlength=products * width).astype(float, copy=False)
+            if aggregate == "Mean":
+                values /= np.maximum(counts, 1)
+
+        self.products = index.products
+        self.resolution = resolution
+        self.fill = fill
+        self.aggregate = aggregate
+        self.periods = np.arange(start, start + width)
+        self.dates = pd.DatetimeIndex(period_start_dates(self.periods, resolution), name='Date')
+        self.observed = counts.reshape(products, width) > 0
+        self.rows = np.bincount(codes, minlength=products)
+        seen = self.observed.any(axis=1)
+        # argmax has nothing to scan when the frame holds no dated sales
+        self.first = np.where(seen, self.observed.argmax(axis=1), width) if width else np.zeros(products, dtype=np.int64)
+        self.values = values.reshape(products, width)
+        if aggregate == "Sum" and resolution != "Daily" and seen.any():
+            self._scale_edges(codes, dates, seen)
+        _fill_gaps(self.values, self.observed, self.first, fill)
+        self._positions = {product: position for position, product in enumerate(self.products)}
+
+    def _scale_edges(self, codes, dates, seen):
+        """
+        Scale the first and last period of every product to a full-period
+        rate, as rollup does: they usually cover only part of the period.
+        """
+        products = np.flatnonzero(seen)
+        days = dates.astype('datetime64[D]').astype(np.int64)
+        first_day = np.full(len(self.products), np.iinfo(np.int64).max)
+        last_day = np.full(len(self.products), np.iinfo(np.int64).min)
+        np.minimum.at(first_day, codes, days)
+        np.maximum.at(last_day, codes, days)
+        last = self.observed.shape[1] - 1 - self.observed[:, ::-1].argmax(axis=1)
+        # A product that sold within a single period has one edge, scaled once
+        two_edges = products[last[products] != self.first[products]]
+        for rows, columns in ((products, self.first[products]), (two_edges, last[two_edges])):
+            numbers = self.periods[columns]
+            coverage = covered_days(numbers, first_day[rows], last_day[rows], self.resolution)
+            self.values[rows, columns] *= period_lengths(numbers, self.resolution) / np.maximum(coverage, 1)
+
+    def __len__(self):
+        return len(self.products)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.observed.nbytes
+
+    def __contains__(self, product):
+        return product in self._positions
+
+    def positions(self, products=None):
+        """
+        Return row positions for the given products (all when None),
+        skipping products that are not in the data.
+        """
+        if products is None:
+            return np.arange(len(self.products))
+        return np.array([self._positions[product] for product in products if product in self._positions],
+                        dtype=np.int64)
+
+    def tail(self, count, positions=None):
+        """
+        The last `count` periods of the given rows as a (rows, count) matrix,
+        NaN-padded on the left when the calendar is shorter.
+        """
+        values = self.values if positions is None else self.values[positions]
+        if count <= values.shape[1]:
+            return values[:, values.shape[1] - count:]
+        return np.pad(values, ((0, 0), (count - values.shape[1], 0)), constant_values=np.nan)
+
+    def series(self, product):
+        """
+        One product's aligned sales as a date-indexed Series, from its first sale.
+        """
+        position = self._positions.get(product)
+        if position is None:
+            return pd.Series(dtype=float, index=self.dates[:0])
+        return pd.Series(self.values[position, self.first[position]:], index=self.dates[self.first[position]:],
+                         name='Sales')
+
+    def summary(self):
+        """
+        Data quality per product: input rows, periods with sales rows, rows
+        merged into an already dated period and periods without a row between
+        the first sale and the end of the calendar.
+        """
+        observed = self.observed.sum(axis=1)
+        return pd.DataFrame({
+            'Rows': self.rows,
+            'Observed Periods': observed,
+            'Duplicate Rows': self.rows - observed,
+            'Missing Periods': np.maximum(len(self.periods) - self.first - observed, 0),
+        }, index=pd.Index(self.products, name='Product'))
+
+_calendar_memo = OrderedDict()
+
+def sales_calendar_for(key, data, resolution="Daily", fill="Zero", aggregate="Sum", max_bytes=MEMO_BYTES):
+    """
+    Return the SalesCalendar of the dataset identified by key with these
+    settings, aligning it only on the first request in this process. The
+    least recently used calendars are dropped once the memo holds more than
+    max_bytes; the newest one is always kept.
+    """
+    memo_key = (key, resolution, fill, aggregate)
+    calendar = _calendar_memo.get(memo_key)
+    if calendar is None:
+        calendar = SalesCalendar(data, resolution, fill, aggregate)
+        _calendar_memo[memo_key] = calendar
+        while len(_calendar_memo) > 1 and sum(memo.nbytes for memo in _calendar_memo.values()) > max_bytes:
+            _calendar_memo.popitem(last=False)
+    else:
+        _calendar_memo.move_to_end(memo_key)
+    return calendar
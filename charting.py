@@ -0,0 +1,169 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import stage
+
+DEFAULT_MAX_POINTS = 1000  # Points per series sent to the browser / renderer
+DEFAULT_KEEP_RECENT = 90  # Most recent points always kept at full resolution
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: positions of `threshold` points that keep
+    the visual shape of the series (x, y). The first and last points are always
+    kept; each bucket in between contributes the point that forms the largest
+    triangle with the previous pick and the next bucket's mean.
+    """
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return np.arange(length)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, length - 1
+
+    # Means of every bucket up front; the next bucket of the last one is the final point
+    bucket_x = np.add.reduceat(x[:length - 1], edges[:-1]) / np.diff(edges)
+    bucket_y = np.add.reduceat(y[:length - 1], edges[:-1]) / np.diff(edges)
+    next_x = np.append(bucket_x[1:], x[-1])
+    next_y = np.append(bucket_y[1:], y[-1])
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        areas = np.abs((x[previous] - next_x[bucket]) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (next_y[bucket] - y[previous]))
+        previous = start + int(np.argmax(areas))
+        picked[bucket + 1] = previous
+    return picked
+
+def downsample_series(series, max_points=DEFAULT_MAX_POINTS, keep_recent=DEFAULT_KEEP_RECENT):
+    """
+    Shape-preserving downsample of a date-indexed series to at most
+    max_points points, keeping the last keep_recent points untouched.
+    """
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+
+    keep_recent = min(keep_recent, max_points - 3)
+    older, recent = series.iloc[:len(series) - keep_recent], series.iloc[len(series) - keep_recent:]
+    index = older.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(older))
+    picked = lttb_indices(x, older.to_numpy(dtype=float), max_points - keep_recent)
+    return pd.concat([older.iloc[picked], recent])
+
+# Chart Data Preparation
+def prepare_chart_data(columns, max_points=DEFAULT_MAX_POINTS, keep_recent=DEFAULT_KEEP_RECENT,
+                       full_resolution=()):
+    """
+    Downsample every series of a {name: series} chart mapping to the point
+    budget and return them in long format: one 'Date', 'Series', 'Sales' row
+    per plotted point. Series on different dates then share no padded grid of
+    empty cells. Series named in full_resolution (e.g. forecasts) pass through.
+    Plot with st.line_chart(chart, x='Date', y='Sales', color='Series').
+    """
+    parts = []
+    for name, series in columns.items():
+        series = series.dropna() if name in full_resolution else downsample_series(series, max_points, keep_recent)
+        parts.append(pd.DataFrame({'Date': series.index, 'Series': name, 'Sales': series.to_numpy(dtype=float)}))
+    if not parts:
+        return pd.DataFrame(columns=['Date', 'Series', 'Sales'])
+    return pd.concat(parts, ignore_index=True)
+
+DEFAULT_RENDER_CACHE_BYTES = 64 * 1024 ** 2
+
+def data_fingerprint(*parts):
+    """
+    SHA-256 of the plotted data: arrays, pandas objects, strings and numbers.
+    """
+    digest = hashlib.sha256()
+    pending = list(parts)
+    while pending:
+        part = pending.pop(0)
+        if isinstance(part, pd.DataFrame):
+            pending[:0] = [part.index, list(part.columns)] + [part[column] for column in part.columns]
+        elif isinstance(part, pd.Series):
+            pending[:0] = [part.index, part.to_numpy()]
+        elif isinstance(part, pd.Index):
+            pending.insert(0, part.to_numpy())
+        elif isinstance(part, np.ndarray):
+            if part.dtype == object:
+                pending[:0] = [str(value) for value in part]
+            else:
+                digest.update(str(part.dtype).encode())
+                digest.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, (list, tuple)):
+            pending[:0] = list(part)
+        else:
+            digest.update(repr(part).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+# Figure Rendering Service
+class FigureRenderer:
+    """
+    Renders matplotlib charts to PNG bytes and caches them by a fingerprint of
+    the plotted data. Figures are plain matplotlib.figure.Figure objects, never
+    registered with pyplot, and are cleared as soon as they are saved, so a
+    long-running server does not accumulate them. The cache is an LRU bounded
+    by total image bytes.
+    """
+    def __init__(self, max_bytes=DEFAULT_RENDER_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def render(self, key, draw, figsize=(10, 6), dpi=100):
+        """
+        Return PNG bytes for key, calling draw(fig, ax) to build the chart only
+        when it is not cached.
+        """
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+
+        from matplotlib.figure import Figure  # Deferred: only pages that plot pay for matplotlib
+
+        figure = Figure(figsize=figsize, dpi=dpi)
+        try:
+            with stage("matplotlib render"):
+                draw(figure, figure.subplots())
+                buffer = io.BytesIO()
+                figure.savefig(buffer, format='png')
+                image = buffer.getvalue()
+        finally:
+            figure.clf()
+
+        with self._lock:
+            self.misses += 1
+            if key not in self._images:
+                self._images[key] = image
+                self._size += len(image)
+            while self._size > self.max_bytes and self._images:
+                _, evicted = self._images.popitem(last=False)
+                self._size -= len(evicted)
+        return image
+
+_default_renderer = None
+
+def default_renderer():
+    """
+    Return the process-wide renderer shared by every Streamlit session.
+    """
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = FigureRenderer()
+    return _default_renderer
@@ -1,35 +1,80 @@
 # Import necessary libraries
+import uuid
+
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression
 from sklearn.metrics import mean_absolute_error, mean_squared_error
-import matplotlib.pyplot as plt
 import streamlit as st
 
+from backtesting import backtest_all_products
+from charting import data_fingerprint, default_renderer, downsample_series
+from dataset_cache import default_cache
+from incremental import IncrementalForecaster
+from instrumentation import stage, start_panel, timed
+from ingest import read_sales_csv_chunked, sales_dates
+from jobs import DONE, FAILED, default_job_manager
+from model_registry import ALL_PRODUCTS, default_registry
+from product_index import ProductIndex, product_index_for
+from rollups import RESOLUTIONS, period_numbers, rollup_index_for, shift_periods
+from synthetic_data import generate_sales_data
+from trend_models import fit_trend_models, forecast_all_trends, predict_trend
+
+JOB_TRAIN = "Train All Products"
+JOB_FORECAST = "Forecast All Products"
+JOB_BACKTEST = "Backtest All Products"
+MAX_JOBS_SHOWN = 10
+MAX_PREVIEW_ROWS = 1000
+
 # Main Tool Class
 class DemandForecastingTool:
+    # Parameters that identify a fitted model in the model registry
+    MODEL_PARAMS = {'model': 'LinearRegression', 'features': ['Days'], 'test_size': 0.2, 'random_state': 42}
+    BATCH_MODEL_PARAMS = {'model': 'trend', 'features': ['Days'], 'fit': 'all rows'}
+    INCREMENTAL_PARAMS = {'model': 'incremental', 'tail': 30}
+
     def __init__(self):
         self.model = LinearRegression()
         self.data = None  # Initialize data attribute
+        self.product_index = None
+        self.coefficients = None  # Batch-trained trend models, one row per product
+        self.incremental = None  # Forecast state updated by append_data
+        self.resolution = "Daily"  # Time step of self.data, see use_resolution
         self.X_train = None
         self.X_test = None
         self.y_train = None
         self.y_test = None
 
-    def load_data(self, file_path):
+    @timed()
+    def load_data(self, file_path, streaming=False):
         """
         Load the historical sales data from a CSV file.
         The CSV file should have columns: 'Date', 'Product', 'Sales'
+        With streaming=True the file is read in chunks into a compact frame
+        (categorical products, int32 'Day' offsets).
         """
+        if streaming:
+            try:
+                st.write("Loading data from the file in chunks...")
+                with stage("read_sales_csv_chunked"):
+                    self.data = read_sales_csv_chunked(file_path)
+                st.write("✅ Data loaded successfully.")
+                st.write(self.data.head())
+            except Exception as e:
+                st.error(f"Error loading data: {e}")
+            return
+
         try:
             # Load data from the CSV file
             st.write("Loading data from the file...")
-            self.data = pd.read_csv(file_path)
+            with stage("pd.read_csv"):
+                self.data = pd.read_csv(file_path)
             
             # Check if the necessary columns exist
             if not {'Date', 'Product', 'Sales'}.issubset(self.data.columns):
                 st.error("CSV file must contain 'Date', 'Product', and 'Sales' columns.")
+                self.data = None
                 return
 
             # Convert 'Date' to datetime and handle errors gracefully
@@ -44,6 +89,39 @@ class DemandForecastingTool:
         except Exception as e:
             st.error(f"Error loading data: {e}")
 
+    def use_resolution(self, resolution, level_index):
+        """
+        Work on a rolled-up level (e.g. weekly totals) instead of daily rows.
+        Days then count periods of that resolution and forecasts step by period.
+        """
+        self.resolution = resolution
+        self.data = level_index.source
+        self.product_index = level_index
+
+    def model_params(self):
+        return {**self.MODEL_PARAMS, 'resolution': self.resolution}
+
+    def batch_model_params(self):
+        return {**self.BATCH_MODEL_PARAMS, 'resolution': self.resolution}
+
+    def incremental_params(self):
+        return {**self.INCREMENTAL_PARAMS, 'resolution': self.resolution}
+
+    def get_product_index(self):
+        """
+        Return the product index of the loaded data, building it once per dataset.
+        """
+        if self.product_index is None or self.product_index.source is not self.data:
+            self.product_index = ProductIndex(self.data)
+        return self.product_index
+
+    def product_rows(self, product_name):
+        """
+        Return the rows of one product as a slice of the product index.
+        """
+        return self.get_product_index().rows(product_name)
+
+    @timed()
     def preprocess_data(self, product_name):
         """
         Filter data for a specific product and prepare features for modeling.
@@ -54,13 +132,19 @@ class DemandForecastingTool:
         
         try:
             st.write(f"Preprocessing data for {product_name}...")
-            product_data = self.data[self.data['Product'] == product_name]
+            with stage("product filter"):
+                product_data = self.product_rows(product_name)
             if product_data.empty:
                 st.error(f"No data found for product: {product_name}")
                 return
 
-            # Convert dates to days since the first date
-            product_data['Days'] = (product_data['Date'] - product_data['Date'].min()).dt.days
+            # Convert dates to days (or periods, for rolled-up data) since the first date
+            product_dates = sales_dates(product_data)
+            if self.resolution == "Daily":
+                product_data = product_data.assign(Days=(product_dates - product_dates.min()).dt.days)
+            else:
+                periods = period_numbers(product_dates.to_numpy(), self.resolution)
+                product_data = product_data.assign(Days=periods - periods.min())
 
             # Prepare features (X) and target (y)
             X = product_data[['Days']]
@@ -72,6 +156,7 @@ class DemandForecastingTool:
         except Exception as e:
             st.error(f"Error in preprocessing: {e}")
 
+    @timed()
     def train_model(self):
         """
         Train the linear regression model using the preprocessed data.
@@ -79,13 +164,68 @@ class DemandForecastingTool:
         if self.X_train is not None and self.y_train is not None:
             try:
                 st.write("Training the model...")
-                self.model.fit(self.X_train, self.y_train)
+                with stage("LinearRegression.fit"):
+                    self.model.fit(self.X_train, self.y_train)
                 st.write("✅ Model training completed.")
             except Exception as e:
                 st.error(f"Error during model training: {e}")
         else:
             st.error("Data not preprocessed. Please preprocess data before training the model.")
 
+    def is_trained(self):
+        return hasattr(self.model, 'coef_')
+
+    def restore_models(self, registry, dataset_key, product_name):
+        """
+        Load previously fitted models for this dataset and product from the registry.
+        """
+        model = registry.get(dataset_key, product_name, self.model_params())
+        if model is not None:
+            self.model = model
+        coefficients = registry.get(dataset_key, ALL_PRODUCTS, self.batch_model_params())
+        if coefficients is not None:
+            self.coefficients = coefficients
+        incremental = registry.get(dataset_key, ALL_PRODUCTS, self.incremental_params())
+        if incremental is not None:
+            self.incremental = incremental
+            self.coefficients = incremental.trend_coefficients()
+
+    def append_data(self, new_rows, batch_key=None):
+        """
+        Add newly arrived sales rows without reprocessing the history.
+        The incremental state is built from the loaded data on first use; afterwards
+        each append costs O(new rows) and refreshes the batch trend models.
+        """
+        if self.data is None:
+            st.error("Data not loaded. Please upload a file.")
+            return
+        if self.resolution != "Daily":
+            st.error("New sales rows are daily; switch to the Daily resolution to append them.")
+            return
+        try:
+            if self.incremental is None:
+                self.incremental = IncrementalForecaster.from_history(self.get_product_index())
+            self.incremental.append(new_rows, batch_key=batch_key)
+            self.coefficients = self.incremental.trend_coefficients()
+            st.write(f"✅ Forecast state updated with {len(new_rows)} new rows.")
+        except Exception as e:
+            st.error(f"Error appending data: {e}")
+
+    def train_all_products(self, processes=None):
+        """
+        Fit the trend model for every product in one vectorized pass.
+        The coefficient table lets forecast() answer for any product without refitting.
+        """
+        if self.data is None:
+            st.error("Data not loaded. Please upload a file.")
+            return
+        try:
+            st.write("Training models for all products...")
+            self.coefficients = fit_trend_models(self.get_product_index(), processes=processes)
+            st.write(f"✅ Trained {len(self.coefficients)} product models.")
+        except Exception as e:
+            st.error(f"Error during batch training: {e}")
+
     def evaluate_model(self):
         """
         Evaluate the model's performance on test data.
@@ -106,10 +246,37 @@ class DemandForecastingTool:
         else:
             st.error("Model not trained. Please train the model before evaluation.")
 
-    def forecast(self, days_ahead):
+    def backtest(self, horizon=7, window=5, min_train=14):
+        """
+        Rolling-origin backtest of moving average, last-N mean and linear trend
+        across all products, without the leakage of a shuffled train/test split.
+        """
+        if self.data is None:
+            st.error("Data not loaded. Please upload a file.")
+            return None, None
+        try:
+            per_product, overall = backtest_all_products(self.get_product_index(), horizon=horizon,
+                                                         window=window, min_train=min_train)
+            st.write("📊 Backtest (rolling origin, expanding window):")
+            st.dataframe(overall)
+            st.dataframe(per_product)
+            return per_product, overall
+        except Exception as e:
+            st.error(f"Error during backtesting: {e}")
+            return None, None
+
+    @timed()
+    def forecast(self, days_ahead, product_name=None):
         """
         Predict sales for a given number of days ahead.
+        When product_name has a batch-trained model, it is used instead of the single-product model.
         """
+        if product_name is not None and self.coefficients is not None and self.resolution == "Daily" \
+                and product_name in self.coefficients.index:
+            forecast_df = predict_trend(self.coefficients, product_name, days_ahead)
+            st.write("🔮 Forecast completed:")
+            st.dataframe(forecast_df)
+            return forecast_df
         if self.X_train is not None:
             try:
                 max_days = self.X_train['Days'].max()
@@ -129,6 +296,7 @@ class DemandForecastingTool:
         else:
             st.error("Model not trained. Please train the model before forecasting.")
 
+    @timed()
     def plot_forecast(self, product_name, forecast_df):
         """
         Plot historical sales data and forecasted sales.
@@ -136,59 +304,209 @@ class DemandForecastingTool:
         if self.data is not None and not forecast_df.empty:
             try:
                 # Get product-specific data
-                product_data = self.data[self.data['Product'] == product_name]
+                product_data = self.product_rows(product_name)
+                product_dates = sales_dates(product_data)
                 
-                # Plot the historical sales data
-                plt.figure(figsize=(10, 6))
-                plt.plot(product_data['Date'], product_data['Sales'], label='Historical Sales', color='blue')
+                history = downsample_series(pd.Series(product_data['Sales'].to_numpy(), index=product_dates))
 
-                # Generate forecast dates
-                forecast_dates = pd.date_range(start=product_data['Date'].max(), periods=len(forecast_df) + 1, freq='D')[1:]
-                
-                # Plot the forecasted sales
-                plt.plot(forecast_dates, forecast_df['Predicted Sales'], label='Forecasted Sales', color='red', linestyle='--')
-
-                # Add labels, title, and grid
-                plt.xlabel('Date')
-                plt.ylabel('Sales')
-                plt.title(f'Sales Forecast for {product_name}')
-                plt.legend()
-                plt.grid(True)
-                plt.xticks(rotation=45)
-                plt.tight_layout()
-
-                st.pyplot(plt)  # Display the plot in Streamlit
+                # Generate forecast dates, after any rows appended since the data was loaded
+                if self.resolution == "Daily":
+                    last_date = product_dates.max()
+                    if self.coefficients is not None and 'LastDate' in self.coefficients.columns \
+                            and product_name in self.coefficients.index:
+                        last_date = max(last_date, self.coefficients.loc[product_name, 'LastDate'])
+                    forecast_dates = pd.date_range(start=last_date, periods=len(forecast_df) + 1, freq='D')[1:]
+                else:
+                    forecast_dates = shift_periods([product_dates.max()], np.arange(1, len(forecast_df) + 1),
+                                                   self.resolution)[0]
+                predicted = forecast_df['Predicted Sales'].to_numpy(dtype=float)
+
+                def draw(fig, ax):
+                    # Plot the historical and forecasted sales
+                    ax.plot(history.index, history.values, label='Historical Sales', color='blue')
+                    ax.plot(forecast_dates, predicted, label='Forecasted Sales', color='red', linestyle='--')
+
+                    # Add labels, title, and grid
+                    ax.set_xlabel('Date')
+                    ax.set_ylabel('Sales')
+                    ax.set_title(f'Sales Forecast for {product_name}')
+                    ax.legend()
+                    ax.grid(True)
+                    ax.tick_params(axis='x', labelrotation=45)
+                    fig.tight_layout()
+
+                # Re-rendering the same data returns the cached image
+                key = data_fingerprint("plot_forecast", product_name, history, forecast_dates, predicted)
+                st.image(default_renderer().render(key, draw, figsize=(10, 6)))  # Display the plot in Streamlit
             except Exception as e:
                 st.error(f"Error during plotting: {e}")
         else:
             st.error("No valid data or forecast to plot.")
 
+# Background Jobs
+def train_all_products_job(registry, dataset_key, index, params, progress=None):
+    """
+    Fit every product's trend model and register the coefficient table.
+    """
+    coefficients = fit_trend_models(index, progress=progress)
+    registry.put(dataset_key, ALL_PRODUCTS, params, coefficients)
+    return coefficients
+
+def forecast_all_products_job(index, horizon, coefficients=None, progress=None):
+    """
+    Trend forecasts for the whole catalog, with their CSV export prepared off the script thread.
+    """
+    forecast = forecast_all_trends(index, horizon, coefficients=coefficients, progress=progress)
+    return forecast, forecast.to_csv(index=False, date_format='%Y-%m-%d')
+
+def session_owner():
+    """
+    Id under which this browser session's jobs are listed.
+    """
+    if 'job_owner' not in st.session_state:
+        st.session_state.job_owner = uuid.uuid4().hex
+    return st.session_state.job_owner
+
+def show_job_result(job):
+    if job.kind == JOB_TRAIN:
+        st.write(f"✅ Trained {len(job.result)} product models.")
+    elif job.kind == JOB_BACKTEST:
+        per_product, overall = job.result
+        st.write("📊 Backtest (rolling origin, expanding window):")
+        st.dataframe(overall)
+        st.dataframe(per_product)
+    elif job.kind == JOB_FORECAST:
+        forecast, csv = job.result
+        st.write(f"🔮 {len(forecast)} forecasts for {forecast['Product'].nunique()} products:")
+        st.dataframe(forecast.head(MAX_PREVIEW_ROWS))
+        st.download_button("Download Forecasts", csv, file_name="forecasts.csv", mime="text/csv",
+                           key=f"download_job:{job.id}")
+
+def show_jobs(manager, owner):
+    """
+    Progress, cancellation and results of this session's background jobs.
+    Every rerun (for example from the Refresh button) polls their state.
+    """
+    jobs = manager.jobs(owner)[:MAX_JOBS_SHOWN]
+    if not jobs:
+        return
+    st.subheader("⏳ Background Jobs")
+    st.button("Refresh Jobs")
+    for job in jobs:
+        with st.expander(f"{job.label}: {job.status}", expanded=job is jobs[0]):
+            st.progress(job.progress)
+            st.caption(f"{job.seconds():.1f} s")
+            if job.status == DONE:
+                show_job_result(job)
+            elif job.status == FAILED:
+                st.error(f"Job failed: {job.error}")
+            elif job.cancel_requested:
+                st.write("Cancelling...")
+            elif st.button("Cancel", key=f"cancel_job:{job.id}"):
+                manager.cancel(job.id)
+
 # Main streamlit interface to interact with
 def main():
+    panel = start_panel("Sales Forecasting Tool")
+    try:
+        sales_forecasting_page()
+        show_jobs(default_job_manager(), session_owner())
+    finally:
+        panel.render()
+
+def sales_forecasting_page():
     st.title('Sales Forecasting Tool')
 
+    # Generate a synthetic dataset to try the tool or measure how it scales
+    with st.sidebar.expander("Generate Synthetic Data"):
+        products = st.number_input("Products", min_value=1, max_value=100000, value=20)
+        days = st.number_input("Days of history", min_value=1, max_value=3650, value=365)
+        trend = st.number_input("Daily trend", value=0.05)
+        seasonality = st.number_input("Seasonal amplitude", min_value=0.0, value=10.0)
+        noise = st.number_input("Noise (std)", min_value=0.0, value=5.0)
+        missing_rate = st.slider("Missing days", 0.0, 0.5, 0.0)
+        if st.button("Generate"):
+            synthetic = generate_sales_data(int(products), int(days), trend=trend, seasonality=seasonality,
+                                            noise=noise, missing_rate=missing_rate)
+            st.download_button("Download CSV", synthetic.to_csv(index=False, date_format='%Y-%m-%d'),
+                               file_name="synthetic_sales.csv", mime="text/csv")
+
     # Upload CSV file
     uploaded_file = st.file_uploader("Upload a CSV file", type=['csv'])
+    streaming = st.checkbox("Streaming ingest (large files)", value=False)
     
     tool = DemandForecastingTool()
 
     if uploaded_file:
-        tool.load_data(uploaded_file)
+        # Reuse the cleaned frame from an earlier rerun or session when possible
+        cache = default_cache()
+        cache_key = cache.key_for(uploaded_file.getvalue(), f"DemandForecastingTool.load_data:{streaming}")
+
+        def load_cleaned_data():
+            data = cache.get(cache_key)
+            if data is None:
+                tool.load_data(uploaded_file, streaming=streaming)
+                data = tool.data
+                if data is not None:
+                    cache.put(cache_key, data)
+            return data
+
+        tool.product_index = product_index_for(cache_key, load_cleaned_data)
+        st.sidebar.caption(f"Dataset cache: {cache.hits} hits, {cache.misses} misses")
+        if tool.product_index is None:
+            return
+        tool.data = tool.product_index.source
+
+        # Weekly and coarser views read a precomputed rollup level instead of the raw rows
+        resolution = st.sidebar.selectbox("Resolution", RESOLUTIONS)
+        if resolution != "Daily":
+            tool.use_resolution(resolution, rollup_index_for(cache, cache_key, tool.product_index, resolution))
         
-        product_name = st.selectbox("Select a product", tool.data['Product'].unique())
+        product_name = st.selectbox("Select a product", tool.product_index.products)
         
+        # Fitted models survive reruns and sessions through the registry
+        registry = default_registry()
+        # Long runs go to the shared job pool; their results outlive the rerun that started them
+        jobs = default_job_manager()
+        owner = session_owner()
         if product_name:
             tool.preprocess_data(product_name)
+            tool.restore_models(registry, cache_key, product_name)
         
         if st.button("Train Model"):
             tool.train_model()
+            if tool.is_trained():
+                registry.put(cache_key, product_name, tool.model_params(), tool.model)
+
+        if st.button("Train All Products"):
+            jobs.submit(owner, JOB_TRAIN, train_all_products_job, registry, cache_key, tool.get_product_index(),
+                        tool.batch_model_params(), key=(owner, JOB_TRAIN, cache_key, resolution))
+        
+        # Append only the newly arrived days of sales to the stored forecast state
+        new_rows_file = st.file_uploader("Append new sales rows (optional)", type=['csv'])
+        if new_rows_file:
+            new_rows = pd.read_csv(new_rows_file)
+            new_rows['Date'] = pd.to_datetime(new_rows['Date'], errors='coerce')
+            new_rows = new_rows.dropna(subset=['Date', 'Sales']).sort_values(by='Date')
+            tool.append_data(new_rows, batch_key=cache.key_for(new_rows_file.getvalue()))
+            if tool.incremental is not None:
+                registry.put(cache_key, ALL_PRODUCTS, tool.incremental_params(), tool.incremental)
         
         if st.button("Evaluate Model"):
             tool.evaluate_model()
         
-        days_ahead = st.number_input("Days Ahead for Forecast", min_value=1, max_value=30, value=7)
+        days_ahead = st.number_input("Days Ahead for Forecast" if resolution == "Daily"
+                                     else f"Periods Ahead for Forecast ({resolution})", min_value=1, max_value=30, value=7)
+        if st.button("Backtest All Products"):
+            jobs.submit(owner, JOB_BACKTEST, backtest_all_products, tool.get_product_index(), horizon=days_ahead,
+                        label=f"{JOB_BACKTEST} ({days_ahead} steps, {resolution.lower()})",
+                        key=(owner, JOB_BACKTEST, cache_key, resolution, days_ahead))
+        if resolution == "Daily" and st.button("Forecast All Products"):
+            jobs.submit(owner, JOB_FORECAST, forecast_all_products_job, tool.get_product_index(), days_ahead,
+                        coefficients=tool.coefficients, label=f"{JOB_FORECAST} ({days_ahead} days)",
+                        key=(owner, JOB_FORECAST, cache_key, days_ahead))
         if st.button("Forecast"):
-            forecast_df = tool.forecast(days_ahead)
+            forecast_df = tool.forecast(days_ahead, product_name)
             if forecast_df is not None:
                 tool.plot_forecast(product_name, forecast_df)
 
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "scm-tools", "datasets")
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+META_FILE = "meta.json"
+
+def _directory_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+# Dataset Cache
+class DatasetCache:
+    """
+    Disk cache of parsed sales frames keyed by a hash of the uploaded bytes.
+    Every column is stored as its own .npy file and loaded memory-mapped, so a
+    hit costs little more than opening the files. Entries are evicted least
+    recently used first once the cache grows past max_bytes.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(content, namespace=""):
+        """
+        Hash the raw file bytes together with a namespace naming the loader,
+        so different parsers of the same file get separate entries.
+        """
+        digest = hashlib.sha256(namespace.encode("utf-8"))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _entry_path(self, key):
+        # Keys may hold characters that are not valid in file names (rollup keys contain ':')
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def get(self, key):
+        """
+        Return the cached frame for key, or None on a miss.
+        """
+        path = self._entry_path(key)
+        meta_path = os.path.join(path, META_FILE)
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            frame = self._read_frame(path, meta)
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+        os.utime(meta_path)  # Mark as recently used for LRU eviction
+        self.hits += 1
+        return frame
+
+    def put(self, key, frame):
+        """
+        Store frame under key, then evict old entries if over the size budget.
+        """
+        path = self._entry_path(key)
+        staging = tempfile.mkdtemp(dir=self.cache_dir, prefix=".tmp-")
+        try:
+            self._write_frame(staging, frame)
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(staging, path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self.evict()
+
+    def get_or_load(self, content, loader, namespace="", key=None):
+        """
+        Return the cached frame for content, calling loader(content) and
+        caching its result on a miss. Pass key when it is already computed.
+        Frames the cache cannot store faithfully are returned uncached.
+        """
+        if key is None:
+            key = self.key_for(content, namespace)
+        frame = self.get(key)
+        if frame is None:
+            frame = loader(content)
+            if frame is not None:
+                try:
+                    self.put(key, frame)
+                except ValueError:
+                    pass
+        return frame
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            meta_path = os.path.join(entry.path, META_FILE)
+            if entry.is_dir() and os.path.exists(meta_path):
+                entries.append((os.stat(meta_path).st_mtime, _directory_size(entry.path), entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    @staticmethod
+    def _write_frame(path, frame):
+        index_names = [name if name is not None else "index" for name in frame.index.names]
+        flat = frame.reset_index()
+        flat.columns = index_names + list(frame.columns)
+
+        columns = []
+        for position, name in enumerate(flat.columns):
+            series = flat[name]
+            if isinstance(series.dtype, pd.CategoricalDtype) or not isinstance(series.dtype, np.dtype) \
+                    or series.dtype.kind not in "biufmM":
+                # Categoricals and everything else are stored as codes plus their categories
+                is_category = isinstance(series.dtype, pd.CategoricalDtype)
+                categorical = pd.Categorical(series)
+                column = {"name": name, "kind": "category" if is_category else "object",
+                          "dtype": "category" if is_category else str(series.dtype),
+                          "ordered": bool(categorical.ordered)}
+                categories = categorical.categories
+                if isinstance(categories.dtype, np.dtype) and categories.dtype.kind in "biufmM":
+                    np.save(os.path.join(path, f"{position}.categories.npy"), categories.to_numpy())
+                else:
+                    values = categories.tolist()
+                    if not all(isinstance(value, str) for value in values):
+                        raise ValueError(f"Column {name!r} holds values the dataset cache cannot store.")
+                    column["categories"] = values
+                np.save(os.path.join(path, f"{position}.npy"), categorical.codes)
+                columns.append(column)
+            else:
+                np.save(os.path.join(path, f"{position}.npy"), series.to_numpy())
+                columns.append({"name": name, "kind": "array"})
+
+        meta = {"columns": columns, "index": index_names}
+        with open(os.path.join(path, META_FILE), "w") as meta_file:
+            json.dump(meta, meta_file)
+
+    @staticmethod
+    def _read_frame(path, meta):
+        data = {}
+        for position, column in enumerate(meta["columns"]):
+            # Copy-on-write mapping: pages load lazily and writes stay private
+            values = np.load(os.path.join(path, f"{position}.npy"), mmap_mode="c")
+            if column["kind"] == "array":
+                data[column["name"]] = values
+                continue
+            categories = column.get("categories")
+            if categories is None:
+                categories = np.load(os.path.join(path, f"{position}.categories.npy"))
+            categorical = pd.Categorical.from_codes(values, categories, ordered=column.get("ordered", False))
+            dtype = column.get("dtype", "object")
+            if column["kind"] == "category":
+                data[column["name"]] = categorical
+            elif dtype == "object":
+                data[column["name"]] = np.asarray(categorical, dtype=object)
+            else:
+                data[column["name"]] = pd.array(np.asarray(categorical, dtype=object), dtype=dtype)
+        frame = pd.DataFrame(data, copy=False)
+        frame.set_index(meta["index"], inplace=True)
+        if meta["index"] == ["index"]:
+            frame.index.name = None
+        return frame
+
+_default_cache = None
+
+def default_cache():
+    """
+    Return the process-wide cache shared by every Streamlit session.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DatasetCache()
+    return _default_cache
@@ -1,21 +1,16 @@
 import streamlit as st
-import pandas as pd
-
-# Moving Average Forecast Function
-def moving_average_forecast(data, window=5, forecast_days=7):
-    historical = data['Sales'].rolling(window=window).mean().iloc[-forecast_days:].values
-    forecast = historical[-1] if len(historical) > 0 else 0
-    return [forecast] * forecast_days
-
-# Basic Time Series Forecasting Function
-def basic_time_series_forecast(data, forecast_days=7):
-    # Use the mean of the last observed data points as the forecast
-    last_values = data['Sales'].iloc[-forecast_days:]
-    if len(last_values) > 0:
-        forecast = last_values.mean()
-    else:
-        forecast = 0
-    return [forecast] * forecast_days
+
+from accuracy import ACCURACY_METRICS, compare_forecasts, holdout_forecasts, leaderboard, rank_sources
+from calendar_alignment import SalesCalendar
+from charting import prepare_chart_data
+from dataset_cache import default_cache
+from forecasting import FORECAST_METHODS, forecast_all_products
+from instrumentation import start_panel
+from rollups import rollup_index_for
+from sales_views import load_sales_index, sales_view_sidebar
+MAX_LEADERBOARD_ROWS = 1000
+
+panel = start_panel("Time Series Forecasting Tool")
 
 # Streamlit Application
 st.title("Time Series Forecasting Tool")
@@ -32,52 +27,102 @@ if page == "Forecasting Tool":
 
     if uploaded_historical_file:
         # Load and preprocess historical data
-        historical_data = pd.read_csv(uploaded_historical_file)
-        historical_data['Date'] = pd.to_datetime(historical_data['Date'])
-        historical_data.set_index('Date', inplace=True)
+        dataset_key, historical_index = load_sales_index(uploaded_historical_file.getvalue())
+        resolution, historical_index, source = sales_view_sidebar(dataset_key, historical_index)
 
         # Select Multiple Products
-        selected_products = st.multiselect('Select Products', historical_data['Product'].unique())
+        selected_products = st.multiselect('Select Products', historical_index.products)
 
         if selected_products:
-            forecast_days = st.slider('Forecast Days', min_value=1, max_value=30, value=7)
+            forecast_days = st.slider('Forecast Days' if resolution == "Daily" else f'Forecast Periods ({resolution})',
+                                      min_value=1, max_value=30, value=7)
 
             # Allow users to select forecast method
-            forecast_method = st.radio("Select Forecasting Method", ("Moving Average", "Time Series"))
+            forecast_method = st.radio("Select Forecasting Method", FORECAST_METHODS)
+
+            # Method-specific settings
+            method_options = {}
+            if forecast_method == "Weighted Moving Average":
+                method_options['window'] = st.slider('Window Size', min_value=2, max_value=30, value=5)
+            elif forecast_method in ("Exponential Smoothing", "Holt Linear Trend"):
+                method_options['alpha'] = st.slider('Smoothing Level (alpha)', 0.01, 1.0, 0.3)
+                if forecast_method == "Holt Linear Trend":
+                    method_options['beta'] = st.slider('Smoothing Trend (beta)', 0.01, 1.0, 0.1)
+            elif forecast_method == "Seasonal Naive":
+                method_options['season'] = st.slider('Season Length (days)', min_value=2, max_value=30, value=7)
+
+            # Forecast all selected products in one grouped pass
+            forecasts = forecast_all_products(source, selected_products, method=forecast_method,
+                                              **{'window': 5, **method_options}, forecast_days=forecast_days,
+                                              resolution=resolution)
 
             # Prepare data for multiple products
             combined_data = {}
 
-            for product in selected_products:
-                product_data = historical_data[historical_data['Product'] == product]
-
-                # Generate forecasts based on selected method
-                if forecast_method == "Moving Average":
-                    forecast = moving_average_forecast(product_data, window=5, forecast_days=forecast_days)
-                else:
-                    forecast = basic_time_series_forecast(product_data, forecast_days=forecast_days)
-
+            for product, product_forecast in forecasts.groupby('Product', sort=False):
                 # Store historical and forecast data
-                combined_data[f"{product} - Historical Sales"] = product_data['Sales']
-                combined_data[f"{product} - Forecasted Sales"] = pd.Series(
-                    forecast,
-                    index=pd.date_range(product_data.index[-1], periods=forecast_days, freq='D')
-                )
+                combined_data[f"{product} - Historical Sales"] = (
+                    source.series(product) if isinstance(source, SalesCalendar)
+                    else historical_index.rows(product)['Sales'])
+                combined_data[f"{product} - Forecasted Sales"] = product_forecast.set_index('Date')['Forecast']
 
-            # Display the combined data
-            st.line_chart(combined_data)
+            # Display the combined data, downsampling long histories; forecasts stay exact
+            forecast_columns = {f"{product} - Forecasted Sales" for product in selected_products}
+            st.line_chart(prepare_chart_data(combined_data, full_resolution=forecast_columns),
+                          x='Date', y='Sales', color='Series')
 
             # If a forecasted file is uploaded, combine user-provided forecasts
             if uploaded_forecast_file:
-                forecast_data = pd.read_csv(uploaded_forecast_file)
-                forecast_data['Date'] = pd.to_datetime(forecast_data['Date'])
-                forecast_data.set_index('Date', inplace=True)
+                forecast_key, user_index = load_sales_index(uploaded_forecast_file.getvalue())
+                forecast_index = user_index
+                if resolution != "Daily":
+                    forecast_index = rollup_index_for(default_cache(), forecast_key, user_index, resolution)
 
                 for product in selected_products:
-                    product_forecast_data = forecast_data[forecast_data['Product'] == product]
+                    product_forecast_data = forecast_index.rows(product)
                     combined_data[f"{product} - User Forecasted Sales"] = product_forecast_data['Sales']
-
-                st.line_chart(combined_data)
+                    forecast_columns.add(f"{product} - User Forecasted Sales")
+
+                st.line_chart(prepare_chart_data(combined_data, full_resolution=forecast_columns),
+                              x='Date', y='Sales', color='Series')
+
+                # Score the user's and the model's forecasts against actuals for every product
+                st.subheader("Forecast Accuracy")
+                holdout = st.slider(f'Model holdout ({resolution.lower()} periods)', min_value=1, max_value=90,
+                                    value=forecast_days)
+                common_only = st.checkbox("Score only periods both forecasts cover", value=True)
+                fill, aggregate = (source.fill, source.aggregate) if isinstance(source, SalesCalendar) else (None, "Sum")
+                options = {'window': 5, **method_options}
+                settings = (dataset_key, forecast_key, resolution, fill, aggregate, forecast_method,
+                            tuple(sorted(options.items())), holdout, common_only)
+
+                # Recompute only when the inputs change; re-sorting the leaderboard reuses the scores
+                if st.session_state.get('accuracy_settings') != settings:
+                    try:
+                        model_forecasts = holdout_forecasts(historical_index, holdout, resolution, fill, aggregate,
+                                                            method=forecast_method, **options)
+                        per_product, overall = compare_forecasts(
+                            historical_index, {"User": user_index, "Model": model_forecasts}, resolution, common_only)
+                        st.session_state.accuracy = (per_product, overall, per_product.to_csv().encode('utf-8'))
+                    except ValueError as e:
+                        st.session_state.accuracy = None
+                        st.error(f"Error comparing forecasts: {e}")
+                    st.session_state.accuracy_settings = settings
+
+                if st.session_state.get('accuracy') is not None:
+                    per_product, overall, accuracy_csv = st.session_state.accuracy
+                    if overall['Points'].sum() == 0:
+                        st.info("No user forecast periods overlap the sales history and the model holdout.")
+                    metric = st.selectbox("Rank by", ACCURACY_METRICS)
+                    st.dataframe(rank_sources(overall, metric))
+
+                    # Leaderboard of products, largest errors first by default
+                    sort_by = st.selectbox("Sort products by", [f"{metric} (User)", f"{metric} (Model)"])
+                    worst_first = st.checkbox("Worst products first", value=True)
+                    board = leaderboard(per_product, metric, sort_by, worst_first)
+                    st.dataframe(board.head(MAX_LEADERBOARD_ROWS))
+                    st.download_button("Download accuracy by product", accuracy_csv, file_name="forecast_accuracy.csv",
+                                       mime="text/csv")
 
 elif page == "Learning About Moving Averages":
     # Add educational content here
@@ -153,3 +198,5 @@ elif page == "Learning About Moving Averages":
     st.write("""
     By understanding and properly applying the moving average method, businesses can create more reliable sales forecasts, helping with inventory management, resource allocation, and strategic planning.
     """)
+
+panel.render()
@@ -0,0 +1,274 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from rollups import period_numbers, period_start_dates
+
+SHIPMENT_COLUMNS = ['Date', 'Carrier', 'Mode', 'Distance', 'Weight']
+DIMENSIONS = ('Lane', 'Carrier', 'Month')
+# Totals kept per grouping; the month breakdowns let goals track a single lane or carrier
+GROUPINGS = {dimension: (dimension,) for dimension in DIMENSIONS}
+GROUPINGS.update({'Lane Month': ('Lane', 'Month'), 'Carrier Month': ('Carrier', 'Month')})
+DEFAULT_CHUNKSIZE = 200_000
+DEFAULT_GOALS_DB = os.path.join(os.path.expanduser("~"), ".cache", "scm-tools", "goals.sqlite3")
+
+# kg CO2e per tonne-km, well-to-wheel averages by transport mode
+DEFAULT_EMISSION_FACTORS = {
+    'road': 0.105,
+    'rail': 0.028,
+    'sea': 0.016,
+    'inland waterway': 0.031,
+    'air': 0.602,
+}
+
+def load_emission_factors(file=None):
+    """
+    Return the factor table as a {mode: kg CO2e per tonne-km} dict. A CSV with
+    'Mode' and 'Factor' columns adds to or overrides the built-in factors.
+    """
+    factors = dict(DEFAULT_EMISSION_FACTORS)
+    if file is not None:
+        table = pd.read_csv(file)
+        if not {'Mode', 'Factor'}.issubset(table.columns):
+            raise ValueError("Emission factor file must contain 'Mode' and 'Factor' columns.")
+        values = pd.to_numeric(table['Factor'], errors='coerce')
+        if values.isna().any() or (values < 0).any():
+            raise ValueError("Emission factors must be non-negative numbers.")
+        factors.update(zip(table['Mode'].astype(str).str.strip().str.lower(), values))
+    return factors
+
+def shipment_emissions(shipments, factors=None):
+    """
+    CO2e in kg of every shipment: distance (km) x weight (kg) / 1000 x the
+    factor of its mode. Modes are matched case-insensitively with one lookup
+    per distinct mode; unknown modes give NaN. Also returns tonne-km.
+    """
+    factors = DEFAULT_EMISSION_FACTORS if factors is None else factors
+    modes = pd.Categorical(shipments['Mode'].astype(str).str.strip().str.lower())
+    mode_factors = np.array([factors.get(mode, np.nan) for mode in modes.categories], dtype=float)
+    factor = np.append(mode_factors, np.nan)[modes.codes]  # Code -1 (missing mode) reads the NaN slot
+
+    distance = pd.to_numeric(shipments['Distance'], errors='coerce').to_numpy(dtype=float)
+    weight = pd.to_numeric(shipments['Weight'], errors='coerce').to_numpy(dtype=float)
+    tonne_km = distance * weight / 1000.0
+    return tonne_km * factor, tonne_km
+
+def _lanes(shipments):
+    if 'Lane' in shipments.columns:
+        return shipments['Lane'].astype(str)
+    if {'Origin', 'Destination'}.issubset(shipments.columns):
+        return shipments['Origin'].astype(str) + ' -> ' + shipments['Destination'].astype(str)
+    return pd.Series('All lanes', index=shipments.index)
+
+# Streaming Emissions Aggregates
+class EmissionsAggregator:
+    """
+    Running CO2e, tonne-km and shipment totals by lane, carrier and month.
+    Shipment logs are added chunk by chunk, so files larger than memory can
+    be processed and new logs extend the totals without re-reading old ones.
+    Lanes come from a 'Lane' column or 'Origin' and 'Destination'.
+    """
+    def __init__(self, factors=None):
+        self.factors = DEFAULT_EMISSION_FACTORS if factors is None else factors
+        self.totals = dict.fromkeys(GROUPINGS)
+        self.shipments = 0
+        self.unmatched = 0  # Shipments skipped for an unknown mode or invalid number
+        self.unknown_modes = set()
+        self.applied_batches = set()
+
+    def _state(self):
+        # Totals are replaced rather than modified, so a shallow copy is a snapshot
+        return dict(self.totals), self.shipments, self.unmatched, set(self.unknown_modes)
+
+    def _restore(self, state):
+        self.totals, self.shipments, self.unmatched, self.unknown_modes = state
+
+    def _add_batch(self, chunks, batch_key):
+        """
+        Add every chunk of a batch or, if one fails, none of them. The
+        batch_key is recorded only once all chunks are in.
+        """
+        if batch_key is not None and batch_key in self.applied_batches:
+            return
+        state = self._state()
+        try:
+            for chunk in chunks:
+                self._add_chunk(chunk)
+        except Exception:
+            self._restore(state)
+            raise
+        if batch_key is not None:
+            self.applied_batches.add(batch_key)
+
+    def add(self, shipments, batch_key=None):
+        """
+        Add one chunk of shipments. A batch_key (for example the hash of an
+        uploaded file) makes adding the same batch again a no-op.
+        """
+        self._add_batch([shipments], batch_key)
+
+    def _add_chunk(self, shipments):
+        if not set(SHIPMENT_COLUMNS).issubset(shipments.columns):
+            raise ValueError("Shipment log must contain 'Date', 'Carrier', 'Mode', 'Distance', and 'Weight' columns.")
+
+        co2e, tonne_km = shipment_emissions(shipments, self.factors)
+        dates = pd.to_datetime(shipments['Date'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+        valid = ~np.isnan(co2e) & ~np.isnat(dates)
+        known = set(self.factors)
+        self.unknown_modes.update(mode for mode in shipments['Mode'].astype(str).str.strip().str.lower().unique()
+                                  if mode not in known)
+        self.shipments += int(valid.sum())
+        self.unmatched += int((~valid).sum())
+
+        values = pd.DataFrame({'CO2e': co2e[valid], 'Tonne-km': tonne_km[valid], 'Shipments': 1.0})
+        keys = {
+            'Lane': _lanes(shipments).to_numpy()[valid],
+            'Carrier': shipments['Carrier'].astype(str).to_numpy()[valid],
+            'Month': period_numbers(dates[valid], "Monthly"),
+        }
+        for grouping, parts in GROUPINGS.items():
+            chunk_totals = values.groupby([keys[part] for part in parts] if len(parts) > 1 else keys[parts[0]]).sum()
+            previous = self.totals[grouping]
+            self.totals[grouping] = chunk_totals if previous is None else previous.add(chunk_totals, fill_value=0.0)
+
+    @timed()
+    def add_csv(self, file, chunksize=DEFAULT_CHUNKSIZE, batch_key=None):
+        """
+        Stream a shipment-log CSV through add() in chunks. A file that fails
+        part-way leaves the totals as they were before it.
+        """
+        self._add_batch(pd.read_csv(file, chunksize=chunksize), batch_key)
+
+    def by(self, dimension):
+        """
+        Totals by 'Lane', 'Carrier' or 'Month', largest emitters first
+        (months in date order), with CO2e per tonne-km.
+        """
+        totals = self.totals[dimension]
+        if totals is None:
+            totals = pd.DataFrame(columns=['CO2e', 'Tonne-km', 'Shipments'], dtype=float)
+        totals = totals.copy()
+        totals['Shipments'] = totals['Shipments'].astype(np.int64)
+        totals['kg CO2e / t-km'] = totals['CO2e'] / totals['Tonne-km'].where(totals['Tonne-km'] > 0)
+        if dimension == 'Month':
+            totals.index = pd.DatetimeIndex(period_start_dates(totals.index.to_numpy(dtype=np.int64), "Monthly"),
+                                            name='Month')
+            return totals.sort_index()
+        totals.index.name = dimension
+        return totals.sort_values('CO2e', ascending=False)
+
+    def monthly_by(self, dimension):
+        """
+        {lane or carrier: monthly CO2e series in date order}.
+        """
+        totals = self.totals[f'{dimension} Month']
+        if totals is None:
+            return {}
+        return {
+            value: pd.Series(series.to_numpy(),
+                             index=pd.DatetimeIndex(period_start_dates(series.index.get_level_values(1), "Monthly")))
+            .sort_index()
+            for value, series in totals['CO2e'].groupby(level=0)
+        }
+
+    def total(self):
+        return float(self.by('Month')['CO2e'].sum())
+
+GOALS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY,
+    goal TEXT NOT NULL,
+    target_months INTEGER NOT NULL,
+    reduction REAL NOT NULL,
+    scope TEXT NOT NULL,
+    scope_value TEXT,
+    created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+"""
+GOAL_SCOPES = ('All shipments', 'Lane', 'Carrier')
+
+# Sustainability Goals
+class GoalStore:
+    """
+    Emission-reduction goals persisted to a local SQLite database.
+    """
+    def __init__(self, path=DEFAULT_GOALS_DB):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._connection:
+            self._connection.executescript(GOALS_SCHEMA)
+
+    def add(self, goal, target_months, reduction, scope=GOAL_SCOPES[0], scope_value=None):
+        """
+        Store a goal to cut monthly CO2e by `reduction` percent within
+        target_months, for all shipments or one lane or carrier.
+        """
+        if scope not in GOAL_SCOPES:
+            raise ValueError(f"Unknown goal scope: {scope}")
+        if not goal:
+            raise ValueError("Please describe the goal.")
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO goals (goal, target_months, reduction, scope, scope_value) VALUES (?, ?, ?, ?, ?)",
+                (goal, int(target_months), float(reduction), scope, scope_value))
+
+    def to_frame(self):
+        with self._lock:
+            return pd.read_sql_query(
+                "SELECT id AS ID, goal AS Goal, target_months AS 'Target Months', reduction AS 'Reduction %', "
+                "scope AS Scope, scope_value AS 'Scope Value', created AS Created FROM goals ORDER BY id",
+                self._connection, index_col='ID')
+
+    def delete(self, goal_id):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM goals WHERE id = ?", (int(goal_id),))
+
+def goal_progress(goals, shipments):
+    """
+    Compare goals with the monthly CO2e of an EmissionsAggregator. For each
+    goal's scope the baseline is the first logged month and the current
+    value the latest one; a goal is on track when the achieved reduction
+    meets its target.
+    """
+    progress = goals.copy()
+    baseline, current = np.full(len(goals), np.nan), np.full(len(goals), np.nan)
+    monthly = _monthly_by_scope(shipments)
+    for position, (scope, value) in enumerate(zip(goals['Scope'], goals['Scope Value'])):
+        series = monthly.get((scope, value if scope != GOAL_SCOPES[0] else None))
+        if series is not None and len(series):
+            baseline[position], current[position] = series.iloc[0], series.iloc[-1]
+    progress['Baseline CO2e'] = baseline
+    progress['Current CO2e'] = current
+    progress['Achieved %'] = np.where(baseline > 0, (baseline - current) / np.where(baseline > 0, baseline, 1) * 100,
+                                      np.nan)
+    progress['On Track'] = progress['Achieved %'] >= progress['Reduction %']
+    return progress
+
+def _monthly_by_scope(shipments):
+    """
+    Monthly CO2e series per goal scope, read from the aggregator's month totals
+    and its lane/carrier month breakdown.
+    """
+    monthly = {(GOAL_SCOPES[0], None): shipments.by('Month')['CO2e']}
+    for scope in ('Lane', 'Carrier'):
+        for value, series in shipments.monthly_by(scope).items():
+            monthly[(scope, value)] = series
+    return monthly
+
+_default_goals = None
+
+def default_goal_store():
+    """
+    Return the process-wide goal store shared by every Streamlit session.
+    """
+    global _default_goals
+    if _default_goals is None:
+        _default_goals = GoalStore()
+    return _default_goals
@@ -0,0 +1,110 @@
+"""
+Headless batch forecasting for nightly jobs.
+
+    python forecast_cli.py sales.csv forecasts.csv --method "Moving Average" --horizon 14 --processes 8
+
+Reads a 'Date', 'Product', 'Sales' file, forecasts every product and streams
+the results to a CSV (or .npz) file, reporting rows/second throughput.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from forecasting import FORECAST_METHODS, forecast_all_products
+from ingest import read_sales_csv_chunked, sales_dates
+from product_index import ProductIndex
+from trend_models import forecast_all_trends
+
+TREND_METHOD = "Linear Trend"
+CLI_METHODS = FORECAST_METHODS + (TREND_METHOD,)
+
+def forecast_chunk(data, method, window, horizon):
+    """
+    Forecast every product of a sales frame with one method.
+    """
+    index = ProductIndex(data)
+    if method == TREND_METHOD:
+        return forecast_all_trends(index, horizon)
+    return forecast_all_products(index, method=method, window=window, forecast_days=horizon)
+
+def _forecast_job(job):
+    return forecast_chunk(*job)
+
+def _product_chunks(index, chunk_products):
+    for first in range(0, len(index), chunk_products):
+        last = min(first + chunk_products, len(index)) - 1
+        yield index.data.iloc[index.starts[first]:index.ends[last]]
+
+def _load(path):
+    data = read_sales_csv_chunked(path)
+    data['Date'] = sales_dates(data)
+    return data.drop(columns='Day')
+
+def _npz_column(series):
+    # Object arrays would need allow_pickle to load; labels are stored as fixed-width strings
+    values = series.to_numpy()
+    if values.dtype.kind in "biufmM":
+        return values
+    return series.astype(str).to_numpy(dtype=str)
+
+def _write(results, output_path):
+    if output_path.endswith('.npz'):
+        frame = pd.concat(results, ignore_index=True)
+        np.savez_compressed(output_path, **{column: _npz_column(frame[column]) for column in frame.columns})
+        return len(frame)
+
+    rows = 0
+    with open(output_path, 'w', newline='') as output:
+        for position, chunk in enumerate(results):
+            chunk.to_csv(output, header=position == 0, index=False)
+            rows += len(chunk)
+    return rows
+
+def run(input_path, output_path, method="Moving Average", window=5, horizon=7,
+        processes=None, chunk_products=2000):
+    """
+    Forecast every product in input_path and write them to output_path.
+    Products are split into chunks that a process pool forecasts in parallel;
+    CSV output is streamed chunk by chunk as results arrive.
+    Returns (input rows, output rows, seconds).
+    """
+    if method not in CLI_METHODS:
+        raise ValueError(f"Unknown forecasting method: {method}")
+
+    started = time.perf_counter()
+    index = ProductIndex(_load(input_path))
+    chunks = _product_chunks(index, chunk_products)
+
+    if processes == 1:
+        results = (forecast_chunk(chunk, method, window, horizon) for chunk in chunks)
+        output_rows = _write(results, output_path)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = pool.map(_forecast_job, ((chunk, method, window, horizon) for chunk in chunks))
+            output_rows = _write(results, output_path)
+
+    return len(index.data), output_rows, time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Forecast every product in a sales file without the Streamlit UI.")
+    parser.add_argument("input", help="CSV file with 'Date', 'Product' and 'Sales' columns")
+    parser.add_argument("output", help="Output file (.csv, or .npz for columnar output)")
+    parser.add_argument("--method", choices=CLI_METHODS, default="Moving Average")
+    parser.add_argument("--window", type=int, default=5, help="Moving average window")
+    parser.add_argument("--horizon", type=int, default=7, help="Days to forecast")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="Worker processes (1 disables the pool)")
+    parser.add_argument("--chunk-products", type=int, default=2000, help="Products per worker task")
+    args = parser.parse_args(argv)
+
+    input_rows, output_rows, seconds = run(args.input, args.output, args.method, args.window, args.horizon,
+                                           args.processes, args.chunk_products)
+    print(f"Forecast {output_rows} rows from {input_rows} input rows in {seconds:.2f}s "
+          f"({input_rows / max(seconds, 1e-9):,.0f} rows/s)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import numpy as np
+import pandas as pd
+
+import rollups
+from calendar_alignment import SalesCalendar
+from ingest import sales_dates
+from instrumentation import timed
+from product_index import ProductIndex
+
+# Methods that only need each product's most recent sales
+TAIL_METHODS = ("Moving Average", "Time Series", "Weighted Moving Average", "Seasonal Naive")
+SMOOTHING_METHODS = ("Exponential Smoothing", "Holt Linear Trend")
+FORECAST_METHODS = TAIL_METHODS + SMOOTHING_METHODS
+DEFAULT_MAX_HISTORY = 365  # Smoothing recurrences start this many rows back
+
+# Moving Average Forecast Function
+@timed()
+def moving_average_forecast(data, window=5, forecast_days=7):
+    historical = data['Sales'].rolling(window=window).mean().iloc[-forecast_days:].values
+    forecast = historical[-1] if len(historical) > 0 else 0
+    return [forecast] * forecast_days
+
+# Basic Time Series Forecasting Function
+@timed()
+def basic_time_series_forecast(data, forecast_days=7):
+    # Use the mean of the last observed data points as the forecast
+    last_values = data['Sales'].iloc[-forecast_days:]
+    if len(last_values) > 0:
+        forecast = last_values.mean()
+    else:
+        forecast = 0
+    return [forecast] * forecast_days
+
+def row_dates(data):
+    # The apps keep 'Date' as the index, DemandForecastingTool keeps it as a column
+    return pd.DatetimeIndex(sales_dates(data))
+
+def tail_matrix(sales, starts, ends, count):
+    """
+    Gather the last `count` sales of every product block into a (products, count)
+    matrix. Slots before the start of a short block are NaN.
+    """
+    offsets = ends[:, None] - count + np.arange(count)
+    if len(sales) == 0:
+        return np.full(offsets.shape, np.nan)
+    values = sales[np.clip(offsets, 0, len(sales) - 1)]
+    return np.where(offsets >= starts[:, None], values, np.nan)
+
+def linear_weights(window):
+    """
+    Default weighted moving average weights: 1, 2, ..., window (most recent heaviest).
+    """
+    return np.arange(1, window + 1, dtype=float)
+
+def weighted_moving_average(tail, weights, skip_missing=False):
+    """
+    Weighted mean of the last len(weights) values of every row; NaN unless the
+    whole window is observed, as for the simple moving average. With
+    skip_missing the mean is taken over the observed cells of the window and
+    is NaN only when none is observed.
+    """
+    weights = np.asarray(weights, dtype=float)
+    values = tail[:, tail.shape[1] - len(weights):]
+    observed = ~np.isnan(values)
+    weighted = np.where(observed, values, 0.0) @ weights
+    if skip_missing:
+        totals = observed @ weights
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(totals > 0, weighted / totals, np.nan)
+    return np.where(observed.all(axis=1), weighted / weights.sum(), np.nan)
+
+def seasonal_naive(tail, season, forecast_days):
+    """
+    Repeat the last observed season of every row over the forecast horizon.
+    Returns a (products, forecast_days) matrix.
+    """
+    last_season = tail[:, tail.shape[1] - season:]
+    return last_season[:, np.arange(forecast_days) % season]
+
+def exponential_smoothing(history, alpha, beta=None, forecast_days=7):
+    """
+    Simple (beta=None) or Holt linear exponential smoothing of every row of a
+    right-aligned history matrix at once. The recurrence runs over the time
+    axis with each step vectorized across products; NaN observations leave the
+    state unchanged. Returns a (products, forecast_days) matrix.
+    """
+    products = history.shape[0]
+    level = np.full(products, np.nan)
+    trend = np.zeros(products)
+    seen = np.zeros(products, dtype=int)
+    for column in history.T:
+        observed = ~np.isnan(column)
+        first = observed & (seen == 0)
+        update = observed & (seen > 0)
+        if beta is not None:
+            # Holt: the second observation initialises the trend
+            second = observed & (seen == 1)
+            trend[second] = column[second] - level[second]
+        previous = level[update]
+        fitted = previous + (trend[update] if beta is not None else 0.0)
+        level[update] = alpha * column[update] + (1 - alpha) * fitted
+        if beta is not None:
+            trend[update] = beta * (level[update] - previous) + (1 - beta) * trend[update]
+        level[first] = column[first]
+        seen += observed
+
+    steps = np.arange(1, forecast_days + 1)
+    if beta is None:
+        return np.repeat(level[:, None], forecast_days, axis=1)
+    return level[:, None] + trend[:, None] * steps
+
+def forecast_from_tail(tail, method="Moving Average", window=5, forecast_days=7, season=7, weights=None,
+                       skip_missing=False):
+    """
+    Per-product forecast values from a tail matrix of recent sales: one value
+    per product for flat methods, a (products, forecast_days) matrix otherwise.
+    With skip_missing the moving averages use the observed cells of a window
+    that has gaps instead of returning NaN.
+    """
+    if method == "Moving Average":
+        # rolling(window).mean() needs `window` valid values in the final window
+        return weighted_moving_average(tail, np.ones(window), skip_missing)
+
+    if method == "Weighted Moving Average":
+        return weighted_moving_average(tail, linear_weights(window) if weights is None else weights, skip_missing)
+
+    if method == "Seasonal Naive":
+        return seasonal_naive(tail, season, forecast_days)
+
+    values = tail[:, tail.shape[1] - forecast_days:]
+    counts = (~np.isnan(values)).sum(axis=1)
+    totals = np.where(np.isnan(values), 0.0, values).sum(axis=1)
+    return np.where(counts > 0, totals / np.maximum(counts, 1), np.nan)
+
+def tail_length(method, window=5, forecast_days=7, season=7, weights=None):
+    """
+    Number of recent values a tail method reads.
+    """
+    if method == "Moving Average":
+        return window
+    if method == "Weighted Moving Average":
+        return window if weights is None else len(weights)
+    if method == "Seasonal Naive":
+        return season
+    return forecast_days
+
+def tidy_forecast(products, last_dates, forecast, forecast_days, resolution="Daily"):
+    """
+    Build the 'Product', 'Date', 'Forecast' frame, forecast_days rows per product
+    starting the day (or period, for rolled-up data) after each product's last
+    observed date. forecast holds one value per product or a (products, forecast_days) matrix.
+    """
+    last_dates = np.asarray(last_dates, dtype='datetime64[ns]')
+    if resolution == "Daily":
+        steps = pd.to_timedelta(np.arange(1, forecast_days + 1), unit='D')
+        dates = np.repeat(last_dates, forecast_days) + np.tile(steps.values, len(products))
+    else:
+        dates = rollups.forecast_dates(last_dates, forecast_days, resolution)
+    forecast = np.asarray(forecast, dtype=float)
+    return pd.DataFrame({
+        'Product': np.repeat(products, forecast_days),
+        'Date': dates,
+        'Forecast': np.repeat(forecast, forecast_days) if forecast.ndim == 1 else forecast.ravel(),
+    })
+
+# Grouped Forecast Engine
+@timed()
+def forecast_all_products(data, products=None, method="Moving Average", window=5, forecast_days=7,
+                          alpha=0.3, beta=0.1, season=7, weights=None, max_history=DEFAULT_MAX_HISTORY,
+                          resolution="Daily"):
+    """
+    Forecast every product (or the selected ones) in a single grouped pass.
+    data is a sales frame, a prebuilt ProductIndex or a SalesCalendar. Returns
+    a tidy frame with 'Product', 'Date' and 'Forecast' columns. "Moving Average"
+    and "Time Series" give the same values as moving_average_forecast /
+    basic_time_series_forecast; the other methods work on a product-by-time
+    matrix of recent sales. For a rolled-up level pass its resolution so
+    forecast dates step by period. On a SalesCalendar windows span calendar
+    periods rather than rows, and every forecast starts after the calendar end;
+    with the "Missing" fill rule, averages skip the unfilled periods.
+    """
+    if method not in FORECAST_METHODS:
+        raise ValueError(f"Unknown forecasting method: {method}")
+
+    if not isinstance(data, (SalesCalendar, ProductIndex)):
+        data = ProductIndex(data)
+    if isinstance(data, SalesCalendar):
+        selected = data.positions(products)
+        resolution = data.resolution
+        skip_missing = data.fill == "Missing"
+        if len(selected) and not len(data.periods):
+            raise ValueError("The calendar holds no dated sales to forecast from.")
+
+        longest = len(data.periods)
+        last_dates = np.repeat(data.dates.values[-1:], len(selected))
+
+        def recent(count):
+            return data.tail(count, selected)
+    else:
+        selected = data.positions(products)
+        skip_missing = False
+        starts = data.starts[selected]
+        ends = data.ends[selected]
+        sales = data.column('Sales').astype(float)
+        longest = int((ends - starts).max()) if len(selected) else 0
+        last_dates = row_dates(data.data)[ends - 1].values
+
+        def recent(count):
+            return tail_matrix(sales, starts, ends, count)
+
+    if method in SMOOTHING_METHODS:
+        history = recent(min(longest, max_history))
+        forecast = exponential_smoothing(history, alpha, beta if method == "Holt Linear Trend" else None,
+                                         forecast_days)
+    else:
+        count = tail_length(method, window, forecast_days, season, weights)
+        forecast = forecast_from_tail(recent(count), method, window, forecast_days, season, weights, skip_missing)
+    return tidy_forecast(data.products[selected], last_dates, forecast, forecast_days, resolution)
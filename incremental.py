@@ -0,0 +1,151 @@
+import numpy as np
+import pandas as pd
+
+from forecasting import TAIL_METHODS, forecast_from_tail, row_dates, tail_length, tail_matrix, tidy_forecast
+from product_index import ProductIndex
+from trend_models import trend_from_sums
+
+DEFAULT_TAIL = 30  # Longest window / forecast horizon the apps offer
+
+# Incremental Forecast State
+class IncrementalForecaster:
+    """
+    Per-product forecast state that can absorb newly appended sales rows
+    without reprocessing history. Keeps the last `tail` sales of every product
+    (enough for moving_average_forecast and basic_time_series_forecast) and the
+    regression sufficient statistics of the DemandForecastingTool trend model.
+    Appending rows that are newer than the history gives the same results as a
+    full recompute.
+    """
+    def __init__(self, tail=DEFAULT_TAIL):
+        self.tail = tail
+        self.products = np.empty(0, dtype=object)
+        self._positions = {}
+        self.recent = np.empty((0, tail))
+        self.last_dates = np.empty(0, dtype='datetime64[ns]')
+        # Sufficient statistics with x measured in days from a fixed per-product anchor
+        self.anchor_day = np.empty(0, dtype=np.int64)
+        self.first_day = np.empty(0, dtype=np.int64)
+        self.last_day = np.empty(0, dtype=np.int64)
+        self.n = np.empty(0)
+        self.sum_x = np.empty(0)
+        self.sum_y = np.empty(0)
+        self.sum_xx = np.empty(0)
+        self.sum_xy = np.empty(0)
+        self.applied_batches = set()
+
+    @classmethod
+    def from_history(cls, data, tail=DEFAULT_TAIL):
+        """
+        Build the state from a full history (frame or ProductIndex) in one pass.
+        """
+        state = cls(tail)
+        state.append(data)
+        return state
+
+    def _add_products(self, products):
+        new = [product for product in products if product not in self._positions]
+        if not new:
+            return
+        count = len(new)
+        for offset, product in enumerate(new):
+            self._positions[product] = len(self.products) + offset
+        self.products = np.concatenate([self.products, np.array(new, dtype=object)])
+        self.recent = np.vstack([self.recent, np.full((count, self.tail), np.nan)])
+        self.last_dates = np.concatenate([self.last_dates, np.full(count, np.datetime64('NaT'), dtype='datetime64[ns]')])
+        self.anchor_day = np.concatenate([self.anchor_day, np.zeros(count, dtype=np.int64)])
+        self.first_day = np.concatenate([self.first_day, np.full(count, np.iinfo(np.int64).max)])
+        self.last_day = np.concatenate([self.last_day, np.full(count, np.iinfo(np.int64).min)])
+        for name in ('n', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy'):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(count)]))
+
+    def append(self, new_rows, batch_key=None):
+        """
+        Absorb new sales rows (frame or ProductIndex) in O(new rows).
+        A batch_key (for example the hash of an uploaded file) makes repeated
+        appends of the same batch a no-op, which keeps Streamlit reruns safe.
+        The key is recorded only once the batch is applied, so a batch that
+        failed can be retried.
+        """
+        if batch_key is not None and batch_key in self.applied_batches:
+            return
+        self._apply(new_rows)
+        if batch_key is not None:
+            self.applied_batches.add(batch_key)
+
+    def _apply(self, new_rows):
+        index = new_rows if isinstance(new_rows, ProductIndex) else ProductIndex(new_rows)
+        if len(index) == 0:
+            return
+        counts = index.ends - index.starts
+        sales = index.column('Sales').astype(float)
+        dates = row_dates(index.data).values.astype('datetime64[ns]')
+        # Parse the batch before touching the state, so a bad batch leaves it unchanged
+        self._add_products(index.products)
+        positions = np.array([self._positions[product] for product in index.products], dtype=np.int64)
+
+        # Recent sales: keep the last `tail` values of [old tail, new block]
+        new_tail = tail_matrix(sales, index.starts, index.ends, self.tail)
+        slot = counts[:, None] + np.arange(self.tail)
+        from_old = slot < self.tail
+        old_tail = self.recent[positions]
+        self.recent[positions] = np.where(
+            from_old,
+            np.take_along_axis(old_tail, np.minimum(slot, self.tail - 1), axis=1),
+            new_tail,
+        )
+        self.last_dates[positions] = dates[index.ends - 1]
+
+        # Regression sufficient statistics over rows with a valid sales value
+        days = dates.astype('datetime64[D]').astype(np.int64)
+        block_ids = np.repeat(np.arange(len(index)), counts)
+        block_first = np.minimum.reduceat(days, index.starts)
+        block_last = np.maximum.reduceat(days, index.starts)
+        fresh = self.n[positions] == 0
+        self.anchor_day[positions[fresh]] = block_first[fresh]
+        self.first_day[positions] = np.minimum(self.first_day[positions], block_first)
+        self.last_day[positions] = np.maximum(self.last_day[positions], block_last)
+
+        valid = ~np.isnan(sales)
+        x = (days - self.anchor_day[positions][block_ids]).astype(float)
+        y = np.where(valid, sales, 0.0)
+        weights = valid.astype(float)
+        length = len(index)
+        self.n[positions] += np.bincount(block_ids, weights=weights, minlength=length)
+        self.sum_x[positions] += np.bincount(block_ids, weights=x * weights, minlength=length)
+        self.sum_y[positions] += np.bincount(block_ids, weights=y, minlength=length)
+        self.sum_xx[positions] += np.bincount(block_ids, weights=x * x * weights, minlength=length)
+        self.sum_xy[positions] += np.bincount(block_ids, weights=x * y, minlength=length)
+
+    def forecast(self, products=None, method="Moving Average", window=5, forecast_days=7, season=7, weights=None):
+        """
+        Same output as forecasting.forecast_all_products for the methods that
+        only need recent sales, read from the state.
+        """
+        if method not in TAIL_METHODS:
+            raise ValueError(f"Method not supported incrementally: {method}")
+        if tail_length(method, window, forecast_days, season, weights) > self.tail:
+            raise ValueError(f"The method must not read more than the kept tail of {self.tail} values")
+        if products is None:
+            selected = np.arange(len(self.products))
+        else:
+            selected = np.array([self._positions[product] for product in products if product in self._positions],
+                                dtype=np.int64)
+        forecast = forecast_from_tail(self.recent[selected], method, window, forecast_days, season, weights)
+        return tidy_forecast(self.products[selected], self.last_dates[selected], forecast, forecast_days)
+
+    def trend_coefficients(self):
+        """
+        Same table as trend_models.fit_trend_models, solved from the statistics,
+        plus each product's 'LastDate' so forecasts start after the appended rows.
+        """
+        x_mean, y_mean, slopes = trend_from_sums(np.maximum(self.n, 1), self.sum_x, self.sum_y,
+                                                 self.sum_xx, self.sum_xy)
+        shift = (self.first_day - self.anchor_day).astype(float)
+        return pd.DataFrame({
+            'Intercept': y_mean - slopes * (x_mean - shift),
+            'Slope': slopes,
+            'Rows': self.n.astype(np.int64),
+            'MaxDays': (self.last_day - self.first_day).astype(float),
+            'LastDate': self.last_dates,
+        }, index=pd.Index(self.products, name='Product'))
@@ -0,0 +1,93 @@
+import io
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+SALES_COLUMNS = ['Date', 'Product', 'Sales']
+DEFAULT_CHUNKSIZE = 500_000
+EPOCH = np.datetime64('1970-01-01', 'D')
+
+def _compact_chunk(chunk):
+    """
+    Convert one raw CSV chunk to compact columns and drop its invalid rows.
+    """
+    dates = pd.to_datetime(chunk['Date'], errors='coerce').to_numpy(dtype='datetime64[ns]')
+    sales = pd.to_numeric(chunk['Sales'], errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~np.isnat(dates) & ~np.isnan(sales)
+
+    days = dates[valid].astype('datetime64[D]').astype(np.int64)
+    return (
+        pd.Categorical(chunk['Product'].to_numpy()[valid]),
+        days.astype(np.int32),
+        sales[valid],
+    )
+
+# Streaming CSV Ingest
+def read_sales_csv_chunked(file_path, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Read a 'Date', 'Product', 'Sales' CSV in chunks into a compact frame.
+    Products are stored as a categorical and dates as int32 day offsets from
+    1970-01-01 in a 'Day' column. Sales stay float64, so values read back and
+    forecast exactly as in the non-streamed path. Rows with an invalid date
+    or sales value are dropped per chunk and the result is sorted by day.
+    """
+    products, days, sales = [], [], []
+    reader = pd.read_csv(file_path, usecols=lambda column: column in SALES_COLUMNS,
+                         dtype={'Product': str, 'Date': str}, chunksize=chunksize)
+    chunks = 0
+    for chunk in reader:
+        if not set(SALES_COLUMNS).issubset(chunk.columns):
+            raise ValueError("CSV file must contain 'Date', 'Product', and 'Sales' columns.")
+        chunks += 1
+        chunk_products, chunk_days, chunk_sales = _compact_chunk(chunk)
+        # An all-invalid chunk has empty categories of another dtype, which union_categoricals rejects
+        if len(chunk_days):
+            products.append(chunk_products)
+            days.append(chunk_days)
+            sales.append(chunk_sales)
+
+    if not chunks:
+        raise ValueError("CSV file must contain 'Date', 'Product', and 'Sales' columns.")
+    if not products:
+        products, days, sales = [pd.Categorical([])], [np.empty(0, dtype=np.int32)], [np.empty(0)]
+
+    product_column = union_categoricals(products)
+    day_column = np.concatenate(days)
+    sales_column = np.concatenate(sales)
+    del products, days, sales
+
+    order = np.argsort(day_column, kind='stable')
+    return pd.DataFrame({
+        'Product': product_column.take(order),
+        'Day': day_column[order],
+        'Sales': sales_column[order],
+    })
+
+# Parse an uploaded sales CSV
+def load_sales_data(content):
+    """
+    Parse the bytes of an uploaded sales CSV into a frame indexed by 'Date',
+    as the Streamlit forecasting pages use it.
+    """
+    data = pd.read_csv(io.BytesIO(content))
+    data['Date'] = pd.to_datetime(data['Date'])
+    data.set_index('Date', inplace=True)
+    return data
+
+def day_offsets_to_dates(days):
+    """
+    Convert int32 day offsets produced by read_sales_csv_chunked back to dates.
+    """
+    return pd.to_datetime(EPOCH + np.asarray(days, dtype='timedelta64[D]'))
+
+def sales_dates(data):
+    """
+    Return the dates of a sales frame, whether it holds a 'Date' column, the
+    compact 'Day' offsets or a date index.
+    """
+    if 'Date' in data.columns:
+        return data['Date']
+    if 'Day' in data.columns:
+        return pd.Series(day_offsets_to_dates(data['Day'].to_numpy()), index=data.index, name='Date')
+    return pd.Series(pd.DatetimeIndex(data.index), index=data.index, name='Date')
@@ -0,0 +1,196 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+DEFAULT_LOG_PATH = os.path.join(os.path.expanduser("~"), ".cache", "scm-tools", "perf.jsonl")
+ENABLE_VARIABLE = "SCM_PROFILE"  # Set to 1 to turn the panel on by default
+
+_local = threading.local()  # Streamlit runs every session's reruns on its own thread
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False  # Whether tracemalloc was started here rather than by the embedding program
+
+def _acquire_tracing():
+    """
+    Register one run that traces memory, starting tracemalloc for the first.
+    """
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+def _release_tracing():
+    """
+    Unregister a tracing run; the last one stops tracemalloc if it started it.
+    """
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class ProfileRun:
+    """
+    Timings (and optionally traced memory) of the stages of one rerun.
+    Stages nest; each record holds its wall time, its depth and, when memory
+    is traced, the peak allocation above the level at which it started.
+    tracemalloc is process-wide: concurrent traced runs share one tracer, so
+    their peaks include each other's allocations.
+    """
+    def __init__(self, label, memory=False, log_path=DEFAULT_LOG_PATH):
+        self.label = label
+        self.memory = memory
+        self.log_path = log_path
+        self.run_id = uuid.uuid4().hex
+        self.records = []
+        self._stack = []
+        self._closed = False
+        if memory:
+            _acquire_tracing()
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+    def close(self):
+        if self.memory and not self._closed:
+            _release_tracing()
+        self._closed = True
+        if self.log_path and self.records:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            created = datetime.now(timezone.utc).isoformat()
+            with open(self.log_path, "a", encoding="utf-8") as log:
+                for record in self.records:
+                    log.write(json.dumps({"time": created, "run": self.run_id, "label": self.label, **record}) + "\n")
+        return self.records
+
+class _Stage:
+    def __init__(self, run, name):
+        self.run = run
+        self.name = name
+
+    def __enter__(self):
+        run = self.run
+        self.depth = len(run._stack)
+        self.child_peak = 0
+        if run.memory:
+            self.start_memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        run._stack.append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self.started
+        run = self.run
+        run._stack.pop()
+        record = {"stage": self.name, "seconds": seconds, "depth": self.depth}
+        if run.memory:
+            # reset_peak is global, so a nested stage hands its peak back to its parent
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            record["peak_bytes"] = max(peak - self.start_memory, 0)
+            if run._stack:
+                run._stack[-1].child_peak = max(run._stack[-1].child_peak, peak)
+        run.records.append(record)
+        return False
+
+# Instrumentation Hooks
+def timed(name=None):
+    """
+    Decorator recording every call as a stage of the active run. Without an
+    active run on the calling thread it only adds one attribute lookup.
+    """
+    def decorator(function):
+        stage_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            run = getattr(_local, "run", None)
+            if run is None:
+                return function(*args, **kwargs)
+            with run.stage(stage_name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def stage(name):
+    """
+    Context manager recording a block as a stage of the active run, if any.
+    """
+    run = getattr(_local, "run", None)
+    return _NULL_STAGE if run is None else run.stage(name)
+
+def start_run(label, memory=False, log_path=DEFAULT_LOG_PATH):
+    """
+    Start collecting stages on this thread until finish_run().
+    """
+    if getattr(_local, "run", None) is not None:
+        finish_run()  # A rerun interrupted before its panel rendered
+    _local.run = ProfileRun(label, memory, log_path)
+    return _local.run
+
+def finish_run():
+    """
+    Stop collecting, append the records to the JSON-lines log and return them.
+    """
+    run = getattr(_local, "run", None)
+    _local.run = None
+    return [] if run is None else run.close()
+
+def summarize(records):
+    """
+    Per-stage totals of a run's records, slowest first: calls, seconds and peak MB of the whole process.
+    """
+    summary = {}
+    for record in records:
+        entry = summary.setdefault(record["stage"], {"Stage": record["stage"], "Calls": 0, "Seconds": 0.0})
+        entry["Calls"] += 1
+        entry["Seconds"] += record["seconds"]
+        if "peak_bytes" in record:
+            entry["Process Peak MB"] = max(entry.get("Process Peak MB", 0.0), record["peak_bytes"] / 1e6)
+    return sorted(summary.values(), key=lambda entry: entry["Seconds"], reverse=True)
+
+# Streamlit Performance Panel
+class PerformancePanel:
+    """
+    Optional sidebar panel: call start_panel() at the top of a page and
+    render() at the end to show where the rerun spent its time.
+    """
+    def __init__(self, label):
+        import streamlit as st
+
+        self.placeholder = None
+        with st.sidebar.expander("Performance"):
+            self.enabled = st.checkbox("Profile this page", value=bool(os.environ.get(ENABLE_VARIABLE)),
+                                       key=f"profile:{label}")
+            memory = st.checkbox("Trace memory (slower)", key=f"profile_memory:{label}",
+                                 help="Peaks are measured for the whole server process, so they include "
+                                      "other sessions tracing at the same time.") if self.enabled else False
+            if self.enabled:
+                self.placeholder = st.empty()
+                start_run(label, memory)
+
+    def render(self):
+        if not self.enabled:
+            return
+        records = finish_run()
+        self.placeholder.dataframe(summarize(records) or [{"Stage": "No instrumented stages ran", "Seconds": 0.0}])
+
+def start_panel(label):
+    return PerformancePanel(label)
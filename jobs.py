@@ -0,0 +1,171 @@
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+DEFAULT_WORKERS = min(8, os.cpu_count() or 1)
+MAX_FINISHED_JOBS = 50  # Finished jobs (and their results) kept in the table
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "Queued", "Running", "Done", "Failed", "Cancelled"
+FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job at its next progress report once cancel() was requested.
+    """
+
+class Job:
+    """
+    One submitted unit of work and its state. The job itself is passed to the
+    work function as its `progress` callback: calling it with a fraction
+    records progress and raises JobCancelled after a cancellation request.
+    """
+    def __init__(self, job_id, owner, kind, label, key=None):
+        self.id = job_id
+        self.owner = owner
+        self.kind = kind
+        self.label = label
+        self.status = QUEUED
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished_at = None
+        self._key = key
+        self._cancel = threading.Event()
+        self._future = None
+
+    def __call__(self, fraction):
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(float(fraction), 0.0), 1.0)
+
+    @property
+    def finished(self):
+        return self.status in FINISHED_STATES
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def seconds(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started
+
+# Background Job Manager
+class JobManager:
+    """
+    Runs long work (training, batch forecasts, backtests) on a shared thread
+    pool so Streamlit reruns neither block on it nor discard it. Jobs and
+    their results live in a server-wide table keyed by job id; each session
+    polls the jobs it owns. The heavy numpy kernels release the GIL, so jobs
+    of several sessions run side by side on the in-memory datasets.
+    """
+    def __init__(self, max_workers=DEFAULT_WORKERS, max_finished=MAX_FINISHED_JOBS):
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scm-job")
+        self._jobs = OrderedDict()  # Job id -> Job, oldest first
+        self._active = {}  # Dedupe key -> queued or running job
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, owner, kind, function, *args, label=None, key=None, **kwargs):
+        """
+        Queue function(*args, progress=job, **kwargs) and return its Job.
+        While a job with the same key is queued or running, that job is
+        returned instead of starting the work twice.
+        """
+        with self._lock:
+            if key is not None and key in self._active:
+                return self._active[key]
+            job = Job(next(self._ids), owner, kind, label or kind, key)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._active[key] = job
+            job._future = self._pool.submit(self._run, job, function, args, kwargs)
+            self._prune()
+        return job
+
+    def _run(self, job, function, args, kwargs):
+        try:
+            if job.cancel_requested:
+                raise JobCancelled()
+            job.status = RUNNING
+            job.started = time.time()
+            job.result = function(*args, progress=job, **kwargs)
+            job.progress = 1.0
+            job.status = DONE
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            self._finish(job)
+
+    def _finish(self, job):
+        job.finished_at = time.time()
+        with self._lock:
+            if job._key is not None and self._active.get(job._key) is job:
+                del self._active[job._key]
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    def cancel(self, job_id):
+        """
+        Request cancellation. A queued job never starts; a running job stops
+        at its next progress report.
+        """
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job._cancel.set()
+            if job._future.cancel():
+                job.status = CANCELLED
+                self._finish(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        """
+        Jobs of one owner (or all jobs), newest first.
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in reversed(jobs) if owner is None or job.owner == owner]
+
+    def latest(self, owner, kind):
+        return next((job for job in self.jobs(owner) if job.kind == kind), None)
+
+    def to_frame(self, owner=None):
+        jobs = self.jobs(owner)
+        return pd.DataFrame({
+            'Job': [job.label for job in jobs],
+            'Status': [job.status for job in jobs],
+            'Progress %': [round(job.progress * 100, 1) for job in jobs],
+            'Seconds': [round(job.seconds(), 2) for job in jobs],
+            'Error': [job.error for job in jobs],
+        }, index=pd.Index([job.id for job in jobs], name='ID'))
+
+_default_manager = None
+_default_lock = threading.Lock()
+
+def default_job_manager():
+    """
+    Return the process-wide job manager shared by every Streamlit session.
+    """
+    global _default_manager
+    with _default_lock:
+        if _default_manager is None:
+            _default_manager = JobManager()
+        return _default_manager
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+DEFAULT_REGISTRY_DIR = os.path.join(os.path.expanduser("~"), ".cache", "scm-tools", "models")
+DEFAULT_MAX_BYTES = 512 * 1024 ** 2
+DEFAULT_MEMORY_ENTRIES = 64
+ALL_PRODUCTS = None  # Product argument for batch models covering the whole catalog
+
+# Model Registry
+class ModelRegistry:
+    """
+    Fitted models keyed by dataset hash, product and model parameters.
+    Models are pickled to local disk, loaded lazily on first request and kept
+    in a small in-memory LRU; the disk store is evicted least recently used
+    first once it grows past max_bytes.
+    """
+    def __init__(self, registry_dir=DEFAULT_REGISTRY_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 memory_entries=DEFAULT_MEMORY_ENTRIES):
+        self.registry_dir = registry_dir
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()  # Background jobs register models from worker threads
+        os.makedirs(self.registry_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(dataset_key, product, params):
+        # Catalog models get their own scope, so no product name can collide with them
+        scope = "catalog" if product is ALL_PRODUCTS else "product"
+        payload = json.dumps([dataset_key, scope, None if product is ALL_PRODUCTS else str(product), params],
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.registry_dir, f"{key}.pkl")
+
+    def _remember(self, key, model):
+        with self._lock:
+            self._memory[key] = model
+            self._memory.move_to_end(key)
+            if len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, dataset_key, product, params):
+        """
+        Return the fitted model, or None if it was never registered.
+        """
+        key = self.key_for(dataset_key, product, params)
+        with self._lock:
+            model = self._memory.get(key)
+            if model is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+
+        path = self._path(key)
+        if model is not None:
+            try:
+                os.utime(path)  # Memory hits count as use too, or eviction drops the busiest models
+            except OSError:
+                pass  # Evicted from disk; the memory copy is still valid
+            return model
+
+        try:
+            with open(path, "rb") as model_file:
+                model = pickle.load(model_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            self.misses += 1
+            return None
+
+        os.utime(path)  # Mark as recently used for LRU eviction
+        self._remember(key, model)
+        self.hits += 1
+        return model
+
+    def put(self, dataset_key, product, params, model):
+        """
+        Register a fitted model, persisting it to disk.
+        """
+        key = self.key_for(dataset_key, product, params)
+        handle, staging = tempfile.mkstemp(dir=self.registry_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(handle, "wb") as model_file:
+                pickle.dump(model, model_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(staging, self._path(key))
+        except Exception:
+            if os.path.exists(staging):
+                os.remove(staging)
+            raise
+        self._remember(key, model)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used models until the store fits in max_bytes.
+        """
+        entries = []
+        for entry in os.scandir(self.registry_dir):
+            if entry.is_file() and entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path, entry.name[:-len(".pkl")]))
+
+        total = sum(size for _, size, _, _ in entries)
+        for _, size, path, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Evicted concurrently by another job
+            with self._lock:
+                self._memory.pop(key, None)
+            total -= size
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+_default_registry = None
+
+def default_registry():
+    """
+    Return the process-wide registry shared by every Streamlit session.
+    """
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+    return _default_registry
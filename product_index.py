@@ -0,0 +1,105 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MEMO_BYTES = 1024 ** 3  # Indexed datasets kept in process, by frame bytes
+
+# Product Index
+class ProductIndex:
+    """
+    Sales rows sorted into one contiguous block per product.
+    Built once per dataset with a single stable sort; afterwards any product's
+    history is a zero-copy positional slice of the sorted frame, in the same
+    row order as the source.
+    """
+    def __init__(self, data):
+        self.source = data
+        codes, uniques = pd.factorize(data['Product'])
+        present = codes >= 0
+        if np.all(codes[:-1] <= codes[1:]) and present.all():
+            order = None  # Already in product blocks, skip the sort
+            sorted_codes = codes
+        else:
+            order = np.flatnonzero(present)[np.argsort(codes[present], kind='stable')]
+            sorted_codes = codes[order]
+
+        self.data = data if order is None else data.iloc[order]
+        self.products = np.asarray(uniques)
+        block_ids = np.arange(len(self.products))
+        self.starts = np.searchsorted(sorted_codes, block_ids, side='left')
+        self.ends = np.searchsorted(sorted_codes, block_ids, side='right')
+        self._positions = {product: position for position, product in enumerate(self.products)}
+        self._nbytes = None
+
+    def __len__(self):
+        return len(self.products)
+
+    @property
+    def nbytes(self):
+        # Measured once: deep memory_usage walks every string of object columns
+        if self._nbytes is None:
+            frames = (self.data,) if self.data is self.source else (self.data, self.source)
+            self._nbytes = int(sum(frame.memory_usage(deep=True).sum() for frame in frames)) \
+                + self.starts.nbytes + self.ends.nbytes
+        return self._nbytes
+
+    def __contains__(self, product):
+        return product in self._positions
+
+    def positions(self, products=None):
+        """
+        Return block positions for the given products (all when None),
+        skipping products that are not in the data.
+        """
+        if products is None:
+            return np.arange(len(self.products))
+        return np.array([self._positions[product] for product in products if product in self._positions],
+                        dtype=np.int64)
+
+    def rows(self, product):
+        """
+        Return the rows of one product as a slice of the sorted frame.
+        """
+        position = self._positions.get(product)
+        if position is None:
+            return self.data.iloc[0:0]
+        return self.data.iloc[self.starts[position]:self.ends[position]]
+
+    def column(self, name):
+        """
+        Return a column of the sorted frame as a NumPy array, for kernels that
+        work on the block offsets directly.
+        """
+        return self.data[name].to_numpy()
+
+_index_memo = OrderedDict()
+_index_lock = threading.Lock()  # Sessions and background jobs share the memo
+
+def product_index_for(key, load, max_bytes=MEMO_BYTES):
+    """
+    Return the ProductIndex of the dataset identified by key (for example a
+    DatasetCache content hash), calling load() and building it only on the
+    first request in this process. Returns None when load() returns None.
+    The least recently used indexes are dropped once the memo holds more
+    than max_bytes; the newest one is always kept.
+    """
+    with _index_lock:
+        index = _index_memo.get(key)
+        if index is not None:
+            _index_memo.move_to_end(key)
+            return index
+
+    # Load and sort outside the lock so other datasets are not held up
+    data = load()
+    if data is None:
+        return None
+    index = ProductIndex(data)
+    index.nbytes  # Measured here, outside the lock
+    with _index_lock:
+        index = _index_memo.setdefault(key, index)
+        _index_memo.move_to_end(key)
+        while len(_index_memo) > 1 and sum(memo.nbytes for memo in _index_memo.values()) > max_bytes:
+            _index_memo.popitem(last=False)
+    return index
@@ -1,84 +1,110 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-
-# Define a function to allocate resources
-def allocate_resources(demand, available_resources):
-    allocation = {}
-    remaining_demand = demand.copy()
-    
-    for resource, available in available_resources.items():
-        if resource in remaining_demand:
-            # Allocate as much as possible based on available resources
-            allocation[resource] = min(remaining_demand[resource], available)
-            remaining_demand[resource] -= allocation[resource]
-        
-        # If there's remaining demand, we can't fulfill it
-        if remaining_demand.get(resource, 0) > 0:
-            allocation[resource] = allocation.get(resource, 0) + remaining_demand[resource]
-            remaining_demand[resource] = 0
-    
-    return allocation, remaining_demand
+
+from allocation import allocate_frame
+from charting import data_fingerprint, default_renderer
+from instrumentation import start_panel
+from scheduling import DEFAULT_AGING_RATE, schedule_allocations
+
+MAX_PLOTTED_RESOURCES = 25  # Bars beyond this are unreadable; the tables hold everything
+
+panel = start_panel("Resource Allocation Tool")
 
 # Title of the app
 st.title("Resource Allocation Tool")
 
 # Input: Define resource demand
-st.subheader("Enter the demand for each resource")
-resources = ['Resource A', 'Resource B', 'Resource C']
-demand = {}
-for resource in resources:
-    demand[resource] = st.number_input(f"Demand for {resource}", min_value=0, value=0)
+st.subheader("Upload the demand for each resource")
+st.write("CSV with 'Resource', 'Site' and 'Demand' columns, and optionally 'Priority' (1 is served first).")
+demand_file = st.file_uploader("Upload demand CSV", type=["csv"])
 
 # Input: Define available resources
-st.subheader("Enter the available resources")
-available_resources = {}
-for resource in resources:
-    available_resources[resource] = st.number_input(f"Available {resource}", min_value=0, value=0)
+st.subheader("Upload the available resources")
+st.write("CSV with 'Resource' and 'Capacity' columns.")
+capacity_file = st.file_uploader("Upload capacity CSV", type=["csv"])
 
-# Initialize allocation and remaining demand to empty dicts
-allocation = {}
-remaining_demand = {}
+# Initialize allocation and remaining demand to empty results
+lines = pd.DataFrame()
+summary = pd.DataFrame()
 
 # Button to perform resource allocation
 if st.button("Allocate Resources"):
-    allocation, remaining_demand = allocate_resources(demand, available_resources)
-    
-    # Display allocation results
-    st.subheader("Resource Allocation Results")
-    allocation_df = pd.DataFrame(list(allocation.items()), columns=["Resource", "Allocated"])
-    st.write(allocation_df)
-    
-    # Display remaining demand
-    st.subheader("Remaining Demand")
-    remaining_demand_df = pd.DataFrame(list(remaining_demand.items()), columns=["Resource", "Remaining Demand"])
-    st.write(remaining_demand_df)
+    if demand_file is None or capacity_file is None:
+        st.error("Please upload both the demand and the capacity CSV files.")
+    else:
+        try:
+            lines, summary = allocate_frame(pd.read_csv(demand_file), pd.read_csv(capacity_file))
+        except Exception as e:
+            st.error(f"Error allocating resources: {e}")
+
+    if not summary.empty:
+        # Display allocation results
+        st.subheader("Resource Allocation Results")
+        st.write(summary)
+
+        # Display remaining demand per site
+        st.subheader("Allocation by Site")
+        st.write(lines)
+        st.download_button("Download allocation CSV", lines.to_csv(index=False), file_name="allocation.csv")
 
 # Optionally, add some visualizations
-def plot_allocation(allocation, remaining_demand):
-    if not allocation:  # Check if allocation is empty (i.e., no resources allocated yet)
+def plot_allocation(summary):
+    if summary.empty:  # Check if allocation is empty (i.e., no resources allocated yet)
         st.warning("Please click 'Allocate Resources' first.")
         return
-    
-    labels = list(allocation.keys())
-    allocated_values = list(allocation.values())
-    remaining_values = list(remaining_demand.values())
 
-    fig, ax = plt.subplots(figsize=(8, 6))
-    bar_width = 0.35
-    index = range(len(labels))
+    plotted = summary.nlargest(MAX_PLOTTED_RESOURCES, 'Demand')
+    labels = [str(resource) for resource in plotted.index]
+    allocated_values = plotted['Allocated'].to_numpy()
+    remaining_values = plotted['Shortfall'].to_numpy()
 
-    ax.bar(index, allocated_values, bar_width, label='Allocated')
-    ax.bar([i + bar_width for i in index], remaining_values, bar_width, label='Remaining Demand')
+    def draw(fig, ax):
+        bar_width = 0.35
+        index = range(len(labels))
 
-    ax.set_xlabel('Resources')
-    ax.set_ylabel('Units')
-    ax.set_title('Resource Allocation vs Remaining Demand')
-    ax.set_xticks([i + bar_width / 2 for i in index])
-    ax.set_xticklabels(labels)
-    ax.legend()
+        ax.bar(index, allocated_values, bar_width, label='Allocated')
+        ax.bar([i + bar_width for i in index], remaining_values, bar_width, label='Remaining Demand')
 
-    st.pyplot(fig)
+        ax.set_xlabel('Resources')
+        ax.set_ylabel('Units')
+        ax.set_title('Resource Allocation vs Remaining Demand')
+        ax.set_xticks([i + bar_width / 2 for i in index])
+        ax.set_xticklabels(labels, rotation=45, ha='right')
+        ax.legend()
+        fig.tight_layout()
+
+    # The figure is released after rendering; identical results reuse the cached image
+    key = data_fingerprint("plot_allocation", labels, allocated_values, remaining_values)
+    st.image(default_renderer().render(key, draw, figsize=(8, 6)))
 
 # Show the plot
-plot_allocation(allocation, remaining_demand)
+plot_allocation(summary)
+
+# Multi-period scheduling over a rolling horizon
+st.subheader("Multi-period Schedule")
+st.write("Orders CSV with 'Resource', 'Date' and 'Quantity' columns, optionally 'Order', 'Due' and 'Priority', "
+         "or a 'Product', 'Date', 'Forecast' file from the forecasting tools. "
+         "The capacity file gives the units replenished every day.")
+orders_file = st.file_uploader("Upload orders or forecast CSV", type=["csv"])
+aging_rate = st.number_input("Backlog aging (priority gained per day waiting)", min_value=0.0,
+                             value=DEFAULT_AGING_RATE, step=0.05)
+carry_capacity = st.checkbox("Carry unused capacity over to the next day")
+
+if st.button("Schedule Allocations"):
+    if orders_file is None or capacity_file is None:
+        st.error("Please upload both the orders and the capacity CSV files.")
+    else:
+        try:
+            capacity_file.seek(0)
+            fills, order_status, backlog = schedule_allocations(pd.read_csv(orders_file), pd.read_csv(capacity_file),
+                                                                aging_rate=aging_rate, carry_capacity=carry_capacity)
+        except Exception as e:
+            st.error(f"Error scheduling allocations: {e}")
+        else:
+            st.write(f"{int(order_status['Outstanding'].eq(0).sum())} of {len(order_status)} orders filled, "
+                     f"{int(order_status['Late'].sum())} late.")
+            st.line_chart(backlog.pivot_table(index='Date', values='Backlog', aggfunc='sum'))
+            st.write(order_status)
+            st.download_button("Download schedule CSV", fills.to_csv(index=False), file_name="schedule.csv")
+
+panel.render()
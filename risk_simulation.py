@@ -0,0 +1,145 @@
+import hashlib
+import math
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+
+# Annual probability of each 1-5 likelihood score and median loss of each 1-5 impact score
+LIKELIHOOD_PROBABILITY = np.array([0.05, 0.15, 0.35, 0.60, 0.85])
+IMPACT_MEDIAN_LOSS = np.array([10_000.0, 50_000.0, 250_000.0, 1_000_000.0, 5_000_000.0])
+DEFAULT_LOSS_SIGMA = 0.75  # Spread of the lognormal loss around the median
+DEFAULT_TRIALS = 100_000
+DEFAULT_CONFIDENCE = 0.95
+CHUNK_ELEMENTS = 4_000_000  # Trial x risk draws generated at once
+MEMO_SIZE = 8
+
+def risk_parameters(likelihood, impact):
+    """
+    Event probability and median loss of every risk from its 1-5 scores.
+    Risks that are not evaluated yet get zero probability.
+    """
+    likelihood = np.asarray(likelihood, dtype=float)
+    impact = np.asarray(impact, dtype=float)
+    evaluated = ~np.isnan(likelihood) & ~np.isnan(impact)
+    probability = np.zeros(len(likelihood))
+    median_loss = np.zeros(len(likelihood))
+    probability[evaluated] = LIKELIHOOD_PROBABILITY[likelihood[evaluated].astype(np.int64) - 1]
+    median_loss[evaluated] = IMPACT_MEDIAN_LOSS[impact[evaluated].astype(np.int64) - 1]
+    return probability, median_loss
+
+def _chunks(trials, risks, seed):
+    """
+    Yield (trial offset, trial count, generator) with reproducible per-chunk seeds.
+    """
+    size = max(1, CHUNK_ELEMENTS // max(risks, 1))
+    offsets = range(0, trials, size)
+    for offset, child in zip(offsets, np.random.SeedSequence(seed).spawn(len(offsets))):
+        yield offset, min(size, trials - offset), np.random.default_rng(child)
+
+def _chunk_losses(generator, count, probability, median_loss, sigma):
+    """
+    Losses of one chunk of trials as (trial, risk, loss) for the events that occur.
+    """
+    hits = np.nonzero(generator.random((count, len(probability)), dtype=np.float32) < probability)
+    losses = median_loss[hits[1]] * np.exp(sigma * generator.standard_normal(len(hits[0])))
+    return hits[0], hits[1], losses
+
+# Monte Carlo Exposure Simulation
+@timed()
+def simulate_exposure(likelihood, impact, trials=DEFAULT_TRIALS, confidence=DEFAULT_CONFIDENCE,
+                      sigma=DEFAULT_LOSS_SIGMA, seed=0):
+    """
+    Simulate the annual loss of a whole register at once. In every trial each
+    risk occurs with its probability and, if it does, costs a lognormal loss.
+    Trials are drawn in chunks so memory stays bounded for large registers.
+
+    Returns (summary, contributions): the expected loss, VaR and CVaR of the
+    total loss at the confidence level, and per risk its expected loss and its
+    contribution to CVaR (the mean of its loss over the tail trials; the
+    contributions add up to CVaR). The tail is the worst
+    ceil((1 - confidence) * trials) trials, so CVaR stays the mean of the worst
+    losses even when many trials tie at the VaR (for example at zero loss).
+    """
+    probability, median_loss = risk_parameters(likelihood, impact)
+    risks = len(probability)
+    if trials < 1:
+        raise ValueError("At least one trial is needed.")
+
+    totals = np.zeros(trials)
+    expected = np.zeros(risks)
+    for offset, count, generator in _chunks(trials, risks, seed):
+        rows, columns, losses = _chunk_losses(generator, count, probability, median_loss, sigma)
+        totals[offset:offset + count] = np.bincount(rows, weights=losses, minlength=count)
+        expected += np.bincount(columns, weights=losses, minlength=risks)
+    expected /= trials
+
+    value_at_risk = float(np.quantile(totals, confidence))
+    # Round first so that e.g. 0.05 * 100000 is not taken as 5000.000000000004
+    tail_trials = min(max(math.ceil(round((1 - confidence) * trials, 9)), 1), trials)
+    tail = np.zeros(trials, dtype=bool)
+    tail[np.argpartition(totals, trials - tail_trials)[trials - tail_trials:]] = True
+
+    # Second pass over the same draws: each risk's losses in the tail trials
+    tail_contribution = np.zeros(risks)
+    for offset, count, generator in _chunks(trials, risks, seed):
+        rows, columns, losses = _chunk_losses(generator, count, probability, median_loss, sigma)
+        in_tail = tail[offset + rows]
+        tail_contribution += np.bincount(columns[in_tail], weights=losses[in_tail], minlength=risks)
+    tail_contribution /= tail_trials
+
+    summary = {
+        "Trials": trials,
+        "Confidence": confidence,
+        "Expected Loss": float(totals.mean()),
+        "VaR": value_at_risk,
+        "CVaR": float(totals[tail].mean()),
+    }
+    contributions = pd.DataFrame({
+        "Probability": probability,
+        "Median Loss": median_loss,
+        "Expected Loss": expected,
+        "CVaR Contribution": tail_contribution,
+    })
+    return summary, contributions
+
+def register_fingerprint(snapshot, *params):
+    """
+    Version hash of a RiskStore snapshot's scores and names plus simulation parameters.
+    """
+    ids, names, likelihood, impact = snapshot
+    digest = hashlib.sha256()
+    for column in (ids, likelihood, impact):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    digest.update("\0".join(names).encode("utf-8"))
+    digest.update(repr(params).encode("utf-8"))
+    return digest.hexdigest()
+
+_memo = OrderedDict()
+
+def simulate_register(store, trials=DEFAULT_TRIALS, confidence=DEFAULT_CONFIDENCE, sigma=DEFAULT_LOSS_SIGMA, seed=0):
+    """
+    simulate_exposure over a RiskStore, with contributions labelled by risk
+    and ranked by CVaR contribution. Results are memoized by the register's
+    version hash, so reruns only simulate again after the risks change.
+    """
+    # One snapshot, so a risk added meanwhile cannot misalign the names and columns
+    snapshot = store.snapshot()
+    key = register_fingerprint(snapshot, trials, confidence, sigma, seed)
+    if key in _memo:
+        _memo.move_to_end(key)
+        return _memo[key]
+
+    ids, names, likelihood, impact = snapshot
+    summary, contributions = simulate_exposure(likelihood, impact, trials, confidence, sigma, seed)
+    contributions.index = pd.Index(ids, name="ID")
+    contributions.insert(0, "Risk", names)
+    contributions = contributions.sort_values(["CVaR Contribution", "Expected Loss"], ascending=False)
+    contributions["Rank"] = np.arange(1, len(contributions) + 1)
+
+    _memo[key] = (summary, contributions)
+    if len(_memo) > MEMO_SIZE:
+        _memo.popitem(last=False)
+    return summary, contributions
@@ -0,0 +1,368 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_RISK_DB = os.path.join(os.path.expanduser("~"), ".cache", "scm-tools", "risks.sqlite3")
+RISK_COLUMNS = ["Risk", "Likelihood", "Impact", "Mitigation Strategy", "Status"]
+NOT_MITIGATED = "Not Mitigated"
+MITIGATED = "Mitigated"
+DEFAULT_IMPORT_CHUNKSIZE = 50_000
+SCORE_RANGE = (1, 5)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS risks (
+    id INTEGER PRIMARY KEY,
+    risk TEXT NOT NULL UNIQUE,
+    likelihood INTEGER,
+    impact INTEGER,
+    mitigation TEXT,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS risks_status ON risks (status);
+"""
+
+def _scores(values, column):
+    scores = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=float)
+    low, high = SCORE_RANGE
+    invalid = ~np.isnan(scores) & ((scores < low) | (scores > high) | (scores != np.round(scores)))
+    if invalid.any():
+        raise ValueError(f"{column} must be a whole number from {low} to {high}.")
+    return scores
+
+def _texts(values):
+    return [None if value is None or (isinstance(value, float) and np.isnan(value)) or value == "" else str(value)
+            for value in values]
+
+def _optional(score):
+    return None if np.isnan(score) else int(score)
+
+def _sql_values(column, values):
+    if column in ('likelihood', 'impact'):
+        return [_optional(score) for score in values]
+    return list(values)
+
+def _normalize_register(frame):
+    """
+    Validate an imported frame and fill the optional register columns.
+    """
+    if "Risk" not in frame.columns:
+        raise ValueError("Risk register must contain a 'Risk' column.")
+    names = frame["Risk"]
+    if names.isna().any():
+        raise ValueError("Every risk needs a name.")
+    rows = len(frame)
+    normalized = pd.DataFrame({
+        "Risk": names.astype(str).to_numpy(dtype=object),
+        "Likelihood": _scores(frame["Likelihood"] if "Likelihood" in frame.columns else [None] * rows, "Likelihood"),
+        "Impact": _scores(frame["Impact"] if "Impact" in frame.columns else [None] * rows, "Impact"),
+        "Mitigation Strategy": _texts(frame["Mitigation Strategy"].tolist() if "Mitigation Strategy" in frame.columns
+                                      else [None] * rows),
+        "Status": (frame["Status"].fillna(NOT_MITIGATED).astype(str).to_numpy(dtype=object)
+                   if "Status" in frame.columns else NOT_MITIGATED),
+    })
+    # A name repeated in one file keeps its last row
+    return normalized.drop_duplicates("Risk", keep="last")
+
+# Risk Register Store
+class RiskStore:
+    """
+    Risk register persisted to a local SQLite database. The register is also
+    held in memory: a dict from risk name to row for constant-time lookups,
+    and growable NumPy columns for Likelihood and Impact (NaN until
+    evaluated) so scoring reads whole columns. Appends write one row and
+    amortize column growth, so adding a risk does not copy the register.
+    """
+    def __init__(self, path=DEFAULT_RISK_DB):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Streamlit reruns a session's script on different threads; the lock serializes access
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self.revision = 0  # Bumped by every change, so derived views can be cached per revision
+        # Write-ahead logging: single-row commits append to the log without a full sync
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.executescript(SCHEMA)
+        self._load()
+
+    def _reset(self, capacity=16):
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._likelihood = np.full(capacity, np.nan)
+        self._impact = np.full(capacity, np.nan)
+        self._names = []
+        self._mitigation = []
+        self._status = []
+        self._positions = {}
+
+    def _load(self):
+        rows = self._connection.execute(
+            "SELECT id, risk, likelihood, impact, mitigation, status FROM risks ORDER BY id").fetchall()
+        self._reset(max(16, len(rows)))
+        for risk_id, name, likelihood, impact, mitigation, status in rows:
+            self._append_row(risk_id, name, likelihood, impact, mitigation, status)
+
+    def _append_row(self, risk_id, name, likelihood, impact, mitigation, status):
+        if self._size == len(self._ids):
+            grow = len(self._ids)
+            self._ids = np.concatenate([self._ids, np.zeros(grow, dtype=np.int64)])
+            self._likelihood = np.concatenate([self._likelihood, np.full(grow, np.nan)])
+            self._impact = np.concatenate([self._impact, np.full(grow, np.nan)])
+        row = self._size
+        self._ids[row] = risk_id
+        self._likelihood[row] = np.nan if likelihood is None else likelihood
+        self._impact[row] = np.nan if impact is None else impact
+        self._names.append(name)
+        self._mitigation.append(mitigation)
+        self._status.append(status)
+        self._positions[name] = row
+        self._size += 1
+
+    def _row(self, name):
+        row = self._positions.get(name)
+        if row is None:
+            raise ValueError(f"Unknown risk: {name}")
+        return row
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, name):
+        return name in self._positions
+
+    def names(self):
+        with self._lock:
+            return list(self._names)
+
+    def add(self, name, likelihood=None, impact=None, mitigation=None, status=NOT_MITIGATED):
+        """
+        Add a risk and return its ID. Risk names are unique.
+        """
+        with self._lock:
+            if name in self._positions:
+                raise ValueError(f"Risk '{name}' already exists.")
+            with self._connection:
+                cursor = self._connection.execute(
+                    "INSERT INTO risks (risk, likelihood, impact, mitigation, status) VALUES (?, ?, ?, ?, ?)",
+                    (name, likelihood, impact, mitigation, status))
+            self._append_row(cursor.lastrowid, name, likelihood, impact, mitigation, status)
+            self.revision += 1
+            return cursor.lastrowid
+
+    def evaluate(self, name, likelihood, impact):
+        """
+        Record the 1-5 likelihood and impact of a risk.
+        """
+        self.update_many([name], likelihood=[likelihood], impact=[impact])
+
+    def mitigate(self, name, strategy):
+        """
+        Record the mitigation strategy of a risk and mark it mitigated.
+        """
+        self.update_many([name], mitigation=[strategy], status=[MITIGATED])
+
+    def update_many(self, names, likelihood=None, impact=None, mitigation=None, status=None):
+        """
+        Apply many changes in one transaction. Each field is None (unchanged)
+        or a sequence aligned with names; scores may be missing (NaN/None).
+        """
+        with self._lock:
+            rows = np.array([self._row(name) for name in names], dtype=np.int64)
+            changes = {}
+            if likelihood is not None:
+                changes['likelihood'] = _scores(likelihood, "Likelihood")
+            if impact is not None:
+                changes['impact'] = _scores(impact, "Impact")
+            if mitigation is not None:
+                changes['mitigation'] = _texts(mitigation)
+            if status is not None:
+                changes['status'] = [str(value) for value in status]
+            if not changes or len(rows) == 0:
+                return
+
+            assignments = ", ".join(f"{column} = ?" for column in changes)
+            values = [_sql_values(column, changes[column]) for column in changes]
+            with self._connection:
+                self._connection.executemany(f"UPDATE risks SET {assignments} WHERE id = ?",
+                                             zip(*values, self._ids[rows].tolist()))
+
+            if 'likelihood' in changes:
+                self._likelihood[rows] = changes['likelihood']
+            if 'impact' in changes:
+                self._impact[rows] = changes['impact']
+            for column, target in (('mitigation', self._mitigation), ('status', self._status)):
+                for row, value in zip(rows.tolist(), changes.get(column, ())):
+                    target[row] = value
+            self.revision += 1
+
+    # Bulk Import and Export
+    def import_frame(self, frame, update_existing=True):
+        """
+        Insert or update risks from a frame with a 'Risk' column and any of
+        'Likelihood', 'Impact', 'Mitigation Strategy' and 'Status'. Returns
+        the number of new risks.
+        """
+        return self.import_chunks([frame], update_existing)
+
+    def import_csv(self, file, chunksize=DEFAULT_IMPORT_CHUNKSIZE, update_existing=True):
+        """
+        Stream a register CSV into the store chunk by chunk in one transaction.
+        """
+        return self.import_chunks(pd.read_csv(file, chunksize=chunksize), update_existing)
+
+    def import_columns(self, file, update_existing=True):
+        """
+        Import a register written by export_columns.
+        """
+        with np.load(file, allow_pickle=False) as columns:
+            frame = pd.DataFrame({column: columns[column] for column in RISK_COLUMNS if column in columns.files})
+        return self.import_frame(frame, update_existing)
+
+    def import_chunks(self, chunks, update_existing=True):
+        """
+        Import an iterable of frames with batched inserts. Risks that already
+        exist are overwritten when update_existing is set and skipped
+        otherwise. Either every chunk is stored or none is.
+        """
+        conflict = ("DO UPDATE SET likelihood = excluded.likelihood, impact = excluded.impact, "
+                    "mitigation = excluded.mitigation, status = excluded.status") if update_existing else "DO NOTHING"
+        added = 0
+        with self._lock:
+            try:
+                with self._connection:
+                    for chunk in chunks:
+                        added += self._import_chunk(_normalize_register(chunk), conflict, update_existing)
+            except Exception:
+                self._load()  # The transaction rolled back; drop the partial in-memory changes
+                raise
+            finally:
+                self.revision += 1
+        return added
+
+    def _import_chunk(self, chunk, conflict, update_existing):
+        names = chunk['Risk'].tolist()
+        likelihood = chunk['Likelihood'].to_numpy(dtype=float)
+        impact = chunk['Impact'].to_numpy(dtype=float)
+        mitigation = chunk['Mitigation Strategy'].tolist()
+        status = chunk['Status'].tolist()
+
+        last_id = int(self._ids[self._size - 1]) if self._size else 0
+        self._connection.executemany(
+            f"INSERT INTO risks (risk, likelihood, impact, mitigation, status) VALUES (?, ?, ?, ?, ?) "
+            f"ON CONFLICT (risk) {conflict}",
+            zip(names, _sql_values('likelihood', likelihood), _sql_values('impact', impact), mitigation, status))
+
+        existing = np.array([name in self._positions for name in names], dtype=bool)
+        if update_existing and existing.any():
+            rows = np.array([self._positions[name] for name in chunk['Risk'].to_numpy()[existing]], dtype=np.int64)
+            self._likelihood[rows] = likelihood[existing]
+            self._impact[rows] = impact[existing]
+            for row, position in zip(rows.tolist(), np.flatnonzero(existing).tolist()):
+                self._mitigation[row] = mitigation[position]
+                self._status[row] = status[position]
+
+        # New rows get increasing IDs past the previous maximum. Other writers to the
+        # database may have added rows too, so the mirror takes them as stored
+        new_rows = self._connection.execute(
+            "SELECT id, risk, likelihood, impact, mitigation, status FROM risks WHERE id > ? ORDER BY id",
+            (last_id,)).fetchall()
+        fresh = set(chunk['Risk'].to_numpy()[~existing].tolist())
+        count = 0
+        for risk_id, name, row_likelihood, row_impact, row_mitigation, row_status in new_rows:
+            self._append_row(risk_id, name, row_likelihood, row_impact, row_mitigation, row_status)
+            count += name in fresh
+        return count
+
+    def export_csv(self, file=None):
+        """
+        Write the register as CSV; returns the text when no file is given.
+        """
+        return self.to_frame().to_csv(file)
+
+    def export_columns(self, file):
+        """
+        Write the register as a columnar NumPy .npz archive.
+        """
+        with self._lock:
+            ids, likelihood, impact = self.columns()
+            names, status = list(self._names), list(self._status)
+            mitigation = np.array(["" if value is None else value for value in self._mitigation], dtype=str)
+        np.savez_compressed(file, ID=ids, Risk=np.array(names, dtype=str), Likelihood=likelihood,
+                            Impact=impact, Status=np.array(status, dtype=str),
+                            **{"Mitigation Strategy": mitigation})
+
+    def get(self, name):
+        """
+        Return one risk as a {column: value} dict.
+        """
+        with self._lock:
+            row = self._row(name)
+            return dict(zip(RISK_COLUMNS, (
+                self._names[row],
+                None if np.isnan(self._likelihood[row]) else int(self._likelihood[row]),
+                None if np.isnan(self._impact[row]) else int(self._impact[row]),
+                self._mitigation[row],
+                self._status[row],
+            )))
+
+    def columns(self):
+        """
+        Return a read-only snapshot of the (ids, likelihood, impact) columns.
+        Copies, so later updates from other sessions never change them.
+        """
+        with self._lock:
+            snapshot = (self._ids[:self._size].copy(), self._likelihood[:self._size].copy(),
+                        self._impact[:self._size].copy())
+        for column in snapshot:
+            column.flags.writeable = False
+        return snapshot
+
+    def snapshot(self):
+        """
+        Return (ids, names, likelihood, impact) read together under the lock,
+        so the columns always have the same length.
+        """
+        with self._lock:
+            ids, likelihood, impact = self.columns()
+            return ids, list(self._names), likelihood, impact
+
+    def to_frame(self):
+        """
+        The register as a DataFrame with the app's columns, indexed by ID.
+        """
+        with self._lock:
+            ids, names, likelihood, impact = self.snapshot()
+            mitigation, status = list(self._mitigation), list(self._status)
+        return pd.DataFrame({
+            "Risk": names,
+            "Likelihood": pd.array(likelihood, dtype="Float64").astype("Int64"),
+            "Impact": pd.array(impact, dtype="Float64").astype("Int64"),
+            "Mitigation Strategy": mitigation,
+            "Status": status,
+        }, index=pd.Index(ids, name="ID"), columns=RISK_COLUMNS)
+
+    def clear(self):
+        """
+        Delete every risk.
+        """
+        with self._lock:
+            with self._connection:
+                self._connection.execute("DELETE FROM risks")
+            self._reset()
+            self.revision += 1
+
+_default_store = None
+
+def default_risk_store():
+    """
+    Return the process-wide store shared by every Streamlit session.
+    """
+    global _default_store
+    if _default_store is None:
+        _default_store = RiskStore()
+    return _default_store
@@ -1,5 +1,13 @@
-import streamlit as st
+import io
+
 import pandas as pd
+import streamlit as st
+
+from instrumentation import start_panel
+from risk_simulation import DEFAULT_CONFIDENCE, DEFAULT_TRIALS, simulate_register
+from risk_store import MITIGATED, NOT_MITIGATED, RISK_COLUMNS, default_risk_store
+
+panel = start_panel("Risk Assessment")
 
 # Title and description of the app
 st.title("Risk Assessment: Identifying and Mitigating Risks")
@@ -10,35 +18,53 @@ st.write("""
 
 # Function to load the risks data (if any)
 def load_risks():
-    # This could be a file read in practice, here it's a placeholder for simplicity.
-    return pd.DataFrame(columns=["Risk", "Likelihood", "Impact", "Mitigation Strategy", "Status"])
+    # The register lives in a local SQLite database, so it outlives the session
+    return default_risk_store()
 
-# Session state for storing the risks data
-if "risks" not in st.session_state:
-    st.session_state.risks = load_risks()
+risks = load_risks()
 
 # Risk identification section
 st.header("Step 1: Identify Risks")
 risk_name = st.text_input("Enter a Risk Description:")
 
 if st.button("Add Risk") and risk_name:
-    new_risk = {
-        "Risk": risk_name,
-        "Likelihood": None,
-        "Impact": None,
-        "Mitigation Strategy": None,
-        "Status": "Not Mitigated"
-    }
-    st.session_state.risks = st.session_state.risks.append(new_risk, ignore_index=True)
-    st.success(f"Risk '{risk_name}' added!")
+    try:
+        risks.add(risk_name)
+        st.success(f"Risk '{risk_name}' added!")
+    except ValueError as e:
+        st.error(str(e))
+
+# Bulk import of a risk register kept in a spreadsheet
+with st.expander("Import or export the risk register"):
+    register_file = st.file_uploader("Upload a risk register (CSV or NPZ)", type=["csv", "npz"])
+    update_existing = st.checkbox("Overwrite risks that already exist", value=True)
+    if st.button("Import Risks") and register_file is not None:
+        try:
+            if register_file.name.endswith(".npz"):
+                added = risks.import_columns(register_file, update_existing=update_existing)
+            else:
+                added = risks.import_csv(register_file, update_existing=update_existing)
+            st.success(f"Imported {added} new risks; the register now holds {len(risks)}.")
+        except Exception as e:
+            st.error(f"Error importing risks: {e}")
+
+    # Exports are rebuilt only when the register changed since the last rerun
+    if st.session_state.get("export_revision") != risks.revision:
+        columnar = io.BytesIO()
+        risks.export_columns(columnar)
+        st.session_state.export_csv = risks.export_csv()
+        st.session_state.export_npz = columnar.getvalue()
+        st.session_state.export_revision = risks.revision
+    st.download_button("Download register CSV", st.session_state.export_csv, file_name="risks.csv")
+    st.download_button("Download register NPZ", st.session_state.export_npz, file_name="risks.npz")
 
 # Display the current risks
 st.write("### Current Risks List")
-st.dataframe(st.session_state.risks)
+st.dataframe(risks.to_frame())
 
 # Risk evaluation section
 st.header("Step 2: Evaluate Risk Likelihood and Impact")
-risk_to_evaluate = st.selectbox("Select a risk to evaluate", st.session_state.risks["Risk"])
+risk_to_evaluate = st.selectbox("Select a risk to evaluate", risks.names())
 
 # Likelihood and Impact Sliders
 if risk_to_evaluate:
@@ -46,28 +72,76 @@ if risk_to_evaluate:
     impact = st.slider("Impact (1-5)", 1, 5, 3)
     
     if st.button(f"Evaluate Risk '{risk_to_evaluate}'"):
-        risk_index = st.session_state.risks[st.session_state.risks["Risk"] == risk_to_evaluate].index[0]
-        st.session_state.risks.at[risk_index, "Likelihood"] = likelihood
-        st.session_state.risks.at[risk_index, "Impact"] = impact
+        risks.evaluate(risk_to_evaluate, likelihood, impact)
         st.success(f"Risk '{risk_to_evaluate}' evaluated with Likelihood: {likelihood} and Impact: {impact}")
 
+# Batch evaluation: edit many rows, then apply them in one transaction
+with st.expander("Evaluate many risks at once"):
+    register = risks.to_frame()
+    edited = st.data_editor(
+        register,
+        disabled=["Risk", "Mitigation Strategy"],
+        column_config={
+            "Likelihood": st.column_config.NumberColumn(min_value=1, max_value=5, step=1),
+            "Impact": st.column_config.NumberColumn(min_value=1, max_value=5, step=1),
+            "Status": st.column_config.SelectboxColumn(options=[NOT_MITIGATED, MITIGATED]),
+        },
+        key="batch_evaluation",
+    )
+    if st.button("Apply Changes"):
+        before = register[RISK_COLUMNS].astype(object).fillna("")
+        changed = (edited[RISK_COLUMNS].astype(object).fillna("") != before).any(axis=1)
+        updates = edited[changed]
+        try:
+            risks.update_many(updates["Risk"].tolist(), likelihood=updates["Likelihood"].tolist(),
+                              impact=updates["Impact"].tolist(), status=updates["Status"].tolist())
+            st.success(f"Updated {len(updates)} risks.")
+        except ValueError as e:
+            st.error(str(e))
+
 # Mitigation strategies section
 st.header("Step 3: Mitigate Risks")
-risk_to_mitigate = st.selectbox("Select a risk to mitigate", st.session_state.risks["Risk"])
+risk_to_mitigate = st.selectbox("Select a risk to mitigate", risks.names())
 
 if risk_to_mitigate:
     mitigation = st.text_area("Enter Mitigation Strategy")
     if st.button(f"Add Mitigation Strategy for '{risk_to_mitigate}'"):
-        risk_index = st.session_state.risks[st.session_state.risks["Risk"] == risk_to_mitigate].index[0]
-        st.session_state.risks.at[risk_index, "Mitigation Strategy"] = mitigation
-        st.session_state.risks.at[risk_index, "Status"] = "Mitigated"
+        risks.mitigate(risk_to_mitigate, mitigation)
         st.success(f"Mitigation strategy for '{risk_to_mitigate}' added!")
 
 # Display the risks with evaluations and mitigation
 st.write("### Risk Assessment Overview")
-st.dataframe(st.session_state.risks)
+overview = risks.to_frame()
+overview["Score"] = overview["Likelihood"] * overview["Impact"]
+st.dataframe(overview)
+
+# Risk exposure: score heatmap and Monte Carlo simulation
+st.header("Step 4: Quantify Risk Exposure")
+st.write("Number of risks by likelihood (rows) and impact (columns):")
+scores = range(1, 6)
+heatmap = pd.crosstab(overview["Likelihood"], overview["Impact"]).reindex(index=scores, columns=scores, fill_value=0)
+st.dataframe(heatmap.style.background_gradient(cmap="Reds", axis=None))
+
+trials = st.select_slider("Simulation trials", options=[10_000, 50_000, 100_000, 250_000, 500_000],
+                          value=DEFAULT_TRIALS)
+confidence = st.slider("Confidence level", 0.80, 0.99, DEFAULT_CONFIDENCE, 0.01)
+if st.button("Simulate Exposure"):
+    st.session_state.exposure_settings = (trials, confidence)
+
+# Results are cached by register version, so reruns only simulate again after the risks change
+if "exposure_settings" in st.session_state and len(risks):
+    summary, contributions = simulate_register(risks, *st.session_state.exposure_settings)
+    level = f"{summary['Confidence']:.0%}"
+    columns = st.columns(3)
+    columns[0].metric("Expected annual loss", f"{summary['Expected Loss']:,.0f}")
+    columns[1].metric(f"VaR ({level})", f"{summary['VaR']:,.0f}")
+    columns[2].metric(f"CVaR ({level})", f"{summary['CVaR']:,.0f}")
+    st.write("Risks ranked by contribution to CVaR:")
+    st.dataframe(contributions)
 
 # Option to reset or clear the risk data
 if st.button("Clear All Risks"):
-    st.session_state.risks = load_risks()
+    risks.clear()
     st.success("All risks have been cleared.")
+
+panel.render()
@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+
+from ingest import sales_dates
+from product_index import ProductIndex, product_index_for
+
+RESOLUTIONS = ("Daily", "Weekly", "Monthly", "Quarterly")
+# Each level is rolled up from the finest level that nests inside it
+PARENT_RESOLUTION = {"Weekly": "Daily", "Monthly": "Daily", "Quarterly": "Monthly"}
+
+def _day_numbers(dates):
+    return np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+
+def period_numbers(dates, resolution):
+    """
+    Sequential period number of every date: days, Monday-based weeks,
+    calendar months or calendar quarters since 1970.
+    """
+    days = _day_numbers(dates)
+    if resolution == "Daily":
+        return days
+    if resolution == "Weekly":
+        return (days + 3) // 7  # 1970-01-01 was a Thursday
+    months = days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+    return months if resolution == "Monthly" else months // 3
+
+def period_start_dates(numbers, resolution):
+    """
+    First date of each period number produced by period_numbers.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if resolution == "Daily":
+        days = numbers.astype('datetime64[D]')
+    elif resolution == "Weekly":
+        days = (numbers * 7 - 3).astype('datetime64[D]')
+    else:
+        months = numbers if resolution == "Monthly" else numbers * 3
+        days = months.astype('datetime64[M]').astype('datetime64[D]')
+    return days.astype('datetime64[ns]')
+
+def shift_periods(dates, steps, resolution):
+    """
+    Period start dates `steps` periods after each date, as a (dates, steps) matrix.
+    """
+    numbers = period_numbers(dates, resolution)
+    return period_start_dates(numbers[:, None] + np.asarray(steps)[None, :], resolution)
+
+def period_lengths(numbers, resolution):
+    """
+    Number of days in each period number produced by period_numbers.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    return _day_numbers(period_start_dates(numbers + 1, resolution)) - _day_numbers(period_start_dates(numbers, resolution))
+
+def covered_days(numbers, first_day, last_day, resolution):
+    """
+    Days of each period that fall inside a product's sales span, given the
+    day numbers of its first and last sale. Only a product's first and last
+    periods can be partly covered.
+    """
+    numbers = np.asarray(numbers, dtype=np.int64)
+    starts = _day_numbers(period_start_dates(numbers, resolution))
+    ends = _day_numbers(period_start_dates(numbers + 1, resolution))
+    return np.maximum(np.minimum(ends, np.asarray(last_day) + 1) - np.maximum(starts, first_day), 0)
+
+def rollup(data, resolution):
+    """
+    Sales per product and period. data is a sales frame or ProductIndex;
+    the result has a 'Date' index of period start dates with 'Product',
+    'Sales', 'Total' and 'Days' columns, in product blocks so indexing it
+    needs no sort. 'Total' is the summed sales and 'Days' the days of the
+    period inside the product's sales span. The first and last periods of a
+    product are usually only partly covered, so 'Sales' scales their totals
+    to a full-period rate; forecasts and charts then do not read a short
+    edge period as a slump. Rolling up a rollup sums its totals and days.
+    """
+    index = data if isinstance(data, ProductIndex) else ProductIndex(data)
+    codes = np.repeat(np.arange(len(index)), index.ends - index.starts)
+    dates = sales_dates(index.data).to_numpy()
+    periods = period_numbers(dates, resolution)
+    rolled = 'Days' in index.data.columns
+    sales = index.column('Total' if rolled else 'Sales').astype(float)
+    days = index.column('Days').astype(np.int64) if rolled else None
+
+    keys = np.stack([codes, periods])
+    if len(periods) and np.any((codes[1:] == codes[:-1]) & (periods[1:] < periods[:-1])):
+        order = np.lexsort((periods, codes))
+        keys, sales = keys[:, order], sales[order]
+        days = days[order] if rolled else None
+
+    boundaries = np.flatnonzero(np.any(keys[:, 1:] != keys[:, :-1], axis=0)) + 1
+    starts = np.concatenate([[0], boundaries]) if len(sales) else np.empty(0, dtype=np.int64)
+    totals = np.add.reduceat(np.where(np.isnan(sales), 0.0, sales), starts) if len(sales) else np.empty(0)
+    period_keys = keys[1, starts]
+    if rolled:
+        coverage = np.add.reduceat(days, starts) if len(sales) else np.empty(0, dtype=np.int64)
+    else:
+        day_numbers = _day_numbers(dates)
+        first_day = np.minimum.reduceat(day_numbers, index.starts) if len(index) else day_numbers[:0]
+        last_day = np.maximum.reduceat(day_numbers, index.starts) if len(index) else day_numbers[:0]
+        product_codes = keys[0, starts]
+        coverage = covered_days(period_keys, first_day[product_codes], last_day[product_codes], resolution)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rates = np.where(coverage > 0, totals * period_lengths(period_keys, resolution) / coverage, totals)
+    return pd.DataFrame({
+        'Product': index.products[keys[0, starts]],
+        'Sales': rates,
+        'Total': totals,
+        'Days': coverage,
+    }, index=pd.DatetimeIndex(period_start_dates(period_keys, resolution), name='Date'))
+
+# Rollup Pyramid
+def rollup_index_for(cache, dataset_key, base, resolution):
+    """
+    ProductIndex of one level of the daily -> weekly -> monthly -> quarterly
+    pyramid for a dataset. Each level is built once from its parent level,
+    stored in the DatasetCache next to the dataset and memoized in process,
+    so switching resolution only costs a lookup. base is the dataset's
+    ProductIndex, or a callable returning it when it is not loaded yet.
+    """
+    level_key = f"{dataset_key}:rollup:{resolution}"
+
+    def load_level():
+        level = cache.get(level_key)
+        if level is None or 'Days' not in level.columns:  # Levels cached before edge scaling are rebuilt
+            if resolution == "Daily":
+                parent = base() if callable(base) else base
+            else:
+                parent = rollup_index_for(cache, dataset_key, base, PARENT_RESOLUTION[resolution])
+            level = rollup(parent, resolution)
+            cache.put(level_key, level)
+        return level
+
+    return product_index_for(level_key, load_level)
+
+def forecast_dates(last_dates, forecast_days, resolution):
+    """
+    Forecast period dates starting the period after each product's last
+    period, matching the daily convention of forecasting.tidy_forecast.
+    """
+    return shift_periods(last_dates, np.arange(1, forecast_days + 1), resolution).ravel()
@@ -0,0 +1,50 @@
+import streamlit as st
+
+from calendar_alignment import AGGREGATIONS, FILL_RULES, sales_calendar_for
+from dataset_cache import default_cache
+from ingest import load_sales_data
+from product_index import product_index_for
+from rollups import RESOLUTIONS, rollup_index_for
+
+NO_ALIGNMENT = "Off (rows as given)"
+LOAD_NAMESPACE = "load_sales_data"  # Every page parsing with load_sales_data shares its cache entries
+
+# Shared Sales Loading
+def load_sales_index(content):
+    """
+    Parse uploaded CSV bytes with load_sales_data through the dataset cache
+    and the in-process ProductIndex memo. Returns (dataset_key, index).
+    """
+    cache = default_cache()
+    dataset_key = cache.key_for(content, LOAD_NAMESPACE)
+    index = product_index_for(dataset_key, lambda: cache.get_or_load(content, load_sales_data, key=dataset_key))
+    return dataset_key, index
+
+# Sidebar Resolution and Calendar Controls
+def sales_view_sidebar(dataset_key, index):
+    """
+    Sidebar controls for the time step and calendar alignment of a loaded
+    dataset. Returns (resolution, index, source): index is rolled up to the
+    resolution, and source is a SalesCalendar when a fill rule is chosen,
+    otherwise the index itself.
+    """
+    cache = default_cache()
+    st.sidebar.caption(f"Dataset cache: {cache.hits} hits, {cache.misses} misses")
+
+    # Weekly and coarser views read a precomputed rollup level instead of the raw rows
+    resolution = st.sidebar.selectbox("Resolution", RESOLUTIONS)
+    if resolution != "Daily":
+        index = rollup_index_for(cache, dataset_key, index, resolution)
+
+    # Align every product onto one shared calendar so windows span periods, not rows; off unless chosen
+    gap_fill = st.sidebar.selectbox("Fill missing periods", (NO_ALIGNMENT,) + FILL_RULES)
+    source = index
+    if gap_fill != NO_ALIGNMENT:
+        duplicates = st.sidebar.selectbox("Duplicate dates", AGGREGATIONS)
+        try:
+            source = sales_calendar_for(dataset_key, index, resolution, gap_fill, duplicates)
+            st.sidebar.caption(f"Calendar: {len(source.periods)} periods, "
+                               f"{int(source.summary()['Duplicate Rows'].sum())} duplicate rows merged")
+        except ValueError as e:
+            st.error(f"Calendar alignment skipped: {e}")
+    return resolution, index, source
@@ -0,0 +1,164 @@
+import heapq
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from allocation import DEFAULT_PRIORITY, allocate_resources
+from instrumentation import timed
+
+ORDER_COLUMNS = ['Resource', 'Date', 'Quantity']
+FORECAST_COLUMNS = ['Product', 'Date', 'Forecast']
+DEFAULT_AGING_RATE = 0.1  # Priority points an order gains for every period it waits
+
+def orders_from_forecast(forecast, priority=DEFAULT_PRIORITY, due_periods=0):
+    """
+    Turn a tidy 'Product', 'Date', 'Forecast' frame (forecast_all_products,
+    forecast_all_trends or forecast_cli output) into scheduler orders: one
+    order per product and day, for the product as the resource.
+    """
+    if not set(FORECAST_COLUMNS).issubset(forecast.columns):
+        raise ValueError("Forecast must contain 'Product', 'Date', and 'Forecast' columns.")
+    dates = pd.to_datetime(forecast['Date'])
+    return pd.DataFrame({
+        'Order': np.arange(len(forecast)),
+        'Resource': forecast['Product'].to_numpy(),
+        'Date': dates.to_numpy(),
+        'Due': (dates + pd.Timedelta(days=due_periods)).to_numpy(),
+        'Priority': priority,
+        'Quantity': np.clip(pd.to_numeric(forecast['Forecast'], errors='coerce').fillna(0).to_numpy(), 0, None),
+    })
+
+def _prepare_orders(orders):
+    if set(FORECAST_COLUMNS).issubset(orders.columns) and 'Resource' not in orders.columns:
+        orders = orders_from_forecast(orders)
+    if not set(ORDER_COLUMNS).issubset(orders.columns):
+        raise ValueError("Orders must contain 'Resource', 'Date', and 'Quantity' columns.")
+
+    orders = orders.copy()
+    orders['Date'] = pd.to_datetime(orders['Date']).dt.normalize()
+    orders['Due'] = pd.to_datetime(orders['Due']).dt.normalize() if 'Due' in orders.columns else orders['Date']
+    orders['Priority'] = pd.to_numeric(orders['Priority'], errors='coerce') if 'Priority' in orders.columns \
+        else DEFAULT_PRIORITY
+    orders['Quantity'] = pd.to_numeric(orders['Quantity'], errors='coerce')
+    if 'Order' not in orders.columns:
+        orders['Order'] = np.arange(len(orders))
+    if orders[['Date', 'Priority', 'Quantity']].isna().any().any():
+        raise ValueError("Every order needs a valid Date, Priority and Quantity.")
+    if (orders['Quantity'] < 0).any():
+        raise ValueError("Order quantities must not be negative.")
+    return orders.reset_index(drop=True)
+
+def _capacity_by_period(capacity, periods):
+    """
+    Return (default {resource: units}, {period: {resource: units}}) from a
+    'Resource', 'Capacity' table, optionally dated by a 'Date' column.
+    """
+    if not {'Resource', 'Capacity'}.issubset(capacity.columns):
+        raise ValueError("Capacity must contain 'Resource' and 'Capacity' columns.")
+    units = pd.to_numeric(capacity['Capacity'], errors='coerce')
+    if units.isna().any() or (units < 0).any():
+        raise ValueError("Capacity must be a non-negative number.")
+    if 'Date' not in capacity.columns:
+        return units.groupby(capacity['Resource'].to_numpy()).sum().to_dict(), {}
+
+    dated = pd.DataFrame({'Date': pd.to_datetime(capacity['Date']).dt.normalize(),
+                          'Resource': capacity['Resource'].to_numpy(), 'Capacity': units.to_numpy()})
+    dated = dated[dated['Date'].isin(periods)]
+    overrides = defaultdict(dict)
+    for (date, resource), amount in dated.groupby(['Date', 'Resource'])['Capacity'].sum().items():
+        overrides[date][resource] = amount
+    return {}, overrides
+
+# Multi-period Allocation Scheduler
+@timed()
+def schedule_allocations(orders, capacity, start=None, end=None, aging_rate=DEFAULT_AGING_RATE,
+                         carry_capacity=False):
+    """
+    Allocate replenishing capacity to orders over daily periods.
+
+    orders has 'Resource', 'Date' (arrival) and 'Quantity' columns and
+    optionally 'Order', 'Due' and 'Priority' (lower is served first); a tidy
+    forecast frame is accepted as well. capacity has 'Resource' and 'Capacity'
+    (units added every period) and optionally 'Date' for per-day capacity.
+
+    Each period the resource totals come from allocate_resources over the open
+    backlog, and every resource's share goes to its orders through a heap.
+    Unmet quantity stays queued for later periods. Waiting orders age: their
+    priority improves by aging_rate per period, so starved low-priority orders
+    eventually go first. Because every order ages at the same rate, the order
+    of the queue never changes and the heap key is fixed at arrival
+    (priority + aging_rate * arrival period), which keeps each push and pop
+    logarithmic. Unused capacity is lost unless carry_capacity is set.
+
+    Returns (fills, order_status, backlog): one row per allocation event, the
+    orders with filled and outstanding quantity, and per-period backlog.
+    """
+    orders = _prepare_orders(orders)
+    start = pd.Timestamp(start).normalize() if start is not None else orders['Date'].min()
+    end = pd.Timestamp(end).normalize() if end is not None else max(orders['Date'].max(), orders['Due'].max())
+    periods = pd.date_range(start, end, freq='D')
+    default_capacity, capacity_overrides = _capacity_by_period(capacity, periods)
+
+    # Orders grouped by arrival period; those before the start arrive on the first period
+    period_numbers = np.clip((orders['Date'] - start).dt.days.to_numpy(), 0, None)
+    order_ids = orders['Order'].to_numpy()
+    resources = orders['Resource'].to_numpy()
+    keys = orders['Priority'].to_numpy(dtype=float) + aging_rate * period_numbers
+    due = orders['Due'].to_numpy()
+    arrival_order = np.argsort(period_numbers, kind='stable')
+    arrival_bounds = np.searchsorted(period_numbers[arrival_order], np.arange(len(periods) + 1))
+
+    outstanding = orders['Quantity'].to_numpy(dtype=float).copy()
+    completed = np.full(len(orders), np.datetime64('NaT'), dtype='datetime64[ns]')
+    queues = defaultdict(list)
+    backlog = defaultdict(float)
+    carried = defaultdict(float)
+    fills, backlog_rows = [], []
+
+    for number, period in enumerate(periods):
+        for row in arrival_order[arrival_bounds[number]:arrival_bounds[number + 1]]:
+            if outstanding[row] > 0:
+                heapq.heappush(queues[resources[row]], (keys[row], due[row], row))
+                backlog[resources[row]] += outstanding[row]
+
+        available = dict(default_capacity)
+        available.update(capacity_overrides.get(period, {}))
+        if carry_capacity:
+            for resource, amount in carried.items():
+                available[resource] = available.get(resource, 0.0) + amount
+
+        open_demand = {resource: amount for resource, amount in backlog.items() if amount > 0}
+        allocation, _ = allocate_resources(open_demand, available)
+
+        for resource, amount in allocation.items():
+            queue = queues[resource]
+            left = amount
+            while left > 1e-9 and queue:
+                row = queue[0][2]
+                served = min(left, outstanding[row])
+                outstanding[row] -= served
+                left -= served
+                fills.append((period, order_ids[row], resource, served))
+                if outstanding[row] <= 1e-9:
+                    outstanding[row] = 0.0
+                    completed[row] = period
+                    heapq.heappop(queue)
+            backlog[resource] = max(backlog[resource] - amount, 0.0)
+
+        for resource in set(available) | set(backlog):
+            unused = available.get(resource, 0.0) - allocation.get(resource, 0.0)
+            if carry_capacity:
+                carried[resource] = unused
+            if backlog[resource] > 0 or resource in allocation:
+                backlog_rows.append((period, resource, allocation.get(resource, 0.0), backlog[resource], unused))
+
+    fills = pd.DataFrame(fills, columns=['Date', 'Order', 'Resource', 'Allocated'])
+    status = orders.assign(
+        Filled=orders['Quantity'] - outstanding,
+        Outstanding=outstanding,
+        Completed=completed,
+    )
+    status['Late'] = (status['Completed'].isna() & (status['Due'] <= end)) | (status['Completed'] > status['Due'])
+    backlog = pd.DataFrame(backlog_rows, columns=['Date', 'Resource', 'Allocated', 'Backlog', 'Unused'])
+    return fills, status, backlog
@@ -1,6 +1,49 @@
+import os
+import threading
+
 import streamlit as st
 
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+OVERVIEW_PAGE = "SCM Phases"
+# Tool scripts mounted as pages; nothing in them is imported until the page is opened
+TOOL_PAGES = {
+    "Demand Forecasting": "dataset-datageneratorfor-demandforcatsingtoolv1.py",
+    "Time Series Forecasting": "dftv-2.py",
+    "Simplified Demand Forecasting": "DemandForecastingTool.py",
+    "Resource Allocation": "resourceallocationv-1.py",
+    "Risk Assessment": "riskassessmentv-1.py",
+    "Sustainability": "sustainabilityv-1.py",
+}
+
+_loaded_pages = {}
+_load_lock = threading.Lock()
+
+def load_page(name):
+    """
+    Compile a tool page on first use and cache the code for every session.
+    """
+    with _load_lock:
+        if name not in _loaded_pages:
+            path = os.path.join(TOOLS_DIR, TOOL_PAGES[name])
+            with open(path, encoding="utf-8") as script:
+                _loaded_pages[name] = (path, compile(script.read(), path, "exec"))
+        return _loaded_pages[name]
+
+def run_page(name):
+    """
+    Run a tool page the way Streamlit runs a script: top to bottom in a fresh
+    namespace on every rerun. Its heavy imports (sklearn, matplotlib, ...)
+    happen on the first run only and are then served from sys.modules.
+    """
+    path, code = load_page(name)
+    exec(code, {"__name__": "__main__", "__file__": path})
+
 def main():
+    page = st.sidebar.selectbox("Select a Page:", [OVERVIEW_PAGE] + list(TOOL_PAGES))
+    if page != OVERVIEW_PAGE:
+        run_page(page)
+        return
+
     st.title("Supply Chain Management Visualization")
     st.sidebar.title("Navigate SCM Phases")
 
@@ -39,6 +82,7 @@ def planning():
     st.markdown("- **Resource allocation**: Assigning resources efficiently to meet demand.")
     st.markdown("- **Risk assessment**: Identifying and mitigating risks.")
     st.markdown("- **Sustainability considerations**: Ensuring environmentally friendly practices.")
+    st.write("Open the tools for each of these from **Select a Page** in the sidebar.")
 
 def sourcing():
     st.header("Sourcing")
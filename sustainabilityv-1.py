@@ -1,5 +1,12 @@
+import hashlib
+
 import streamlit as st
 
+from emissions import EmissionsAggregator, GOAL_SCOPES, default_goal_store, goal_progress, load_emission_factors
+from instrumentation import start_panel
+
+panel = start_panel("Sustainability Considerations")
+
 # Title of the app
 st.title('Sustainability Considerations: Ensuring Environmentally Friendly Practices')
 
@@ -21,8 +28,14 @@ option = st.sidebar.selectbox('Choose an area to explore:',
                               'Waste Reduction', 
                               'Sustainable Transportation', 
                               'Eco-friendly Products', 
+                              'Shipment Emissions',
                               'Track Your Sustainability Goals'])
 
+# Shipment emission totals are kept for the session so the goals page can compare against them
+if "emissions" not in st.session_state:
+    st.session_state.emissions = EmissionsAggregator()
+emissions = st.session_state.emissions
+
 # Overview of Sustainability Practices
 if option == 'Overview of Sustainability Practices':
     st.header('What is Sustainability?')
@@ -105,6 +118,48 @@ elif option == 'Eco-friendly Products':
     """)
     st.image('https://www.example.com/eco_products_image.jpg', caption='Eco-friendly products')
 
+# Shipment Emissions
+elif option == 'Shipment Emissions':
+    st.header('Shipment Emissions')
+    st.write("""
+        Upload shipment logs with 'Date', 'Carrier', 'Mode', 'Distance' (km) and 'Weight' (kg) columns, and either
+        'Lane' or 'Origin' and 'Destination'. CO2e is estimated from the tonne-km moved and the emission factor of
+        each transport mode. Logs are processed in chunks and added to the running totals.
+    """)
+    factor_file = st.file_uploader('Optional emission factor table (CSV with Mode, Factor)', type=['csv'])
+    log_files = st.file_uploader('Upload shipment logs (CSV)', type=['csv'], accept_multiple_files=True)
+
+    try:
+        factors = load_emission_factors(factor_file)
+        if factors != emissions.factors:
+            # New factors invalidate the running totals
+            st.session_state.emissions = emissions = EmissionsAggregator(factors)
+        for log_file in log_files or []:
+            content = log_file.getvalue()
+            log_file.seek(0)
+            emissions.add_csv(log_file, batch_key=hashlib.sha256(content).hexdigest())
+    except Exception as e:
+        st.error(f"Error processing shipment logs: {e}")
+
+    st.write("Emission factors (kg CO2e per tonne-km):")
+    st.dataframe({'Factor': emissions.factors})
+    if emissions.shipments:
+        st.metric('Total CO2e (tonnes)', f"{emissions.total() / 1000:,.1f}")
+        if emissions.unmatched:
+            st.warning(f"{emissions.unmatched} shipments were skipped for an invalid date or number or an "
+                       f"unknown mode ({', '.join(sorted(emissions.unknown_modes)) or 'none'}).")
+        monthly = emissions.by('Month')
+        st.line_chart(monthly['CO2e'])
+        st.subheader('By lane')
+        st.dataframe(emissions.by('Lane'))
+        st.subheader('By carrier')
+        st.dataframe(emissions.by('Carrier'))
+        st.subheader('By month')
+        st.dataframe(monthly)
+    if st.button('Reset Emission Totals'):
+        st.session_state.emissions = EmissionsAggregator(emissions.factors)
+        st.success("Emission totals have been reset.")
+
 # Track Your Sustainability Goals
 elif option == 'Track Your Sustainability Goals':
     st.header('Track Your Sustainability Goals')
@@ -112,18 +167,38 @@ elif option == 'Track Your Sustainability Goals':
         Setting sustainability goals is a great way to stay motivated and measure progress. You can track energy usage, waste reduction, 
         transportation choices, and more. Below is a simple form to help you keep track of your sustainability efforts.
     """)
+    goals = default_goal_store()
 
     # Input form for sustainability goals
     with st.form(key='goal_form'):
-        st.text_input('Enter your goal (e.g., reduce energy consumption by 20%)')
-        st.slider('Select your target date (in months)', 1, 12, 6)
+        goal = st.text_input('Enter your goal (e.g., reduce energy consumption by 20%)')
+        target_months = st.slider('Select your target date (in months)', 1, 12, 6)
+        reduction = st.number_input('Target reduction in monthly shipment CO2e (%)', 0.0, 100.0, 20.0)
+        scope = st.selectbox('Applies to', GOAL_SCOPES)
+        scope_value = st.text_input('Lane or carrier name (for a lane or carrier goal)')
         submit_button = st.form_submit_button('Track Goal')
 
     if submit_button:
-        st.success("Your sustainability goal has been recorded!")
+        try:
+            goals.add(goal, target_months, reduction, scope, scope_value if scope != GOAL_SCOPES[0] else None)
+            st.success("Your sustainability goal has been recorded!")
+        except ValueError as e:
+            st.error(str(e))
+
+    recorded = goals.to_frame()
+    if not recorded.empty:
+        st.subheader('Your goals')
+        if emissions.shipments:
+            st.write("Progress compares the latest month of the uploaded shipment logs with the first month.")
+            st.dataframe(goal_progress(recorded, emissions))
+        else:
+            st.info("Upload shipment logs under 'Shipment Emissions' to compare your goals with actual emissions.")
+            st.dataframe(recorded)
 
 # Footer
 st.markdown("""
     **Thank you for visiting!**  
     Remember, every small step towards sustainability can make a big impact. Start making greener choices today for a better tomorrow.
 """)
+
+panel.render()
@@ -0,0 +1,83 @@
+"""
+Synthetic 'Date', 'Product', 'Sales' datasets for demos and benchmarks.
+
+    python synthetic_data.py sales.csv --products 10000 --days 1095 --missing-rate 0.05
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Synthetic Sales Generator
+def generate_sales_data(products=100, days=365, start="2023-01-01", base=100.0, trend=0.05,
+                        seasonality=10.0, noise=5.0, missing_rate=0.0, seed=None):
+    """
+    Generate daily sales for `products` products over `days` days.
+    Each product gets its own base level, linear trend and weekly plus yearly
+    seasonal amplitude around the given values; `noise` is the standard
+    deviation of Gaussian noise and `missing_rate` the fraction of product-days
+    dropped to simulate gaps. Rows are sorted by date, then product.
+    """
+    rng = np.random.default_rng(seed)
+    day_numbers = np.arange(days, dtype=np.float32)
+
+    # Product-level parameters, drawn once per product
+    levels = (base * rng.uniform(0.5, 1.5, products)).astype(np.float32)
+    slopes = (trend * rng.uniform(-1.0, 2.0, products)).astype(np.float32)
+    weekly = (seasonality * rng.uniform(0.0, 1.0, products)).astype(np.float32)
+    yearly = (seasonality * rng.uniform(0.0, 2.0, products)).astype(np.float32)
+    phases = rng.uniform(0, 2 * np.pi, products).astype(np.float32)
+
+    # Build the grid date-major so rows come out sorted by date
+    sales = (levels + slopes * day_numbers[:, None]
+             + weekly * np.sin(2 * np.pi * day_numbers[:, None] / 7 + phases)
+             + yearly * np.sin(2 * np.pi * day_numbers[:, None] / 365.25 + phases))
+    sales += rng.normal(0.0, noise, sales.shape).astype(np.float32)
+    np.maximum(sales, 0, out=sales)
+
+    keep = rng.random(sales.shape, dtype=np.float32) >= missing_rate if missing_rate > 0 else None
+    day_ids = np.repeat(np.arange(days), products)
+    product_ids = np.tile(np.arange(products), days)
+    sales = sales.ravel()
+    if keep is not None:
+        keep = keep.ravel()
+        day_ids, product_ids, sales = day_ids[keep], product_ids[keep], sales[keep]
+
+    width = len(str(max(products - 1, 0)))
+    names = np.array([f"P{number:0{width}d}" for number in range(products)])
+    return pd.DataFrame({
+        'Date': pd.Timestamp(start) + pd.to_timedelta(day_ids, unit='D'),
+        'Product': pd.Categorical.from_codes(product_ids, names),
+        'Sales': np.round(sales, 2),
+    })
+
+def write_sales_csv(data, path, chunk_rows=1_000_000):
+    """
+    Write a generated dataset to CSV in chunks to bound formatting memory.
+    """
+    with open(path, 'w', newline='') as output:
+        for first in range(0, max(len(data), 1), chunk_rows):
+            data.iloc[first:first + chunk_rows].to_csv(output, header=first == 0, index=False,
+                                                        date_format='%Y-%m-%d')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic Date, Product, Sales CSV file.")
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--start", default="2023-01-01")
+    parser.add_argument("--base", type=float, default=100.0)
+    parser.add_argument("--trend", type=float, default=0.05)
+    parser.add_argument("--seasonality", type=float, default=10.0)
+    parser.add_argument("--noise", type=float, default=5.0)
+    parser.add_argument("--missing-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    data = generate_sales_data(args.products, args.days, args.start, args.base, args.trend,
+                               args.seasonality, args.noise, args.missing_rate, args.seed)
+    write_sales_csv(data, args.output)
+    print(f"Wrote {len(data)} rows to {args.output}")
+
+if __name__ == "__main__":
+    main()
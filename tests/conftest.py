@@ -0,0 +1,42 @@
+import importlib.util
+import logging
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def load_script(file_name, module_name):
+    # The Streamlit pages have file names that are not importable
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(ROOT, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+@pytest.fixture(scope="session")
+def tool_module():
+    logging.disable(logging.WARNING)  # st.* outside a running app only logs warnings
+    return load_script("dataset-datageneratorfor-demandforcatsingtoolv1.py", "demand_forecasting_tool")
+
+@pytest.fixture
+def gappy_sales():
+    """
+    Daily sales of four products with missing days, a duplicated date,
+    a NaN sale and shuffled rows.
+    """
+    rng = np.random.default_rng(7)
+    frames = []
+    for number, days in enumerate((40, 25, 60, 12)):
+        dates = pd.date_range("2024-01-01", periods=days, freq="D")
+        keep = rng.random(days) > 0.15
+        keep[[0, -1]] = True
+        frames.append(pd.DataFrame({'Date': dates[keep], 'Product': f"P{number}",
+                                    'Sales': rng.normal(50 + 10 * number, 5, keep.sum()).round(1)}))
+    data = pd.concat(frames, ignore_index=True)
+    data = pd.concat([data, data.iloc[[3]]], ignore_index=True)
+    data.loc[7, 'Sales'] = np.nan
+    return data.sample(frac=1, random_state=3).reset_index(drop=True)
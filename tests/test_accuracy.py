@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from accuracy import compare_forecasts, holdout_forecasts
+from product_index import ProductIndex
+
+def baseline_scores(actuals, forecast):
+    """
+    Per-product WAPE, MAE and Bias from a plain pandas merge, one product at a time.
+    """
+    rows = {}
+    for product, group in actuals.groupby('Product'):
+        merged = group.merge(forecast[forecast['Product'] == product], on=['Product', 'Date'])
+        errors = merged['Forecast'] - merged['Sales']
+        rows[product] = {'WAPE': 100 * errors.abs().sum() / merged['Sales'].abs().sum(),
+                         'MAE': errors.abs().mean(), 'Bias': errors.mean(), 'Points': len(merged)}
+    return pd.DataFrame(rows).T
+
+def test_compare_forecasts_matches_a_per_product_merge(gappy_sales):
+    actuals = gappy_sales.dropna().drop_duplicates(['Product', 'Date'])
+    rng = np.random.default_rng(0)
+    forecast = actuals.sample(frac=0.7, random_state=1).rename(columns={'Sales': 'Forecast'})
+    forecast['Forecast'] += rng.normal(0, 3, len(forecast))
+
+    per_product, overall = compare_forecasts(actuals, {"Model": forecast})
+    scores = per_product.xs("Model", level='Source')
+    expected = baseline_scores(actuals, forecast).loc[scores.index]
+    for metric in ('WAPE', 'MAE', 'Bias', 'Points'):
+        np.testing.assert_allclose(scores[metric].to_numpy(dtype=float), expected[metric].to_numpy(dtype=float))
+    assert overall.loc["Model", 'Points'] == len(forecast)
+
+def test_common_only_scores_the_shared_points():
+    actuals = pd.DataFrame({'Date': pd.date_range("2024-01-01", periods=4), 'Product': "A",
+                            'Sales': [10.0, 10.0, 10.0, 10.0]})
+    early = actuals.iloc[:3].rename(columns={'Sales': 'Forecast'})
+    late = actuals.iloc[1:].rename(columns={'Sales': 'Forecast'})
+    _, overall = compare_forecasts(actuals, {"Early": early, "Late": late})
+    assert overall['Points'].tolist() == [2, 2]
+    _, overall = compare_forecasts(actuals, {"Early": early, "Late": late}, common_only=False)
+    assert overall['Points'].tolist() == [3, 3]
+
+@pytest.mark.parametrize("resolution", ["Weekly", "Monthly"])
+def test_holdout_forecasts_roll_daily_rows_up_without_alignment(resolution):
+    # Constant daily sales: a perfect model forecasts each period's total exactly
+    dates = pd.date_range("2024-01-01", "2024-12-29" if resolution == "Weekly" else "2024-12-31", freq="D")
+    data = pd.concat([pd.DataFrame({'Date': dates, 'Product': product, 'Sales': level})
+                      for product, level in (("A", 5.0), ("B", 12.0))], ignore_index=True)
+    index = ProductIndex(data)
+
+    forecasts = holdout_forecasts(index, 2, resolution, method="Moving Average", window=1)
+    _, overall = compare_forecasts(index, {"Model": forecasts}, resolution)
+    assert overall.loc["Model", 'Points'] == 4
+    if resolution == "Weekly":
+        assert overall.loc["Model", 'WAPE'] == pytest.approx(0.0)
+    else:
+        # Calendar months differ in length, so only the period step is checked
+        assert overall.loc["Model", 'WAPE'] < 2
+
+@pytest.mark.parametrize("fill", [None, "Zero"])
+def test_holdout_longer_than_a_history_is_rejected(fill):
+    dates = pd.date_range("2024-01-01", periods=30, freq="D")
+    data = pd.concat([pd.DataFrame({'Date': dates, 'Product': "A", 'Sales': 5.0}),
+                      pd.DataFrame({'Date': dates[-10:], 'Product': "B", 'Sales': 2.0})], ignore_index=True)
+    assert len(holdout_forecasts(data, 9, fill=fill)) == 18
+    with pytest.raises(ValueError, match="use at most 9"):
+        holdout_forecasts(data, 10, fill=fill)
+    with pytest.raises(ValueError, match="no history"):
+        holdout_forecasts(data, 30, fill=fill)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from allocation import priority_fill
+
+def baseline_fill(resource_codes, priorities, demand, capacity):
+    """
+    Serve each resource's demand lines tier by tier in a Python loop,
+    splitting a tier that cannot be filled in proportion to demand.
+    """
+    allocated = np.zeros(len(demand))
+    for resource, available in enumerate(capacity):
+        lines = [line for line in range(len(demand)) if resource_codes[line] == resource]
+        for tier in sorted({priorities[line] for line in lines}):
+            members = [line for line in lines if priorities[line] == tier]
+            wanted = sum(demand[line] for line in members)
+            served = min(wanted, available)
+            for line in members:
+                allocated[line] = demand[line] * served / wanted if wanted > 0 else 0.0
+            available -= served
+    return allocated
+
+def test_priority_fill_matches_a_tier_by_tier_loop():
+    rng = np.random.default_rng(5)
+    lines = 500
+    codes = rng.integers(0, 12, lines)
+    priorities = rng.integers(1, 5, lines)
+    demand = rng.uniform(0, 50, lines).round(1)
+    demand[::17] = 0.0
+    capacity = rng.uniform(0, 1500, 12)
+    capacity[3] = 0.0
+    allocated = priority_fill(codes, priorities, demand, capacity)
+    np.testing.assert_allclose(allocated, baseline_fill(codes, priorities, demand, capacity), atol=1e-9)
+    assert np.all(np.bincount(codes, weights=allocated, minlength=12) <= capacity + 1e-9)
+
+@pytest.mark.parametrize("demand, capacity", [([-1.0], [5.0]), ([1.0], [-5.0]), ([np.nan], [5.0])])
+def test_priority_fill_rejects_bad_numbers(demand, capacity):
+    with pytest.raises(ValueError):
+        priority_fill([0], [1], demand, capacity)
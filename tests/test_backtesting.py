@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtesting import BACKTEST_METHODS, backtest_all_products
+from synthetic_data import generate_sales_data
+
+def baseline_backtest(history, method, horizon, window, min_train):
+    """
+    Refit every method at every origin of one product and collect the
+    (actual, forecast) pairs of the next `horizon` rows.
+    """
+    sales = history['Sales'].to_numpy(dtype=float)
+    days = (history['Date'] - history['Date'].iloc[0]).dt.days.to_numpy(dtype=float)
+    pairs = []
+    for origin in range(min_train, len(sales)):
+        train = sales[:origin]
+        known = ~np.isnan(train)
+        for target in range(origin, min(origin + horizon, len(sales))):
+            if method == "Moving Average":
+                forecast = train[-window:].mean() if origin >= window else np.nan
+            elif method == "Time Series":
+                recent = train[-horizon:]
+                forecast = recent[~np.isnan(recent)].mean() if (~np.isnan(recent)).any() else np.nan
+            else:
+                slope, intercept = np.polyfit(days[:origin][known], train[known], 1)
+                forecast = intercept + slope * days[target]
+            if not np.isnan(forecast) and not np.isnan(sales[target]):
+                pairs.append((sales[target], forecast))
+    return np.array(pairs)
+
+@pytest.mark.parametrize("missing_sales", [False, True])
+@pytest.mark.parametrize("method", BACKTEST_METHODS)
+def test_backtest_matches_refitting_every_origin(method, missing_sales):
+    data = generate_sales_data(4, 45, seed=1, missing_rate=0.1)
+    if missing_sales:
+        # Missing values early in one product must not spoil later origins or products
+        data.loc[data.index[[3, 20, 21, 90]], 'Sales'] = np.nan
+    per_product, overall = backtest_all_products(data, methods=(method,), horizon=5, window=4, min_train=10)
+    everything = []
+    for product, history in data.groupby('Product'):
+        pairs = baseline_backtest(history, method, 5, 4, 10)
+        errors = pairs[:, 1] - pairs[:, 0]
+        scores = per_product.loc[(product, method)]
+        assert scores['Forecasts'] == len(pairs)
+        assert scores['MAE'] == pytest.approx(np.abs(errors).mean())
+        assert scores['RMSE'] == pytest.approx(np.sqrt((errors ** 2).mean()))
+        assert scores['MAPE'] == pytest.approx(100 * np.abs(errors / pairs[:, 0]).mean())
+        everything.append(errors)
+    errors = np.concatenate(everything)
+    assert overall.loc[method, 'MAE'] == pytest.approx(np.abs(errors).mean())
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError):
+        backtest_all_products(generate_sales_data(1, 20, seed=0), methods=("Crystal Ball",))
+
+def test_progress_reaches_one():
+    seen = []
+    backtest_all_products(generate_sales_data(2, 30, seed=0), horizon=3, progress=seen.append)
+    assert seen[-1] == pytest.approx(1.0) and seen == sorted(seen)
+
+def test_backtest_follows_dates_not_row_order():
+    data = generate_sales_data(3, 40, seed=4, missing_rate=0.1)
+    expected, _ = backtest_all_products(data, horizon=4, window=3, min_train=8)
+    shuffled, _ = backtest_all_products(data.sample(frac=1, random_state=0), horizon=4, window=3, min_train=8)
+    pd.testing.assert_frame_equal(shuffled.sort_index(), expected.sort_index())
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import calendar_alignment
+from calendar_alignment import SalesCalendar, sales_calendar_for
+from forecasting import forecast_all_products
+
+def gapped_sales():
+    dates = pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-04", "2024-01-05", "2024-01-07"])
+    return pd.DataFrame({'Date': dates, 'Product': "A", 'Sales': [1.0, 2.0, 4.0, 5.0, 7.0]})
+
+@pytest.mark.parametrize("method, expected", [
+    ("Moving Average", (4.0 + 5.0 + 7.0) / 3),
+    ("Weighted Moving Average", (4.0 * 2 + 5.0 * 3 + 7.0 * 5) / 10),
+    ("Time Series", (4.0 + 5.0 + 7.0) / 3),
+])
+def test_missing_periods_are_skipped_by_tail_methods(method, expected):
+    calendar = SalesCalendar(gapped_sales(), fill="Missing")
+    forecast = forecast_all_products(calendar, method=method, window=5, forecast_days=5)
+    np.testing.assert_allclose(forecast['Forecast'], expected)
+    assert forecast['Date'].iloc[0] == pd.Timestamp("2024-01-08")
+
+def test_zero_fill_counts_the_gaps():
+    calendar = SalesCalendar(gapped_sales(), fill="Zero")
+    forecast = forecast_all_products(calendar, method="Moving Average", window=5, forecast_days=1)
+    assert forecast['Forecast'].iloc[0] == pytest.approx((0.0 + 4.0 + 5.0 + 0.0 + 7.0) / 5)
+
+def test_calendar_memo_is_bounded_by_bytes(monkeypatch):
+    monkeypatch.setattr(calendar_alignment, '_calendar_memo', calendar_alignment.OrderedDict())
+    data = gapped_sales()
+    first = sales_calendar_for("a", data)
+    budget = first.nbytes * 2
+    assert sales_calendar_for("a", data, max_bytes=budget) is first
+    sales_calendar_for("b", data, max_bytes=budget)
+    sales_calendar_for("c", data, max_bytes=budget)
+    assert list(calendar_alignment._calendar_memo) == [("b", "Daily", "Zero", "Sum"), ("c", "Daily", "Zero", "Sum")]
+    assert sales_calendar_for("a", data, max_bytes=budget) is not first
+
+def pandas_calendar(data, fill):
+    """
+    The same alignment with pandas: aggregate duplicates, reindex every product
+    onto the shared daily range and fill from its first sale onwards.
+    """
+    totals = data.dropna(subset=['Sales']).groupby(['Product', 'Date'])['Sales'].sum().unstack('Product')
+    totals = totals.reindex(pd.date_range(totals.index.min(), totals.index.max(), freq="D"))
+    started = totals.notna().cummax()
+    if fill == "Zero":
+        totals = totals.fillna(0.0)
+    elif fill == "Forward Fill":
+        totals = totals.ffill()
+    elif fill == "Interpolate":
+        totals = totals.interpolate(limit_area='inside').ffill()
+    return totals.where(started)
+
+@pytest.mark.parametrize("fill", ["Zero", "Forward Fill", "Interpolate", "Missing"])
+def test_calendar_matches_pandas_reindexing(gappy_sales, fill):
+    calendar = SalesCalendar(gappy_sales, fill=fill)
+    expected = pandas_calendar(gappy_sales, fill)
+    assert list(calendar.dates) == list(expected.index)
+    for product in calendar.products:
+        np.testing.assert_allclose(calendar.values[calendar.positions([product])[0]], expected[product].to_numpy())
+    summary = calendar.summary()
+    assert summary['Duplicate Rows'].sum() == 1
+    assert summary['Rows'].sum() == gappy_sales['Sales'].notna().sum()
+
+def test_calendar_aggregations_and_weekly_periods():
+    data = pd.DataFrame({'Date': pd.to_datetime(["2024-01-01", "2024-01-01", "2024-01-03", "2024-01-09"]),
+                         'Product': "A", 'Sales': [2.0, 4.0, 6.0, 1.0]})
+    assert SalesCalendar(data, aggregate="Mean").values[0, 0] == 3.0
+    assert SalesCalendar(data, aggregate="Last").values[0, 0] == 4.0
+    weekly = SalesCalendar(data, "Weekly")
+    # The last week is covered for two of its seven days, so it is scaled to a weekly rate
+    np.testing.assert_allclose(weekly.values[0], [12.0, 3.5])
+    with pytest.raises(ValueError):
+        SalesCalendar(data, fill="Guess")
+    with pytest.raises(ValueError):
+        SalesCalendar(data, max_cells=3)
+
+@pytest.mark.parametrize("fill", ["Zero", "Interpolate", "Missing"])
+@pytest.mark.parametrize("resolution", ["Daily", "Weekly"])
+def test_calendar_of_no_dated_sales(fill, resolution):
+    empty = SalesCalendar(gapped_sales().iloc[:0], resolution, fill)
+    assert empty.values.shape == (0, 0)
+    assert forecast_all_products(empty).empty
+
+    unsold = gapped_sales().assign(Sales=np.nan)
+    calendar = SalesCalendar(unsold, resolution, fill)
+    assert calendar.values.shape == (1, 0)
+    with pytest.raises(ValueError):
+        forecast_all_products(calendar)
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from charting import lttb_indices, prepare_chart_data
+
+def test_lttb_keeps_the_ends_and_the_peak():
+    y = np.zeros(5000)
+    y[1234] = 100.0
+    picked = lttb_indices(np.arange(5000), y, 200)
+    assert len(picked) == 200
+    assert picked[0] == 0 and picked[-1] == 4999 and 1234 in picked
+
+def test_prepare_chart_data_sends_only_plotted_points():
+    # Series on disjoint dates would pad a shared wide index with empty cells
+    rng = np.random.default_rng(0)
+    columns = {}
+    for number in range(5):
+        dates = pd.date_range("2015-01-01", periods=3650, freq="D") + pd.Timedelta(hours=number)
+        columns[f"P{number} - Historical Sales"] = pd.Series(rng.normal(100, 10, 3650), index=dates)
+    forecast = pd.Series(np.arange(30.0), index=pd.date_range("2025-01-01", periods=30))
+    columns["P0 - Forecasted Sales"] = forecast
+
+    chart = prepare_chart_data(columns, max_points=500, keep_recent=50,
+                               full_resolution={"P0 - Forecasted Sales"})
+    assert list(chart.columns) == ['Date', 'Series', 'Sales']
+    assert not chart['Sales'].isna().any()
+    assert len(chart) == 5 * 500 + 30
+    exact = chart[chart['Series'] == "P0 - Forecasted Sales"]
+    np.testing.assert_array_equal(exact['Sales'].to_numpy(), forecast.to_numpy())
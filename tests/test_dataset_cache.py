@@ -0,0 +1,39 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from dataset_cache import DatasetCache
+from ingest import load_sales_data
+
+def test_round_trip_keeps_column_types(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    frame = pd.DataFrame({
+        'Product': pd.Categorical(["b", "a", "b"], categories=["b", "a"], ordered=True),
+        'Store': pd.Categorical([3, 1, 3]),
+        'Region': np.array(["north", None, "south"], dtype=object),
+        'Sales': [1.5, 2.0, 3.25],
+    }, index=pd.DatetimeIndex(pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]), name='Date'))
+    cache.put("dataset:rollup:Weekly", frame)
+    restored = cache.get("dataset:rollup:Weekly")
+    pd.testing.assert_frame_equal(restored, frame)
+    assert restored['Store'].cat.categories.dtype == frame['Store'].cat.categories.dtype
+    assert all(":" not in name for name in os.listdir(tmp_path))
+
+def test_frames_it_cannot_store_are_returned_uncached(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    frame = pd.DataFrame({'Mixed': np.array([1, "a"], dtype=object)})
+    assert cache.get_or_load(b"raw", lambda content: frame) is frame
+    assert cache.get(cache.key_for(b"raw")) is None
+
+def test_uploaded_csv_is_cached_by_content(tmp_path):
+    cache = DatasetCache(str(tmp_path))
+    content = b"Date,Product,Sales\n2024-01-01,A,1\n2024-01-02,A,2\n"
+    first = cache.get_or_load(content, load_sales_data, "page")
+    second = cache.get_or_load(content, load_sales_data, "page")
+    assert list(second.columns) == list(first.columns)
+    assert second.index.equals(first.index)
+    for column in first.columns:
+        np.testing.assert_array_equal(np.asarray(second[column]), np.asarray(first[column]))
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    assert isinstance(second.index, pd.DatetimeIndex)
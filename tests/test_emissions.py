@@ -0,0 +1,51 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import emissions as emissions_module
+from emissions import DEFAULT_EMISSION_FACTORS, EmissionsAggregator
+from rollups import period_numbers
+
+LOG = """Date,Carrier,Mode,Distance,Weight,Origin,Destination
+2024-01-05,Acme,Road,100,2000,A,B
+2024-01-20,Acme,rail,400,1000,A,C
+2024-02-03,Fast,Air,1000,500,B,C
+2024-02-10,Fast,teleport,10,10,B,C
+"""
+
+def test_totals_match_a_per_shipment_sum():
+    emissions = EmissionsAggregator()
+    emissions.add_csv(io.StringIO(LOG), chunksize=2)
+    expected = (100 * 2 * DEFAULT_EMISSION_FACTORS['road'] + 400 * 1 * DEFAULT_EMISSION_FACTORS['rail']
+                + 1000 * 0.5 * DEFAULT_EMISSION_FACTORS['air'])
+    assert emissions.total() == pytest.approx(expected)
+    assert emissions.shipments == 3 and emissions.unmatched == 1
+    assert emissions.by('Carrier').loc["Fast", 'Shipments'] == 1
+    np.testing.assert_allclose(emissions.by('Month')['CO2e'].sum(), emissions.by('Lane')['CO2e'].sum())
+
+def test_a_failed_file_leaves_the_totals_and_can_be_retried(monkeypatch):
+    emissions = EmissionsAggregator()
+    emissions.add_csv(io.StringIO(LOG), batch_key="first")
+    before = emissions.total(), emissions.shipments
+
+    # The second chunk fails after the first was added
+    calls = []
+
+    def failing_period_numbers(dates, resolution):
+        calls.append(resolution)
+        if len(calls) == 2:
+            raise ValueError("bad chunk")
+        return period_numbers(dates, resolution)
+
+    monkeypatch.setattr(emissions_module, 'period_numbers', failing_period_numbers)
+    with pytest.raises(ValueError):
+        emissions.add_csv(io.StringIO(LOG), chunksize=2, batch_key="second")
+    monkeypatch.undo()
+    assert (emissions.total(), emissions.shipments) == before
+    assert "second" not in emissions.applied_batches
+
+    emissions.add_csv(io.StringIO(LOG), batch_key="second")
+    emissions.add_csv(io.StringIO(LOG), batch_key="second")
+    assert emissions.shipments == 2 * before[1]
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecast_cli
+from synthetic_data import generate_sales_data
+
+@pytest.mark.parametrize("method", ["Moving Average", "Linear Trend"])
+def test_npz_output_loads_without_pickle(tmp_path, method):
+    generate_sales_data(5, 40, seed=0).to_csv(tmp_path / "sales.csv", index=False)
+    csv_path, npz_path = str(tmp_path / "forecast.csv"), str(tmp_path / "forecast.npz")
+    forecast_cli.run(str(tmp_path / "sales.csv"), csv_path, method, horizon=3, processes=1, chunk_products=2)
+    _, rows, _ = forecast_cli.run(str(tmp_path / "sales.csv"), npz_path, method, horizon=3, processes=1,
+                                  chunk_products=2)
+    expected = pd.read_csv(csv_path)
+    with np.load(npz_path, allow_pickle=False) as columns:
+        assert rows == len(expected) == 15
+        for column in expected.columns:
+            values = columns[column]
+            assert values.dtype != object
+            if values.dtype.kind == "M":
+                np.testing.assert_array_equal(values, pd.to_datetime(expected[column]).to_numpy())
+            elif values.dtype.kind == "U":
+                np.testing.assert_array_equal(values, expected[column].astype(str).to_numpy())
+            else:
+                np.testing.assert_allclose(values, expected[column].to_numpy(dtype=float))
+
+def test_csv_output_keeps_the_input_precision(tmp_path):
+    dates = pd.date_range("2024-01-01", periods=3, freq="D")
+    pd.DataFrame({'Date': dates, 'Product': "A", 'Sales': 119.51}).to_csv(tmp_path / "sales.csv", index=False)
+    output = tmp_path / "forecast.csv"
+    forecast_cli.run(str(tmp_path / "sales.csv"), str(output), "Moving Average", window=3, horizon=2, processes=1)
+    assert output.read_text().splitlines()[1:] == ["A,2024-01-04,119.51", "A,2024-01-05,119.51"]
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import basic_time_series_forecast, forecast_all_products, moving_average_forecast
+from product_index import ProductIndex
+
+def product_histories(data):
+    """
+    Each product's sales rows in input order: the baseline engines' input.
+    """
+    return {product: group.reset_index(drop=True)
+            for product, group in data.dropna(subset=['Sales']).groupby('Product')}
+
+def smoothing_baseline(sales, alpha, beta, forecast_days):
+    level, trend = sales[0], 0.0
+    for position, value in enumerate(sales[1:], start=1):
+        if beta is not None and position == 1:
+            trend = value - level
+        previous = level
+        level = alpha * value + (1 - alpha) * (previous + (trend if beta is not None else 0.0))
+        if beta is not None:
+            trend = beta * (level - previous) + (1 - beta) * trend
+    steps = np.arange(1, forecast_days + 1)
+    return level + (trend * steps if beta is not None else 0.0 * steps)
+
+def baseline(history, method, window, forecast_days, season, alpha, beta):
+    sales = history['Sales'].to_numpy(dtype=float)
+    if method == "Moving Average":
+        return moving_average_forecast(history, window, forecast_days)
+    if method == "Time Series":
+        return basic_time_series_forecast(history, forecast_days)
+    if method == "Weighted Moving Average":
+        return [np.average(sales[-window:], weights=np.arange(1, window + 1))] * forecast_days
+    if method == "Seasonal Naive":
+        return [sales[-season:][step % season] for step in range(forecast_days)]
+    return smoothing_baseline(sales, alpha, beta if method == "Holt Linear Trend" else None, forecast_days)
+
+@pytest.mark.parametrize("method", ["Moving Average", "Time Series", "Weighted Moving Average", "Seasonal Naive",
+                                    "Exponential Smoothing", "Holt Linear Trend"])
+def test_forecast_all_products_matches_per_product_forecasts(gappy_sales, method):
+    data = gappy_sales.dropna(subset=['Sales']).drop_duplicates(['Product', 'Date']).sort_values('Date')
+    forecasts = forecast_all_products(ProductIndex(data), method=method, window=5, forecast_days=6,
+                                      season=4, alpha=0.4, beta=0.2)
+    for product, history in product_histories(data).items():
+        rows = forecasts[forecasts['Product'] == product]
+        np.testing.assert_allclose(rows['Forecast'], baseline(history, method, 5, 6, 4, 0.4, 0.2))
+        expected_dates = pd.date_range(history['Date'].iloc[-1] + pd.Timedelta(days=1), periods=6)
+        assert list(rows['Date']) == list(expected_dates)
+
+def test_short_histories_follow_the_baseline():
+    data = pd.DataFrame({'Date': pd.date_range("2024-01-01", periods=3), 'Product': "A", 'Sales': [1.0, 2.0, 3.0]})
+    forecasts = forecast_all_products(data, method="Moving Average", window=5, forecast_days=2)
+    assert forecasts['Forecast'].isna().all()
+    forecasts = forecast_all_products(data, method="Time Series", forecast_days=2)
+    np.testing.assert_allclose(forecasts['Forecast'], basic_time_series_forecast(data, 2))
+
+def test_selected_products_and_unknown_method(gappy_sales):
+    forecasts = forecast_all_products(gappy_sales, products=["P2", "missing"], forecast_days=3)
+    assert set(forecasts['Product']) == {"P2"}
+    with pytest.raises(ValueError):
+        forecast_all_products(gappy_sales, method="Crystal Ball")
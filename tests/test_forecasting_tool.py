@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from model_registry import ALL_PRODUCTS, ModelRegistry
+from product_index import ProductIndex
+from rollups import rollup
+from synthetic_data import generate_sales_data
+from trend_models import fit_trend_models
+
+def test_batch_models_are_registered_per_resolution(tool_module, tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    daily = ProductIndex(generate_sales_data(3, 60, seed=0))
+    weekly = ProductIndex(rollup(daily, "Weekly"))
+
+    weekly_tool = tool_module.DemandForecastingTool()
+    weekly_tool.use_resolution("Weekly", weekly)
+    registry.put("data", ALL_PRODUCTS, weekly_tool.batch_model_params(), fit_trend_models(weekly))
+
+    daily_tool = tool_module.DemandForecastingTool()
+    daily_tool.data = daily.source
+    daily_tool.restore_models(registry, "data", daily.products[0])
+    assert daily_tool.coefficients is None
+
+    weekly_tool.restore_models(registry, "data", daily.products[0])
+    assert len(weekly_tool.coefficients) == 3
+
+def test_append_data_needs_the_daily_view(tool_module):
+    daily = ProductIndex(generate_sales_data(2, 30, seed=0))
+    tool = tool_module.DemandForecastingTool()
+    tool.use_resolution("Weekly", ProductIndex(rollup(daily, "Weekly")))
+    tool.append_data(pd.DataFrame({'Date': pd.to_datetime(['2030-01-01']), 'Product': [daily.products[0]],
+                                   'Sales': [1.0]}))
+    assert tool.incremental is None
+
+def test_forecast_dates_follow_appended_rows(tool_module):
+    data = generate_sales_data(2, 100, seed=0, start="2023-01-01")
+    cutoff = pd.Timestamp("2023-03-11")
+    tool = tool_module.DemandForecastingTool()
+    tool.data = data[data['Date'] <= cutoff]
+    tool.append_data(data[data['Date'] > cutoff])
+
+    forecast = tool_module.forecast_all_products_job(tool.get_product_index(), 3,
+                                                     coefficients=tool.coefficients)[0]
+    expected = np.array(["2023-04-11", "2023-04-12", "2023-04-13"], dtype='datetime64[D]')
+    for _, rows in forecast.groupby('Product'):
+        np.testing.assert_array_equal(rows['Date'].to_numpy(dtype='datetime64[D]'), expected)
+    np.testing.assert_allclose(tool.forecast(3, data['Product'].iloc[0])['Predicted Sales'],
+                               forecast.loc[forecast['Product'] == data['Product'].iloc[0], 'Forecast'])
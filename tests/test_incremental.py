@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecasting import forecast_all_products
+from incremental import IncrementalForecaster
+from synthetic_data import generate_sales_data
+from trend_models import fit_trend_models
+
+@pytest.fixture
+def history():
+    data = generate_sales_data(6, 80, seed=2, missing_rate=0.1)
+    cutoff = data['Date'].sort_values().iloc[len(data) // 2]
+    return data, data[data['Date'] <= cutoff], data[data['Date'] > cutoff]
+
+@pytest.mark.parametrize("method", ["Moving Average", "Time Series", "Weighted Moving Average", "Seasonal Naive"])
+def test_appending_matches_a_full_recompute(history, method):
+    data, old, new = history
+    state = IncrementalForecaster.from_history(old)
+    for _, batch in new.groupby(new['Date'].dt.isocalendar().week):
+        state.append(batch)
+    expected = forecast_all_products(data, method=method, window=6, forecast_days=5, season=7)
+    actual = state.forecast(method=method, window=6, forecast_days=5, season=7)
+    pd.testing.assert_frame_equal(actual.sort_values(['Product', 'Date']).reset_index(drop=True),
+                                  expected.sort_values(['Product', 'Date']).reset_index(drop=True))
+
+def test_trend_coefficients_match_the_batch_fit(history):
+    data, old, new = history
+    state = IncrementalForecaster.from_history(old)
+    state.append(new)
+    coefficients = state.trend_coefficients()
+    expected = fit_trend_models(data)
+    for column in ('Intercept', 'Slope', 'Rows', 'MaxDays'):
+        np.testing.assert_allclose(coefficients.loc[expected.index, column].to_numpy(dtype=float),
+                                   expected[column].to_numpy(dtype=float), rtol=1e-6)
+
+def test_new_products_and_repeated_batches(history):
+    _, old, _ = history
+    state = IncrementalForecaster.from_history(old)
+    batch = pd.DataFrame({'Date': pd.to_datetime(["2030-01-01", "2030-01-02"]), 'Product': "New", 'Sales': [4.0, 6.0]})
+    state.append(batch, batch_key="upload")
+    state.append(batch, batch_key="upload")
+    forecast = state.forecast(products=["New"], method="Time Series", forecast_days=2)
+    np.testing.assert_allclose(forecast['Forecast'], [5.0, 5.0])
+    with pytest.raises(ValueError):
+        state.forecast(method="Holt Linear Trend")
+
+def test_a_failed_batch_can_be_retried(history):
+    _, old, _ = history
+    state = IncrementalForecaster.from_history(old)
+    before = state.recent.copy()
+    bad = pd.DataFrame({'Date': ["not a date"], 'Product': "New", 'Sales': [1.0]})
+    with pytest.raises(Exception):
+        state.append(bad, batch_key="upload")
+    assert "upload" not in state.applied_batches
+    assert "New" not in set(state.products)
+    np.testing.assert_array_equal(state.recent, before)
+
+    good = pd.DataFrame({'Date': pd.to_datetime(["2030-01-01"]), 'Product': "New", 'Sales': [1.0]})
+    state.append(good, batch_key="upload")
+    assert "upload" in state.applied_batches and "New" in set(state.products)
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import read_sales_csv_chunked, sales_dates
+
+def write_sales(path):
+    data = pd.DataFrame({
+        'Date': ["2024-01-02", "2024-01-01", "not a date", "2024-01-03", "2024-01-01", "2024-01-02"],
+        'Product': ["A", "B", "A", "A", "A", "B"],
+        'Sales': [119.51, 0.1, 5.0, "", 3.3, 1e7 + 0.01],
+    })
+    data.to_csv(path, index=False)
+
+@pytest.mark.parametrize("chunksize", [1, 4, 100])
+def test_streamed_ingest_matches_a_plain_read(tmp_path, chunksize):
+    path = tmp_path / "sales.csv"
+    write_sales(path)
+    streamed = read_sales_csv_chunked(path, chunksize=chunksize)
+
+    plain = pd.read_csv(path)
+    plain['Date'] = pd.to_datetime(plain['Date'], errors='coerce')
+    plain = plain.dropna(subset=['Date', 'Sales']).sort_values('Date', kind='stable')
+
+    assert streamed['Sales'].dtype == np.float64
+    np.testing.assert_array_equal(streamed['Sales'].to_numpy(), plain['Sales'].to_numpy())
+    np.testing.assert_array_equal(streamed['Product'].astype(str).to_numpy(), plain['Product'].to_numpy())
+    np.testing.assert_array_equal(sales_dates(streamed).to_numpy(dtype='datetime64[D]'),
+                                  plain['Date'].to_numpy(dtype='datetime64[D]'))
+
+def test_missing_columns_are_rejected(tmp_path):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({'Date': ["2024-01-01"], 'Sales': [1.0]}).to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        read_sales_csv_chunked(path)
+
+def test_a_file_without_valid_rows_gives_an_empty_frame(tmp_path):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({'Date': ["never", "2024-01-01"], 'Product': "A", 'Sales': [1.0, None]}).to_csv(path, index=False)
+    streamed = read_sales_csv_chunked(path, chunksize=1)
+    assert streamed.empty and list(streamed.columns) == ['Product', 'Day', 'Sales']
@@ -0,0 +1,48 @@
+import threading
+import tracemalloc
+
+from instrumentation import ProfileRun, finish_run, start_run, summarize, timed
+
+@timed("square")
+def square(value):
+    return value * value
+
+def test_timed_records_stages_only_inside_a_run(tmp_path):
+    assert square(3) == 9
+    start_run("test", log_path=str(tmp_path / "perf.jsonl"))
+    square(4)
+    records = finish_run()
+    assert [record["stage"] for record in records] == ["square"]
+    assert summarize(records)[0]["Calls"] == 1
+    assert (tmp_path / "perf.jsonl").exists()
+
+def test_memory_tracing_stays_on_until_the_last_run_closes():
+    assert not tracemalloc.is_tracing()
+    first = ProfileRun("first", memory=True, log_path=None)
+    second = ProfileRun("second", memory=True, log_path=None)
+    first.close()
+    assert tracemalloc.is_tracing()
+    with second.stage("allocate"):
+        block = bytearray(2_000_000)
+    second.close()
+    second.close()
+    assert not tracemalloc.is_tracing()
+    assert second.records[0]["peak_bytes"] >= len(block)
+
+def test_concurrent_traced_runs_share_the_tracer():
+    barrier = threading.Barrier(4)
+
+    def work():
+        run = ProfileRun("thread", memory=True, log_path=None)
+        barrier.wait()
+        with run.stage("allocate"):
+            bytearray(100_000)
+        barrier.wait()
+        run.close()
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not tracemalloc.is_tracing()
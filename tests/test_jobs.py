@@ -0,0 +1,98 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from jobs import CANCELLED, DONE, FAILED, JobManager
+from synthetic_data import generate_sales_data
+from trend_models import PROGRESS_STEPS, fit_trend_models
+
+@pytest.fixture
+def manager():
+    manager = JobManager(max_workers=1)
+    yield manager
+    manager._pool.shutdown(wait=True)
+
+def blocking(release, started=None, progress=None):
+    """
+    Work that reports progress until release is set.
+    """
+    if started is not None:
+        started.set()
+    while not release.wait(0.01):
+        progress(0.5)
+    return "released"
+
+def test_submit_runs_the_work_and_records_progress(manager):
+    seen = []
+
+    def work(values, progress=None):
+        for step in range(4):
+            progress((step + 1) / 4)
+            seen.append(progress.progress)
+        return sum(values)
+
+    job = manager.submit("me", "sum", work, [1, 2, 3], label="Sum")
+    job._future.result(timeout=5)
+    assert job.status == DONE and job.result == 6 and job.progress == 1.0
+    assert seen == [0.25, 0.5, 0.75, 1.0]
+    assert manager.jobs("me") == [job] and manager.jobs("someone else") == []
+    assert manager.latest("me", "sum") is job
+    assert manager.to_frame("me").loc[job.id, 'Status'] == DONE
+
+def test_jobs_with_the_same_key_run_once(manager):
+    release = threading.Event()
+    first = manager.submit("me", "wait", blocking, release, key="k")
+    again = manager.submit("me", "wait", blocking, release, key="k")
+    assert again is first
+    release.set()
+    first._future.result(timeout=5)
+    assert manager.submit("me", "wait", blocking, release, key="k") is not first
+
+def test_failures_are_recorded(manager):
+    def work(progress=None):
+        raise ValueError("bad input")
+
+    job = manager.submit("me", "fail", work)
+    job._future.result(timeout=5)
+    assert job.status == FAILED
+    assert job.error == "ValueError: bad input"
+
+def test_cancel_stops_running_and_queued_jobs(manager):
+    release, started = threading.Event(), threading.Event()
+    running = manager.submit("me", "wait", blocking, release, started)
+    queued = manager.submit("me", "wait", blocking, release)
+    assert started.wait(5)
+
+    manager.cancel(queued.id)
+    assert queued.status == CANCELLED
+    manager.cancel(running.id)
+    running._future.result(timeout=5)
+    assert running.status == CANCELLED and running.result is None
+    assert not release.is_set()
+
+def test_trend_fit_reports_progress_for_small_catalogs():
+    data = generate_sales_data(45, 20, seed=0)
+    seen = []
+    coefficients = fit_trend_models(data, progress=seen.append)
+    assert 1 < len(seen) <= PROGRESS_STEPS
+    assert seen == sorted(seen) and seen[-1] == pytest.approx(1.0)
+    pd.testing.assert_frame_equal(coefficients, fit_trend_models(data))
+
+def test_cancelled_trend_fit_stops_early(manager):
+    data = generate_sales_data(200, 20, seed=0)
+    reports = []
+
+    def work(progress=None):
+        def report(fraction):
+            reports.append(fraction)
+            if len(reports) == 2:
+                manager.cancel(progress.id)
+            progress(fraction)
+        return fit_trend_models(data, progress=report)
+
+    job = manager.submit("me", "train", work)
+    job._future.result(timeout=5)
+    assert job.status == CANCELLED
+    assert len(reports) == 2 and reports[-1] < 1.0 and np.isclose(job.progress, reports[0])
@@ -0,0 +1,34 @@
+import os
+import pickle
+
+from model_registry import ALL_PRODUCTS, ModelRegistry
+
+def test_catalog_models_do_not_collide_with_a_product_named_star(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.put("data", ALL_PRODUCTS, {'model': "trend"}, "catalog")
+    registry.put("data", "*", {'model': "trend"}, "star")
+    assert registry.get("data", ALL_PRODUCTS, {'model': "trend"}) == "catalog"
+    assert registry.get("data", "*", {'model': "trend"}) == "star"
+    assert registry.get("data", "*", {'model': "other"}) is None
+
+def test_memory_hits_keep_models_from_eviction(tmp_path):
+    model = list(range(2000))
+    size = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    registry = ModelRegistry(str(tmp_path), max_bytes=int(size * 2.5))
+    registry.put("data", "busy", {}, model)
+    registry.put("data", "idle", {}, model)
+    busy_path = registry._path(registry.key_for("data", "busy", {}))
+    idle_path = registry._path(registry.key_for("data", "idle", {}))
+    os.utime(busy_path, (1, 1))
+    os.utime(idle_path, (2, 2))
+
+    assert registry.get("data", "busy", {}) == model  # Served from memory
+    registry.put("data", "new", {}, model)
+    assert os.path.exists(busy_path)
+    assert not os.path.exists(idle_path)
+
+def test_models_reload_from_disk(tmp_path):
+    ModelRegistry(str(tmp_path)).put("data", "A", {'window': 5}, {'coefficient': 2.0})
+    fresh = ModelRegistry(str(tmp_path))
+    assert fresh.get("data", "A", {'window': 5}) == {'coefficient': 2.0}
+    assert fresh.stats() == {"hits": 1, "misses": 0}
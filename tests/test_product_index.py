@@ -0,0 +1,82 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import product_index
+from product_index import ProductIndex, product_index_for
+
+def interleaved_sales():
+    return pd.DataFrame({
+        'Date': pd.to_datetime(["2024-01-03", "2024-01-01", "2024-01-02", "2024-01-01", "2024-01-05", None]),
+        'Product': ["B", "A", "B", "C", "A", None],
+        'Sales': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+
+def test_products_form_contiguous_blocks_in_first_seen_order():
+    data = interleaved_sales()
+    index = ProductIndex(data)
+    assert index.products.tolist() == ["B", "A", "C"]
+    np.testing.assert_array_equal(index.starts, [0, 2, 4])
+    np.testing.assert_array_equal(index.ends, [2, 4, 5])
+    # Rows without a product are left out of every block
+    assert len(index.data) == 5
+    for position, product in enumerate(index.products):
+        block = index.data.iloc[index.starts[position]:index.ends[position]]
+        assert (block['Product'] == product).all()
+
+def test_rows_keep_their_source_order():
+    index = ProductIndex(interleaved_sales())
+    # Stable sort: B's rows stay in file order even though their dates are not
+    assert index.rows("B")['Sales'].tolist() == [1.0, 3.0]
+    assert index.rows("A")['Sales'].tolist() == [2.0, 5.0]
+    assert index.rows("missing").empty
+    np.testing.assert_array_equal(index.positions(["C", "missing", "B"]), [2, 0])
+    assert "A" in index and "missing" not in index
+
+def test_sorted_input_is_used_as_is():
+    data = interleaved_sales().dropna(subset=['Product']).sort_values('Product', kind='stable')
+    index = ProductIndex(data)
+    assert index.data is data
+    np.testing.assert_array_equal(index.column('Sales'), data['Sales'].to_numpy())
+
+@pytest.fixture
+def memo(monkeypatch):
+    monkeypatch.setattr(product_index, '_index_memo', product_index.OrderedDict())
+    return product_index._index_memo
+
+def test_memo_loads_once_and_is_bounded_by_bytes(memo):
+    loads = []
+
+    def load():
+        loads.append(1)
+        return interleaved_sales()
+
+    first = product_index_for("a", load)
+    budget = first.nbytes * 2
+    assert product_index_for("a", load, max_bytes=budget) is first
+    assert len(loads) == 1
+    product_index_for("b", load, max_bytes=budget)
+    product_index_for("c", load, max_bytes=budget)
+    assert list(memo) == ["b", "c"]
+    # The newest index is kept even when it alone is over the limit
+    product_index_for("d", load, max_bytes=1)
+    assert list(memo) == ["d"]
+    assert product_index_for("none", lambda: None) is None
+
+def test_concurrent_requests_share_one_index(memo):
+    results = []
+    barrier = threading.Barrier(4)
+
+    def request():
+        barrier.wait()
+        results.append(product_index_for("shared", interleaved_sales))
+
+    threads = [threading.Thread(target=request) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 4 and all(result is results[0] for result in results)
+    assert list(memo) == ["shared"]
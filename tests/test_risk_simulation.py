@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from risk_simulation import IMPACT_MEDIAN_LOSS, LIKELIHOOD_PROBABILITY, simulate_exposure, simulate_register
+from risk_store import RiskStore
+
+def test_cvar_averages_the_worst_trials_when_the_var_is_zero():
+    # One rare risk: 95% VaR is zero, so the tail must not take in the no-loss trials
+    summary, contributions = simulate_exposure([1], [3], trials=100_000, confidence=0.95, sigma=0.75)
+    assert summary['VaR'] == 0.0
+    # With probability 0.05 the worst 5% are (nearly) all the events: E[loss | event]
+    expected = IMPACT_MEDIAN_LOSS[2] * np.exp(0.75 ** 2 / 2)
+    assert summary['CVaR'] == pytest.approx(expected, rel=0.03)
+    assert contributions['CVaR Contribution'].sum() == pytest.approx(summary['CVaR'])
+
+def test_cvar_of_a_fixed_loss_matches_the_analytic_tail_mean():
+    # Fixed loss L with probability p: CVaR at confidence c is L * p / (1 - c) when p < 1 - c
+    summary, _ = simulate_exposure([1], [2], trials=200_000, confidence=0.90, sigma=0.0)
+    assert summary['VaR'] == 0.0
+    assert summary['CVaR'] == pytest.approx(IMPACT_MEDIAN_LOSS[1] * LIKELIHOOD_PROBABILITY[0] / 0.10, rel=0.03)
+    assert summary['Expected Loss'] == pytest.approx(IMPACT_MEDIAN_LOSS[1] * LIKELIHOOD_PROBABILITY[0], rel=0.03)
+
+    summary, _ = simulate_exposure([1], [2], trials=200_000, confidence=0.99, sigma=0.0)
+    assert summary['VaR'] == summary['CVaR'] == IMPACT_MEDIAN_LOSS[1]
+
+def test_contributions_split_the_tail_and_skip_unevaluated_risks():
+    summary, contributions = simulate_exposure([5, 2, np.nan], [3, 4, 5], trials=50_000, confidence=0.9)
+    assert contributions['CVaR Contribution'].sum() == pytest.approx(summary['CVaR'])
+    assert contributions.loc[2, 'Expected Loss'] == 0.0
+    assert summary['CVaR'] >= summary['VaR'] >= 0.0
+    again, _ = simulate_exposure([5, 2, np.nan], [3, 4, 5], trials=50_000, confidence=0.9)
+    assert again == summary
+
+def test_at_least_one_trial():
+    with pytest.raises(ValueError):
+        simulate_exposure([1], [1], trials=0)
+
+def test_simulate_register_labels_risks_from_one_snapshot():
+    store = RiskStore(":memory:")
+    store.add("Flood", 2, 4)
+    store.add("Fire", 4, 2)
+    store.add("Unscored")
+    summary, contributions = simulate_register(store, trials=20_000)
+    assert list(contributions['Rank']) == [1, 2, 3]
+    assert contributions.set_index('Risk').loc["Unscored", 'Expected Loss'] == 0.0
+    assert simulate_register(store, trials=20_000)[0] is summary
+
+    store.add("Storm", 5, 5)
+    _, contributions = simulate_register(store, trials=20_000)
+    assert contributions.iloc[0]['Risk'] == "Storm"
@@ -0,0 +1,65 @@
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_store import MITIGATED, NOT_MITIGATED, RiskStore
+
+def register(*rows):
+    return pd.DataFrame(rows, columns=["Risk", "Likelihood", "Impact", "Mitigation Strategy", "Status"])
+
+def test_import_matches_the_stored_rows_under_concurrent_writers(tmp_path):
+    path = str(tmp_path / "risks.sqlite3")
+    ours, theirs = RiskStore(path), RiskStore(path)
+    ours.add("Port strike", 3, 4)
+    theirs.add("Supplier insolvency", 2, 5)  # Not in our mirror yet
+
+    added = ours.import_frame(register(("Flood", 2, 3, None, NOT_MITIGATED), ("Port strike", 4, 4, None, None)))
+    assert added == 1
+    assert set(ours.names()) == {"Port strike", "Supplier insolvency", "Flood"}
+    assert ours.get("Supplier insolvency")["Impact"] == 5
+    assert ours.get("Port strike")["Likelihood"] == 4
+    pd.testing.assert_frame_equal(ours.to_frame(), RiskStore(path).to_frame())
+
+def test_npz_import_respects_update_existing(tmp_path):
+    source = RiskStore(":memory:")
+    source.add("Flood", 5, 5, "Move stock", MITIGATED)
+    source.add("Fire", 1, 2)
+    archive = io.BytesIO()
+    source.export_columns(archive)
+
+    target = RiskStore(":memory:")
+    target.add("Flood", 1, 1)
+    archive.seek(0)
+    assert target.import_columns(archive, update_existing=False) == 1
+    assert target.get("Flood")["Likelihood"] == 1
+    archive.seek(0)
+    assert target.import_columns(archive) == 0
+    assert target.get("Flood") == {"Risk": "Flood", "Likelihood": 5, "Impact": 5,
+                                   "Mitigation Strategy": "Move stock", "Status": MITIGATED}
+
+def test_failed_import_rolls_back():
+    store = RiskStore(":memory:")
+    store.add("Flood", 2, 2)
+    with pytest.raises(ValueError):
+        store.import_chunks([register(("Fire", 1, 1, None, None)), register(("Storm", 9, 1, None, None))])
+    assert store.names() == ["Flood"]
+    ids, likelihood, _ = store.columns()
+    np.testing.assert_array_equal(likelihood, [2.0])
+
+def test_reads_stay_consistent_while_another_session_imports():
+    store = RiskStore(":memory:")
+    batches = [register(*[(f"Risk {batch}-{row}", 1 + row % 5, 2, None, None) for row in range(200)])
+               for batch in range(20)]
+    writer = threading.Thread(target=lambda: [store.import_frame(batch) for batch in batches])
+    writer.start()
+    while writer.is_alive():
+        frame = store.to_frame()
+        assert len(frame) == frame.index.nunique()
+        assert frame["Risk"].notna().all()
+        ids, likelihood, impact = store.columns()
+        assert len(ids) == len(likelihood) == len(impact)
+    writer.join()
+    assert len(store) == 4000
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from calendar_alignment import SalesCalendar
+from forecasting import forecast_all_products
+from product_index import ProductIndex
+from rollups import period_lengths, period_numbers, rollup
+
+@pytest.fixture
+def steady_sales():
+    # 400 days from a Sunday: both the first week and the last month are partial
+    return pd.DataFrame({'Date': pd.date_range("2023-01-01", periods=400), 'Product': "A", 'Sales': 100.0})
+
+@pytest.mark.parametrize("resolution", ["Weekly", "Monthly", "Quarterly"])
+def test_partial_edge_periods_are_scaled_to_full_period_rates(steady_sales, resolution):
+    level = rollup(steady_sales, resolution)
+    lengths = period_lengths(period_numbers(level.index, resolution), resolution)
+    np.testing.assert_allclose(level['Sales'], 100.0 * lengths)
+    assert level['Total'].sum() == 400 * 100.0
+    assert level['Days'].sum() == 400
+    assert (level['Days'] < lengths).any()
+
+    calendar = SalesCalendar(steady_sales, resolution)
+    np.testing.assert_allclose(calendar.values[0], level['Sales'])
+
+def test_quarters_from_months_match_quarters_from_days(steady_sales):
+    monthly = rollup(steady_sales, "Monthly")
+    pd.testing.assert_frame_equal(rollup(ProductIndex(monthly), "Quarterly"), rollup(steady_sales, "Quarterly"))
+
+def test_a_partial_last_month_does_not_drag_the_forecast_down(steady_sales):
+    forecast = forecast_all_products(ProductIndex(rollup(steady_sales, "Monthly")), window=3, forecast_days=1,
+                                     resolution="Monthly")
+    assert forecast['Forecast'].iloc[0] == pytest.approx((3100 + 3100 + 2900) / 3)
+
+def test_product_spans_set_the_edges():
+    data = pd.DataFrame({'Date': pd.to_datetime(["2024-01-10", "2024-01-20", "2024-02-05", "2024-01-15"]),
+                         'Product': ["A", "A", "A", "B"], 'Sales': [10.0, 10.0, 6.0, 3.0]})
+    level = rollup(data, "Monthly")
+    a, b = level[level['Product'] == "A"], level[level['Product'] == "B"]
+    assert a['Days'].tolist() == [22, 5]  # 10-31 January, 1-5 February
+    np.testing.assert_allclose(a['Sales'], [20.0 * 31 / 22, 6.0 * 29 / 5])
+    assert b['Days'].tolist() == [1] and b['Sales'].iloc[0] == pytest.approx(3.0 * 31)
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scheduling import orders_from_forecast, schedule_allocations
+
+def make_orders(rows):
+    return pd.DataFrame(rows, columns=['Order', 'Resource', 'Date', 'Due', 'Priority', 'Quantity'])
+
+def test_capacity_limits_every_period():
+    orders = make_orders([
+        (1, "A", "2024-01-01", "2024-01-01", 1, 8.0),
+        (2, "B", "2024-01-01", "2024-01-03", 1, 3.0),
+    ])
+    capacity = pd.DataFrame({'Resource': ["A", "B"], 'Capacity': [3.0, 5.0]})
+    fills, status, backlog = schedule_allocations(orders, capacity, end="2024-01-04")
+
+    per_day = fills.groupby(['Date', 'Resource'])['Allocated'].sum()
+    assert (per_day.xs("A", level='Resource') <= 3.0).all()
+    np.testing.assert_allclose(per_day.xs("A", level='Resource'), [3.0, 3.0, 2.0])
+    assert status.set_index('Order')['Outstanding'].tolist() == [0.0, 0.0]
+    assert status.set_index('Order').loc[1, 'Completed'] == pd.Timestamp("2024-01-03")
+    a = backlog[backlog['Resource'] == "A"].set_index('Date')
+    np.testing.assert_allclose(a['Backlog'], [5.0, 2.0, 0.0])
+    np.testing.assert_allclose(a['Unused'], [0.0, 0.0, 1.0])
+
+def test_dated_capacity_and_carry_over():
+    orders = make_orders([(1, "A", "2024-01-01", "2024-01-03", 1, 6.0)])
+    capacity = pd.DataFrame({'Resource': "A", 'Date': ["2024-01-01", "2024-01-02", "2024-01-03"],
+                             'Capacity': [0.0, 2.0, 4.0]})
+    fills, status, _ = schedule_allocations(orders, capacity)
+    np.testing.assert_allclose(fills['Allocated'], [2.0, 4.0])
+    assert not status['Late'].iloc[0]
+
+    # Capacity left unused before the order arrives is only kept with carry_capacity
+    late = make_orders([(1, "A", "2024-01-03", "2024-01-03", 1, 5.0)])
+    steady = pd.DataFrame({'Resource': ["A"], 'Capacity': [1.0]})
+    for carry, served in ((False, 1.0), (True, 3.0)):
+        fills, _, _ = schedule_allocations(late, steady, start="2024-01-01", end="2024-01-03", carry_capacity=carry)
+        assert fills['Allocated'].sum() == pytest.approx(served)
+
+def test_lower_priority_numbers_are_served_first():
+    orders = make_orders([
+        (1, "A", "2024-01-01", "2024-01-05", 3, 2.0),
+        (2, "A", "2024-01-01", "2024-01-05", 1, 2.0),
+        (3, "A", "2024-01-01", "2024-01-05", 2, 2.0),
+    ])
+    capacity = pd.DataFrame({'Resource': ["A"], 'Capacity': [2.0]})
+    fills, status, _ = schedule_allocations(orders, capacity, aging_rate=0.0)
+    assert fills['Order'].tolist() == [2, 3, 1]
+    assert status.set_index('Order')['Completed'].tolist() == list(pd.to_datetime(
+        ["2024-01-03", "2024-01-01", "2024-01-02"]))
+
+def test_waiting_orders_age_ahead_of_new_arrivals():
+    # Order 1 waits two periods; with aging 1.0 it overtakes the later priority-2 order
+    orders = make_orders([
+        (1, "A", "2024-01-01", "2024-01-10", 3, 1.0),
+        (2, "A", "2024-01-01", "2024-01-10", 1, 2.0),
+        (3, "A", "2024-01-03", "2024-01-10", 2, 1.0),
+    ])
+    capacity = pd.DataFrame({'Resource': ["A"], 'Capacity': [1.0]})
+    fills, _, _ = schedule_allocations(orders, capacity, aging_rate=1.0)
+    assert fills['Order'].tolist() == [2, 2, 1, 3]
+
+def test_late_orders_are_marked():
+    orders = make_orders([
+        (1, "A", "2024-01-01", "2024-01-01", 1, 2.0),  # Done on time
+        (2, "A", "2024-01-01", "2024-01-02", 1, 4.0),  # Done on the 3rd, after its due date
+        (3, "A", "2024-01-01", "2024-01-09", 1, 9.0),  # Still open, but not due within the horizon
+        (4, "A", "2024-01-01", "2024-01-04", 1, 9.0),  # Still open past its due date
+    ])
+    capacity = pd.DataFrame({'Resource': ["A"], 'Capacity': [2.0]})
+    _, status, _ = schedule_allocations(orders, capacity, end="2024-01-05", aging_rate=0.0)
+    status = status.set_index('Order')
+    assert status['Late'].tolist() == [False, True, False, True]
+    assert status.loc[2, 'Completed'] == pd.Timestamp("2024-01-03")
+    assert pd.isna(status.loc[3, 'Completed'])
+
+def test_forecasts_become_orders():
+    forecast = pd.DataFrame({'Product': ["A", "A"], 'Date': pd.to_datetime(["2024-01-01", "2024-01-02"]),
+                             'Forecast': [3.0, -1.0]})
+    orders = orders_from_forecast(forecast, due_periods=1)
+    assert orders['Quantity'].tolist() == [3.0, 0.0]
+    assert orders['Due'].iloc[0] == pd.Timestamp("2024-01-02")
+    fills, _, _ = schedule_allocations(forecast, pd.DataFrame({'Resource': ["A"], 'Capacity': [5.0]}))
+    assert fills['Allocated'].sum() == pytest.approx(3.0)
+
+def test_invalid_orders_are_rejected():
+    capacity = pd.DataFrame({'Resource': ["A"], 'Capacity': [1.0]})
+    with pytest.raises(ValueError):
+        schedule_allocations(make_orders([(1, "A", "2024-01-01", "2024-01-01", 1, -1.0)]), capacity)
+    with pytest.raises(ValueError):
+        schedule_allocations(make_orders([(1, "A", "2024-01-01", "2024-01-01", 1, 1.0)]),
+                             pd.DataFrame({'Resource': ["A"], 'Capacity': [-1.0]}))
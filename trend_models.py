@@ -0,0 +1,155 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ingest import sales_dates
+from product_index import ProductIndex
+
+COEFFICIENT_COLUMNS = ['Intercept', 'Slope', 'Rows', 'MaxDays']
+PROGRESS_STEPS = 20  # Progress reports of a single-process fit
+
+def _day_numbers(index):
+    # Whole days since 1970-01-01 for every row of the sorted frame
+    if 'Day' in index.data.columns:
+        return index.column('Day').astype(np.int64)
+    dates = sales_dates(index.data).to_numpy(dtype='datetime64[ns]')
+    return dates.astype('datetime64[D]').astype(np.int64)
+
+def trend_from_sums(n, sum_x, sum_y, sum_xx, sum_xy):
+    """
+    Least-squares line from running sums of a regression of y on x, as kept
+    by backtesting and incremental. Returns the x mean, y mean and slope;
+    the slope is 0 where there is no spread in x.
+    """
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = sum_x / n
+        y_mean = sum_y / n
+        sxx = sum_xx - n * x_mean * x_mean
+        sxy = sum_xy - n * x_mean * y_mean
+        # Days are integers, so any real spread gives sxx >= 0.5; smaller is rounding noise
+        slope = np.where(sxx > 0.25, sxy / np.where(sxx > 0.25, sxx, 1.0), 0.0)
+    return x_mean, y_mean, slope
+
+def _fit_blocks(days, sales, starts, ends):
+    """
+    Closed-form least squares of sales on days-since-first-date for each
+    contiguous block. Returns intercepts, slopes, row counts and max days.
+    """
+    # ProductIndex blocks are adjacent, so the rows are one contiguous span
+    counts = ends - starts
+    block_ids = np.repeat(np.arange(len(starts)), counts)
+    first_row = starts[0] if len(starts) else 0
+    days = days[first_row:first_row + len(block_ids)]
+    sales = sales[first_row:first_row + len(block_ids)].astype(float)
+
+    # Days since each product's first date, as in DemandForecastingTool.preprocess_data
+    if len(starts) == 0:
+        return np.empty(0), np.empty(0), counts, np.empty(0)
+    offsets = starts - first_row
+    first_day = np.minimum.reduceat(days, offsets)
+    x = (days - first_day[block_ids]).astype(float)
+
+    # Centre per block before taking moments to keep the sums well conditioned
+    x_mean = np.bincount(block_ids, weights=x, minlength=len(starts)) / np.maximum(counts, 1)
+    y_mean = np.bincount(block_ids, weights=sales, minlength=len(starts)) / np.maximum(counts, 1)
+    x_centered = x - x_mean[block_ids]
+    sxx = np.bincount(block_ids, weights=x_centered * x_centered, minlength=len(starts))
+    sxy = np.bincount(block_ids, weights=x_centered * (sales - y_mean[block_ids]), minlength=len(starts))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slopes = np.where(sxx > 0, sxy / sxx, 0.0)
+    intercepts = y_mean - slopes * x_mean
+
+    max_days = np.maximum.reduceat(x, offsets)
+    return intercepts, slopes, counts, max_days
+
+# Batch Trend Model Training
+def fit_trend_models(data, processes=None, chunk_products=5000, progress=None):
+    """
+    Fit the DemandForecastingTool linear trend (Sales ~ Days) for every product
+    at once. data is a sales frame or a ProductIndex. With processes > 1 the
+    catalog is split into chunks of products fitted in a process pool.
+    progress, if given, is called with the fraction of chunks fitted; without
+    a pool the products are fitted in up to PROGRESS_STEPS chunks for it.
+    Returns a coefficient table indexed by product.
+    """
+    index = data if isinstance(data, ProductIndex) else ProductIndex(data)
+    days = _day_numbers(index)
+    sales = index.column('Sales')
+
+    pooled = processes and processes > 1 and len(index) > chunk_products
+    if progress is not None and not pooled:
+        # Fit in slices so progress, and with it a job's cancellation, is seen along the way
+        chunk_products = min(chunk_products, max(-(-len(index) // PROGRESS_STEPS), 1))
+    if pooled or (progress is not None and len(index)):
+        chunks = []
+        for first in range(0, len(index), chunk_products):
+            starts = index.starts[first:first + chunk_products]
+            ends = index.ends[first:first + chunk_products]
+            lo, hi = starts[0], ends[-1]
+            chunks.append((days[lo:hi], sales[lo:hi], starts - lo, ends - lo))
+        parts = []
+        if pooled:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                jobs = [pool.submit(_fit_blocks, *chunk) for chunk in chunks]
+                for job in jobs:
+                    parts.append(job.result())
+                    if progress is not None:
+                        progress(len(parts) / len(chunks))
+        else:
+            for chunk in chunks:
+                parts.append(_fit_blocks(*chunk))
+                progress(len(parts) / len(chunks))
+        intercepts, slopes, counts, max_days = (np.concatenate(values) for values in zip(*parts))
+    else:
+        intercepts, slopes, counts, max_days = _fit_blocks(days, sales, index.starts, index.ends)
+        if progress is not None:
+            progress(1.0)
+
+    return pd.DataFrame({
+        'Intercept': intercepts,
+        'Slope': slopes,
+        'Rows': counts,
+        'MaxDays': max_days,
+    }, index=pd.Index(index.products, name='Product'))
+
+def predict_trend(coefficients, product_name, days_ahead):
+    """
+    Predict sales for days_ahead days after the last observed day of a
+    product, returning the same frame as DemandForecastingTool.forecast.
+    """
+    row = coefficients.loc[product_name]
+    future_days = row['MaxDays'] + np.arange(1, days_ahead + 1)
+    return pd.DataFrame({
+        'Days Ahead': range(1, days_ahead + 1),
+        'Predicted Sales': row['Intercept'] + row['Slope'] * future_days,
+    })
+
+def forecast_all_trends(data, horizon, coefficients=None, progress=None):
+    """
+    Trend forecasts for every product as a tidy 'Product', 'Date', 'Forecast'
+    frame, starting the day after each product's last observed date.
+    Fits the models first unless a coefficient table is given. A table with a
+    'LastDate' column (IncrementalForecaster.trend_coefficients) already covers
+    rows appended after data was loaded, so its products and dates are used.
+    """
+    index = data if isinstance(data, ProductIndex) else ProductIndex(data)
+    if coefficients is None:
+        coefficients = fit_trend_models(index, progress=progress)
+    elif 'LastDate' not in coefficients.columns:
+        coefficients = coefficients.reindex(index.products)
+    if 'LastDate' in coefficients.columns:
+        products = coefficients.index.to_numpy()
+        last_dates = coefficients['LastDate'].to_numpy(dtype='datetime64[ns]')
+    else:
+        products = index.products
+        last_dates = sales_dates(index.data).to_numpy(dtype='datetime64[ns]')[index.ends - 1]
+    steps = np.arange(1, horizon + 1)
+    future_days = coefficients['MaxDays'].to_numpy()[:, None] + steps
+    predictions = coefficients['Intercept'].to_numpy()[:, None] + coefficients['Slope'].to_numpy()[:, None] * future_days
+    return pd.DataFrame({
+        'Product': np.repeat(products, horizon),
+        'Date': np.repeat(last_dates, horizon) + np.tile(steps.astype('timedelta64[D]'), len(products)),
+        'Forecast': predictions.ravel(),
+    })